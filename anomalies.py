@@ -0,0 +1,226 @@
+"""
+Bank Statement Analysis Plotly Dash App
+
+This is a Plotly Dash app that analyses bank statements and provides various visualizations to help users understand
+their spending habits.
+
+It uses the following technologies and libraries:
+- Python 3.7
+- Plotly Dash
+- Pandas
+- Numpy
+
+The app is intended for educational or demonstration purposes only and should not be used in a production environment
+without further testing and security measures.
+
+To run the app, you will need to have Python and the required libraries installed.
+You can run the app by running the command 'python, python3, or py (depending on your setup) index.py' in the terminal.
+
+This project is released under the MIT License.
+
+Author: @10XTMY, Molmez LTD (www.molmez.io)
+Date Published: 30 January 2023
+
+
+This is the anomaly detection that flags transactions with an unusual amount for their payee or category
+
+Amounts are compared to their group's median with the median absolute deviation (MAD), which a few outliers cannot
+drag the way they drag a mean and standard deviation. Both are taken on a log scale, since amounts vary by ratios
+(a bill twice the usual size) rather than by fixed sums. Payments in and out are separate groups.
+
+The statistics are kept as one histogram of amounts per group, in log spaced bins a few percent wide, so new rows
+are added in O(new rows) and only the groups they touch have their median / MAD recomputed:
+    statistics: {family: {group: {bin: count}}}          family is 'Payee' or 'Category'
+    summaries:  {family: {group: (count, median, MAD)}}  median and MAD in bins
+"""
+import numpy as np
+import pandas as pd
+from cache import cached_on_data_frame
+
+FAMILIES = ('Payee', 'Category')
+
+# bins per doubling of the amount, 16 gives bins about 4% wide
+BINS_PER_DOUBLING = 16
+
+# a payee needs this many payments before it is judged on its own, otherwise its category is used
+MIN_GROUP_SIZE = 5
+
+# the modified z-score of Iglewicz and Hoaglin, 0.6745 * deviation / MAD, above which an amount is unusual
+SCORE_THRESHOLD = 3.5
+MAD_SCALE = 0.6745
+
+# smallest MAD used, in bins, so a fixed price subscription is not flagged for a small price rise
+MIN_MAD = 2
+
+
+def amount_bins(amounts):
+    """
+    :param amounts: numpy array of signed minor unit amounts.
+    :return: int64 numpy array of histogram bins of the absolute amounts.
+    """
+    return np.floor(amount_scale(amounts)).astype('int64')
+
+
+def amount_scale(amounts):
+    """
+    :param amounts: numpy array of signed minor unit amounts.
+    :return: float numpy array of the absolute amounts on the log scale the bins are counted in.
+    """
+    return np.log2(np.maximum(np.abs(amounts), 1)) * BINS_PER_DOUBLING
+
+
+def bin_values(bins):
+    """
+    :param bins: numpy array of histogram bins, or positions on the log scale.
+    :return: float numpy array of the (geometric) centre amount of each bin, in minor units.
+    """
+    return np.exp2((np.asarray(bins, dtype=float) + 0.5) / BINS_PER_DOUBLING)
+
+
+def group_keys(data_frame, family):
+    """
+    :param data_frame: pandas DataFrame with 'Amount' and a column named after the family.
+    :param family: 'Payee' or 'Category'.
+    :return: numpy object array of group keys, eg. 'Starbucks|out'.
+    """
+    # the keys are built once per unique name rather than once per row
+    codes, uniques = pd.factorize(data_frame[family].fillna('').astype(str))
+    keys = np.array([f'{name}|{direction}' for name in uniques for direction in ('in', 'out')], dtype=object)
+    return keys[codes * 2 + (data_frame['Amount'].to_numpy() <= 0)]
+
+
+def empty_statistics():
+    return {family: {} for family in FAMILIES}
+
+
+def update_statistics(statistics, data_frame):
+    """
+    Adds transactions to the statistics in place, only the new rows are read.
+    :param statistics: statistics dictionary, see the module docstring.
+    :param data_frame: pandas DataFrame of new transactions with 'Payee', 'Category' and 'Amount' columns.
+    :return: dictionary of family -> set of groups touched, for summarise_groups.
+    """
+    touched = {}
+    bins = amount_bins(data_frame['Amount'].to_numpy())
+
+    for family in FAMILIES:
+        histograms = statistics.setdefault(family, {})
+        counts = pd.DataFrame({'Group': group_keys(data_frame, family), 'Bin': bins}).value_counts()
+
+        for (group, bin_number), count in counts.items():
+            histogram = histograms.setdefault(group, {})
+            histogram[int(bin_number)] = histogram.get(int(bin_number), 0) + int(count)
+
+        touched[family] = set(counts.index.get_level_values('Group'))
+
+    return touched
+
+
+def _weighted_median(values, weights):
+    order = np.argsort(values)
+    cumulative = np.cumsum(weights[order])
+    return values[order][np.searchsorted(cumulative, cumulative[-1] / 2)]
+
+
+def summarise_histogram(histogram):
+    """
+    :param histogram: dictionary of bin -> count.
+    :return: tuple of (count, median, MAD), median and MAD in bins.
+    """
+    bins = np.fromiter(histogram.keys(), dtype='int64', count=len(histogram)) + 0.5
+    counts = np.fromiter(histogram.values(), dtype='int64', count=len(histogram))
+
+    median = _weighted_median(bins, counts)
+    mad = _weighted_median(np.abs(bins - median), counts)
+    return int(counts.sum()), float(median), float(mad)
+
+
+def summarise_groups(statistics, summaries=None, touched=None):
+    """
+    Computes the median / MAD of the given groups, or of every group.
+    :param statistics: statistics dictionary.
+    :param summaries: summaries dictionary to update in place, a new one if not given.
+    :param touched: dictionary of family -> groups to recompute, as returned by update_statistics.
+    :return: summaries dictionary.
+    """
+    summaries = summaries if summaries is not None else {family: {} for family in FAMILIES}
+    for family, histograms in statistics.items():
+        groups = touched.get(family, ()) if touched is not None else histograms.keys()
+        family_summaries = summaries.setdefault(family, {})
+        for group in groups:
+            family_summaries[group] = summarise_histogram(histograms[group])
+    return summaries
+
+
+@cached_on_data_frame()
+def build_summaries(data_frame):
+    """
+    Builds the statistics of a whole data set in one pass, cached per data set.
+    :param data_frame: pandas DataFrame with 'Payee', 'Category' and 'Amount' columns.
+    :return: summaries dictionary.
+    """
+    statistics = empty_statistics()
+    update_statistics(statistics, data_frame)
+    return summarise_groups(statistics)
+
+
+def _lookup(summaries, keys):
+    """
+    :return: tuple of (count, median, MAD) float numpy arrays aligned with keys, NaN for unknown groups.
+    """
+    if not summaries:
+        return (np.full(len(keys), np.nan),) * 3
+
+    groups = pd.Index(list(summaries.keys()))
+    table = np.append(np.array(list(summaries.values()), dtype=float), [[np.nan] * 3], axis=0)
+    found = table[groups.get_indexer(keys)]
+    return found[:, 0], found[:, 1], found[:, 2]
+
+
+def flag_anomalies(data_frame, summaries):
+    """
+    Scores every transaction against its payee's statistics, or its category's while the payee has fewer than
+    MIN_GROUP_SIZE payments, and keeps the unusually large ones.
+    :param data_frame: pandas DataFrame with a DateTimeIndex and 'Payee', 'Category' and signed 'Amount' columns.
+    :param summaries: summaries dictionary, eg. from build_summaries over the whole history.
+    :return: the unusual rows of the DataFrame with 'Typical' (group median, signed, minor units) and 'Score'
+        (modified z-score) columns added, highest score first.
+    """
+    try:
+        amounts = data_frame['Amount'].to_numpy()
+
+        count, median, mad = _lookup(summaries.get('Payee', {}), group_keys(data_frame, 'Payee'))
+        category_count, category_median, category_mad = _lookup(summaries.get('Category', {}),
+                                                                group_keys(data_frame, 'Category'))
+        use_category = ~(count >= MIN_GROUP_SIZE)
+        count = np.where(use_category, category_count, count)
+        median = np.where(use_category, category_median, median)
+        mad = np.where(use_category, category_mad, mad)
+
+        with np.errstate(invalid='ignore'):
+            scores = MAD_SCALE * (amount_scale(amounts) - median) / np.maximum(mad, MIN_MAD)
+            unusual = (count >= MIN_GROUP_SIZE) & (scores > SCORE_THRESHOLD)
+
+        rows = np.flatnonzero(unusual)
+        flagged = data_frame.take(rows)
+        flagged['Typical'] = (np.rint(bin_values(median[rows] - 0.5)) * np.sign(amounts[rows])).astype('int64')
+        flagged['Score'] = np.round(scores[rows], 1)
+
+        return flagged.sort_values('Score', ascending=False, kind='mergesort')
+
+    except KeyError as e:
+        raise KeyError(f"DataFrame column error flagging anomalies: {e}")
+    except ValueError as e:
+        raise ValueError(f"Data processing error flagging anomalies: {e}")
+    except Exception as e:
+        raise Exception(f"Error flagging anomalies: {e}")
+
+
+def anomalies_table(flagged):
+    """
+    :param flagged: pandas DataFrame from flag_anomalies.
+    :return: pandas DataFrame with 'Date', 'Payee', 'Category', 'Amount', 'Typical' and 'Score' columns.
+    """
+    if flagged.empty:
+        return pd.DataFrame()
+    return flagged.rename_axis('Date').reset_index()[['Date', 'Payee', 'Category', 'Amount', 'Typical', 'Score']]
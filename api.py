@@ -0,0 +1,166 @@
+"""
+Bank Statement Analysis Plotly Dash App
+
+This is a Plotly Dash app that analyses bank statements and provides various visualizations to help users understand
+their spending habits.
+
+It uses the following technologies and libraries:
+- Python 3.7
+- Plotly Dash
+- Pandas
+- Numpy
+
+The app is intended for educational or demonstration purposes only and should not be used in a production environment
+without further testing and security measures.
+
+To run the app, you will need to have Python and the required libraries installed.
+You can run the app by running the command 'python, python3, or py (depending on your setup) index.py' in the terminal.
+
+This project is released under the MIT License.
+
+Author: @10XTMY, Molmez LTD (www.molmez.io)
+Date Published: 30 January 2023
+
+
+This is the JSON API for integrations, served by the same Flask server as the Dash app
+    GET  /api/v1/analytics?start_date=2023-01-01&end_date=2023-06-30&in_out=paid_out&isolate=tesco&top=10
+    POST /api/v1/analytics  {"in_out": "paid_out", "min": 10,
+                             "data": {"Date": [...], "Details": [...], "Amount": [...]}}
+Filters: start_date, end_date, in_out (paid_in / paid_out), isolate, remove, min, max, categories (comma separated),
+top and currency, the base currency amounts are converted to (see fx.py). "data" is a data set in the form the
+session stores it (see helpers.data_frame_to_store), amounts in minor units. Without "data" the database (when
+enabled) or the demo data is analysed. Tables are returned in pandas' 'split' layout,
+{"columns": [...], "data": [[...], ...]}, amounts in major units.
+Responses carry an ETag of the data set and filters, a request with a matching If-None-Match is answered with
+304 Not Modified before anything is computed, so dashboards polling for changes cost almost nothing.
+"""
+import functools
+import hashlib
+import json
+import math
+import re
+from flask import Response, request
+from app import server
+from cache import data_frame_fingerprint
+from fx import DEFAULT_CURRENCY, currency_names
+from pipeline import DEFAULT_TOP_LIST_LENGTH, analytics_reports, report_for_export
+from preload import demo_data_frame
+from query_plan import build_filter_plan, plan_digest
+from storage import database_enabled, database_version
+
+API_REPORTS = ('totals', 'top_repeat', 'top_single_in', 'top_single_out', 'categories', 'monthly')
+
+
+@functools.lru_cache(maxsize=1)
+def _demo_fingerprint():
+    return data_frame_fingerprint(demo_data_frame())
+
+
+def _data_version(data):
+    """
+    A key that changes whenever the data set a request is answered from changes.
+    :param data: data set posted with the request, if any.
+    :return: string.
+    """
+    if data:
+        return hashlib.sha1(json.dumps(data, sort_keys=True, separators=(',', ':')).encode()).hexdigest()
+    if database_enabled():
+        return f'database-{database_version()}'
+    return _demo_fingerprint()
+
+
+def _values(spec, name):
+    # query strings repeat a parameter or separate values with commas, JSON bodies use lists or strings
+    values = spec.getlist(name) if hasattr(spec, 'getlist') else spec.get(name)
+    if isinstance(values, str):
+        values = [values]
+    return [value.strip() for item in values or [] for value in str(item).split(',') if value.strip()]
+
+
+def _amount(spec, name):
+    value = spec.get(name)
+    if value in (None, ''):
+        return None
+    amount = float(value)
+    if not math.isfinite(amount):
+        raise ValueError(f'{name} must be a finite number')
+    return amount
+
+
+def parse_filter_spec(spec):
+    """
+    Reads the filter spec of a request into a plan.
+    :param spec: request.args, or the JSON body of a POST request.
+    :return: tuple of (query_plan.FilterPlan, top list length, base currency).
+    """
+    in_out = _values(spec, 'in_out')
+    if any(value not in ('paid_in', 'paid_out') for value in in_out):
+        raise ValueError("in_out must be 'paid_in' or 'paid_out'")
+
+    plan = build_filter_plan(start_date=spec.get('start_date'), end_date=spec.get('end_date'), in_out=in_out,
+                             key_remove=','.join(_values(spec, 'remove')),
+                             key_isolate=','.join(_values(spec, 'isolate')),
+                             minimum=_amount(spec, 'min'), maximum=_amount(spec, 'max'),
+                             categories=_values(spec, 'categories'))
+
+    # keywords are regular expressions, as on the analytics page
+    keywords = plan.isolate or plan.remove
+    if keywords:
+        try:
+            re.compile('|'.join(keywords))
+        except re.error as e:
+            raise ValueError(f"{'isolate' if plan.isolate else 'remove'} is not a valid pattern: {e}")
+
+    top_list_length = int(spec.get('top') or DEFAULT_TOP_LIST_LENGTH)
+    if top_list_length < 1:
+        raise ValueError('top must be at least 1')
+
+    currency = str(spec.get('currency') or DEFAULT_CURRENCY).strip().upper()
+    if currency not in currency_names():
+        raise ValueError(f"currency must be one of {', '.join(currency_names())}")
+    return plan, top_list_length, currency
+
+
+def _json_error(message, status):
+    return Response(json.dumps({'error': message}), status=status, mimetype='application/json')
+
+
+@server.route('/api/v1/analytics', methods=['GET', 'POST'])
+def analytics_api():
+    """
+    Totals, top repeat / single payment tables, category totals and the monthly time series for a filter spec.
+    """
+    spec, data = request.args, None
+    if request.method == 'POST':
+        spec = request.get_json(silent=True)
+        if not isinstance(spec, dict):
+            return _json_error('expected a JSON object', 400)
+        data = spec.get('data')
+
+    try:
+        plan, top_list_length, currency = parse_filter_spec(spec)
+    except (TypeError, ValueError, OverflowError) as e:
+        return _json_error(f'invalid filter spec: {e}', 400)
+
+    # answered from the ETag alone when the data set and the filters are unchanged
+    etag = plan_digest(plan, top_list_length, currency, _data_version(data))
+    if etag in request.if_none_match:
+        response = Response(status=304)
+        response.set_etag(etag)
+        return response
+
+    try:
+        reports = analytics_reports(plan, top_list_length, data, currency=currency)
+    except Exception as e:
+        return _json_error(str(e), 422 if data else 500)
+
+    # each table is serialised by pandas straight to JSON text
+    tables = ','.join(f'"{name}":{report_for_export(reports[name]).to_json(orient="split", index=False)}'
+                      for name in API_REPORTS)
+    body = f'{{"rows":{len(reports["transactions"])},{tables}}}'
+
+    response = Response(body, mimetype='application/json')
+    response.set_etag(etag)
+    # clients may keep the response but must revalidate it, which the ETag makes cheap
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
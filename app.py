@@ -29,9 +29,11 @@ import dash
 external_stylesheets = ['https://fonts.googleapis.com/css2?family=Libre+Franklin:wght@700;900&display=swap']
 
 # meta_tags are required for the app layout to be mobile responsive
+# compress gzip / brotli encodes callback responses and assets through Flask-Compress
 app = dash.Dash(__name__,
                 external_stylesheets=external_stylesheets,
                 suppress_callback_exceptions=True,
+                compress=True,
                 meta_tags=[{'name': 'viewport',
                             'content': 'width=device-width, initial-scale=1.0'}]
                 )
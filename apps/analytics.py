@@ -24,20 +24,17 @@ Date Published: 30 January 2023
 This is the script that performs the data analysis and returns the html displaying the results
 """
 import dash
-import pandas as pd
-from dash import html, dcc, callback
-from dash.dependencies import Input, Output, State
+from dash import html, dcc, callback, clientside_callback
+from dash.dependencies import Input, Output, State, ClientsideFunction
 from dash.exceptions import PreventUpdate
-from pathlib import Path
-from helpers import bank_csv_to_data_frame, filter_by_date_range, \
-    filter_by_incoming_payments, filter_by_outgoing_payments, new_graph, \
-    filter_by_amount, filter_by_min_max, isolate_keywords, remove_keywords, \
-    update_json_output, calculate_top_repeat_transactions, data_frame_to_table, calculate_top_single_payments
-
-PATH = Path(__file__).parent
-DATA_PATH = PATH.joinpath("../datasets").resolve()
-DEFAULT_CSV_FILE = DATA_PATH.joinpath('transactions.csv').resolve()
-DEFAULT_TOP_LIST_LENGTH = 20
+from helpers import new_graph, update_json_output, data_frame_to_table
+from recurring import detect_recurring_transactions
+from categories import category_names
+from query_plan import build_filter_plan, execute_plan, plan_digest
+from anomalies import build_summaries, flag_anomalies, anomalies_table
+from pipeline import DEFAULT_TOP_LIST_LENGTH, analytics_reports, load_data_set, monthly_spend_table
+from budgets import check_budgets
+from fx import DEFAULT_CURRENCY, currency_names
 
 GRAPH_STYLE = {'plot_bgcolor': '#fff1d2', 'paper_bgcolor': '#fff1d2', 'font': {'color': '#212121'}}
 
@@ -64,6 +61,7 @@ KEYWORD_FILTER = html.Div([html.Div(html.H3(children='Keyword(s)'), style={'marg
                                dcc.Input(
                                    className='keyword-filter-input',
                                    id='input-keyword-isolate',
+                                   debounce=True,
                                    type='text',
                                    placeholder='isolate by keyword, seperated by ","'),
                                style={'width': '100%', 'marginBottom': '-2.5%'}),
@@ -72,16 +70,41 @@ KEYWORD_FILTER = html.Div([html.Div(html.H3(children='Keyword(s)'), style={'marg
                                dcc.Input(
                                    className='keyword-filter-input',
                                    id='input-keyword-remove',
+                                   debounce=True,
                                    type='text',
                                    placeholder='remove by keyword, seperated by ","'),
                                style={'width': '100%'})])
 
+CATEGORY_FILTER = html.Div([html.Div(html.H3(children='Categories'), style={'marginBottom': '-5%'}),
+                            html.Div(
+                                dcc.Dropdown(
+                                    className='category-filter-dropdown',
+                                    id='category-filter',
+                                    options=[{'label': name, 'value': name} for name in category_names()],
+                                    value=[],
+                                    multi=True,
+                                    placeholder='all categories...'),
+                                style={'width': '100%'})])
+
+CURRENCY_FILTER = html.Div([html.Div(html.H3(children='Currency'), style={'marginBottom': '-5%'}),
+                            html.Div(
+                                dcc.Dropdown(
+                                    className='category-filter-dropdown',
+                                    id='base-currency',
+                                    options=[{'label': name, 'value': name} for name in currency_names()],
+                                    value=DEFAULT_CURRENCY,
+                                    clearable=False,
+                                    persistence=True,
+                                    persistence_type='session'),
+                                style={'width': '100%'})])
+
 SAVINGS_FILTER = html.Div([html.Div(html.H3(children='Savings'), style={'marginBottom': '-5%'}),
                            html.Div(html.H4(children='Account Number'), style={'marginBottom': '-5%'}),
                            html.Div(
                                dcc.Input(
                                    className='savings-filter-input',
                                    id='input-savings-account-number',
+                                   debounce=True,
                                    type='text',
                                    placeholder='savings account number...'),
                                style={'width': '100%', 'marginBottom': '-2.5%'})])
@@ -106,12 +129,14 @@ MIN_MAX_FILTER = html.Div([html.Div(html.H3(children='Amount'),
                                    dcc.Input(
                                        className='minimum-filter-input',
                                        id='minimum-input',
+                                       debounce=True,
                                        type='number',
                                        placeholder='Min',
                                        style={'marginRight': '10px'}),
                                    dcc.Input(
                                        className='maximum-filter-input',
                                        id='maximum-input',
+                                       debounce=True,
                                        type='number',
                                        placeholder='Max')])])
 
@@ -147,11 +172,18 @@ layout = html.Div(
                  children=[
                      html.Div(className='main-graph-frame',
                               id='main-graph',
-                              children=[]),
+                              children=[dcc.Graph(id='bank-graph', className='main-graph-figure'),
+                                        # the graph type and the figures it is drawn from live in the browser
+                                        dcc.Store(id='graph-type', data='bar'),
+                                        dcc.Store(id='figure-store'),
+                                        # key of the filter state last computed, repeats are not recomputed
+                                        dcc.Store(id='last-filter-key')]),
                      html.Div(className='right-column-frame',
                               children=[DATE_RANGE_HEADER,
                                         DATE_RANGE_PICKER,
                                         KEYWORD_FILTER,
+                                        CATEGORY_FILTER,
+                                        CURRENCY_FILTER,
                                         SAVINGS_FILTER,
                                         IN_OUT_FILTER,
                                         MIN_MAX_FILTER,
@@ -163,6 +195,7 @@ layout = html.Div(
             dcc.Input(
                 className='top-list-length-input',
                 id='top-list-length',
+                debounce=True,
                 type='number',
                 placeholder='20',
                 style={'marginLeft': '10px'})
@@ -179,68 +212,66 @@ layout = html.Div(
                      html.Div([html.H3(id='top-single-out-title', children='Top 20 Single Outgoing',
                                        className='table-title'),
                                html.Div(id='single-out-table', children=[], className='table')])
+                 ]),
+        html.Div(id='insight-table-container',
+                 className='tables-outer',
+                 children=[
+                     html.Div([html.H3(children='Subscriptions & Recurring Payments', className='table-title'),
+                               html.Div(id='subscriptions-table', children=[], className='table')]),
+                     html.Div([html.H3(children='Spending by Category', className='table-title'),
+                               html.Div(id='category-table', children=[], className='table')]),
+                     html.Div([html.H3(children='Unusual Transactions', className='table-title'),
+                               html.Div(id='anomalies-table', children=[], className='table')]),
+                     html.Div([html.H3(id='budgets-title', children='Budgets', className='table-title'),
+                               html.Div(id='budgets-table', children=[], className='table')])
                  ])
     ])
 
 
-@callback(
+# pure UI interactions run in the browser, see assets/clientside.js
+clientside_callback(
+    ClientsideFunction(namespace='analytics', function_name='clear_date_range'),
     Output('date-range-picker', 'start_date'),
     Output('date-range-picker', 'end_date'),
-    [Input('btn-clear-date', 'n_clicks')],
-    [State('date-range-picker', 'start_date')],
-    [Input('btn-clear-date', 'n_clicks')],
-    [State('date-range-picker', 'end_date')])
-def clear_date_range(start_clicks, current_start_date, end_clicks, current_end_date):
-    if (start_clicks is not None) and (start_clicks > 0) or (end_clicks is not None) and (end_clicks > 0):
-        return None, None
-    elif not end_clicks:
-        return current_start_date, current_end_date
-
-
-def determine_figure_type(trigger_id, in_out):
-    if trigger_id == 'btn-bar-graph':
-        return 'bar'
-    elif trigger_id == 'btn-funnel-graph':
-        return 'funnel'
-    elif trigger_id == 'btn-line-graph':
-        return 'line'
-    elif trigger_id == 'btn-bubble-graph' and len(in_out) == 1:
-        return 'bubble'
-    return 'bar'
-
-
-def apply_filters_to_dataframe(df, in_out, key_remove, key_isolate, minimum, maximum):
-    if len(in_out) == 1:
-        if in_out[0] == 'paid_in':
-            df = filter_by_incoming_payments(df)
-        elif in_out[0] == 'paid_out':
-            df = filter_by_outgoing_payments(df)
-
-    if key_remove and not key_isolate:
-        keywords = key_remove.split(',')
-        df = remove_keywords(df, keywords)
-    elif key_isolate and not key_remove:
-        keywords = key_isolate.split(',')
-        df = isolate_keywords(df, keywords)
-
-    if minimum and maximum:
-        df = filter_by_min_max(df, minimum, maximum)
-    elif minimum:
-        df = filter_by_amount(df, minimum, True, False)
-    elif maximum:
-        df = filter_by_amount(df, maximum, False, True)
-    return df
+    Input('btn-clear-date', 'n_clicks'))
+
+clientside_callback(
+    ClientsideFunction(namespace='analytics', function_name='select_graph_type'),
+    Output('graph-type', 'data'),
+    Input('btn-bar-graph', 'n_clicks'),
+    Input('btn-funnel-graph', 'n_clicks'),
+    Input('btn-line-graph', 'n_clicks'),
+    Input('btn-bubble-graph', 'n_clicks'))
+
+# bar, bubble and funnel graphs are restyled from the bar figure, the line graph is sent with it
+clientside_callback(
+    ClientsideFunction(namespace='analytics', function_name='render_graph'),
+    Output('bank-graph', 'figure'),
+    Input('graph-type', 'data'),
+    Input('figure-store', 'data'),
+    State('in-out-selection', 'value'))
+
+
+def apply_filters_to_dataframe(df, in_out, key_remove, key_isolate, minimum, maximum, categories=None):
+    # the filters run as one plan, evaluated with a single fused mask and cached per data set
+    plan = build_filter_plan(in_out=in_out, key_remove=key_remove, key_isolate=key_isolate,
+                             minimum=minimum, maximum=maximum, categories=categories)
+    return execute_plan(plan, df)
 
 
 @callback(
-    [Output('main-graph', 'children'),
+    [Output('figure-store', 'data'),
      Output('output-container-div', 'children'),
      Output('multi-buy-table', 'children'),
      Output('single-in-table', 'children'),
      Output('single-out-table', 'children'),
      Output('top-single-in-title', 'children'),
      Output('top-single-out-title', 'children'),
-     Output('top-repeat-title', 'children')],
+     Output('top-repeat-title', 'children'),
+     Output('subscriptions-table', 'children'),
+     Output('category-table', 'children'),
+     Output('anomalies-table', 'children'),
+     Output('last-filter-key', 'data')],
     [Input('data-set', 'data'),
      Input('date-range-picker', 'start_date'),
      Input('date-range-picker', 'end_date'),
@@ -249,74 +280,109 @@ def apply_filters_to_dataframe(df, in_out, key_remove, key_isolate, minimum, max
      Input('input-keyword-isolate', 'value'),
      Input('minimum-input', 'value'),
      Input('maximum-input', 'value'),
-     Input('btn-bar-graph', 'n_clicks'),
-     Input('btn-funnel-graph', 'n_clicks'),
-     Input('btn-line-graph', 'n_clicks'),
-     Input('btn-bubble-graph', 'n_clicks'),
      Input('input-savings-account-number', 'value'),
-     Input('top-list-length', 'value')]
+     Input('top-list-length', 'value'),
+     Input('category-filter', 'value'),
+     Input('base-currency', 'value')],
+    [State('last-filter-key', 'data'),
+     State('data-aggregates', 'data')]
 )
 def update_graph(data, start_date, end_date, in_out, key_remove, key_isolate,
-                 minimum, maximum, bar_gr, funnel_gr, line_gr, scatter_gr,
-                 savings, top_list_length):
+                 minimum, maximum, savings, top_list_length, categories, currency, last_filter_key, aggregates):
     ctx = dash.callback_context
     if not ctx.triggered:
         raise PreventUpdate
-    # load default CSV file if no data is provided
-    if not data:
-        data_frame = bank_csv_to_data_frame(DEFAULT_CSV_FILE)
-    else:
-        # reset the index as we had to convert the data frame to a dictionary to store it in the dcc.Upload component
-        data_frame = pd.DataFrame(data)
-        data_frame['Date'] = data_frame['Date'].apply(pd.to_datetime, dayfirst=True)
-        data_frame.set_index('Date', inplace=True)
-
-    # keep a copy of the original data frame
-    original_df = data_frame.copy()
 
+    # the whole filter state as one plan, run by pandas / numexpr or pushed down to SQL
+    plan = build_filter_plan(start_date, end_date, in_out, key_remove, key_isolate, minimum, maximum, categories)
+
+    # equivalent filter states give equal plans, eg. 'tesco' and 'tesco,', so an edit that changes nothing is
+    # not recomputed, a new data set always is
+    filter_key = plan_digest(plan, savings, top_list_length, currency)
+    data_changed = any(trigger['prop_id'] == 'data-set.data' for trigger in ctx.triggered)
+    if filter_key == last_filter_key and not data_changed:
+        raise PreventUpdate
+
+    results = None
     try:
-        trigger_id = ctx.triggered[0]["prop_id"].split(".")[0]
         top_list_length = top_list_length or DEFAULT_TOP_LIST_LENGTH
 
-        # apply date range filter first
-        if start_date and end_date:
-            data_frame = filter_by_date_range(data_frame, start_date, end_date)
+        # the session's data set, the database (with the filters pushed down to SQL) or the demo data, through the
+        # same cached pipeline as the JSON API, amounts converted to the base currency
+        results = analytics_reports(plan, top_list_length, data, aggregates, currency)
+        original_df, data_frame = results['history'], results['transactions']
 
-        # calculate top payments lists
-        top_repeat_payments = calculate_top_repeat_transactions(data_frame, top_list_length)
-
-        top_single_payments_out, top_single_payments_in = calculate_top_single_payments(data_frame,
-                                                                                        top_list_length)
-        top_repeat_payments_table = data_frame_to_table(top_repeat_payments)
-        top_single_out_table = data_frame_to_table(top_single_payments_out)
-        top_single_in_table = data_frame_to_table(top_single_payments_in)
+        top_repeat_payments_table = data_frame_to_table(results['top_repeat'])
+        top_single_out_table = data_frame_to_table(results['top_single_out'])
+        top_single_in_table = data_frame_to_table(results['top_single_in'])
 
         single_in_title = f'Top {top_list_length} Single Incoming'
         single_out_title = f'Top {top_list_length} Single Outgoing'
         repeat_title = f'Top {top_list_length} Repeat Transactions'
 
-        # apply filters
-        data_frame = apply_filters_to_dataframe(data_frame, in_out,
-                                   key_remove, key_isolate,
-                                   minimum, maximum)
-
-        # determine graph type
-        figure_type = determine_figure_type(trigger_id, in_out)
+        # recurring payments are detected over the whole history, cached per data set or database version
+        recurring = results['recurring']
+        subscriptions_table = data_frame_to_table(recurring if recurring is not None
+                                                  else detect_recurring_transactions(original_df))
+
+        # grouped by the category assigned at ingest, no text scan needed
+        category_table = data_frame_to_table(results['categories'])
+
+        # amounts are judged against their payee / category over the whole history, the database and the session
+        # aggregates keep these statistics up to date as statements are added, otherwise they are built once per
+        # data set
+        anomaly_summaries = results['anomaly_summaries'] or build_summaries(original_df)
+        signed_data_frame = data_frame
+        if plan.direction == 'out':
+            signed_data_frame = data_frame.assign(Amount=-data_frame['Amount'])
+        unusual = flag_anomalies(signed_data_frame, anomaly_summaries)
+        if plan.direction == 'out':
+            unusual = unusual.assign(Amount=unusual['Amount'].abs(), Typical=unusual['Typical'].abs())
+        anomalies_output = data_frame_to_table(anomalies_table(unusual))
 
         # get the output for balance and savings report (bottom right sidebar)
-        balance_output = update_json_output(data_frame, in_out, savings)
+        totals = tuple(int(total) for total in results['totals'].loc[0, ['In', 'Out']])
+        balance_output = update_json_output(data_frame, in_out, savings, totals)
+
+        # outgoing payments were made positive by the filter, the line graph's time series needs them signed
+        line_data_frame = results['daily'] if results['daily'] is not None else signed_data_frame
 
-        figure = new_graph(data_frame, figure_type, GRAPH_STYLE)
+        # the browser switches between graph types without calling back, see assets/clientside.js
+        figures = {'bar': new_graph(data_frame, 'bar', GRAPH_STYLE, highlight=unusual),
+                   'line': new_graph(line_data_frame, 'line', GRAPH_STYLE)}
 
-        graph = dcc.Graph(id='bank-graph', figure=figure, className='main-graph-figure')
-        return (graph, balance_output, top_repeat_payments_table, top_single_in_table,
-                top_single_out_table, single_in_title, single_out_title, repeat_title)
+        return (figures, balance_output, top_repeat_payments_table, top_single_in_table,
+                top_single_out_table, single_in_title, single_out_title, repeat_title, subscriptions_table,
+                category_table, anomalies_output, filter_key)
 
     except Exception as e:
         error_message = f"An error occurred: {e}. Displaying original data."
 
-        # fallback to a graph of the original data frame
+        # fallback to a graph of the original data frame, or of the filtered rows when the database answered
+        original_df = load_data_set(data) if not results else \
+            results['history'] if results['history'] is not None else results['transactions']
         figure = new_graph(original_df, 'bar', GRAPH_STYLE)
-        graph = dcc.Graph(id='bank-graph', figure=figure, className='main-graph-figure')
 
-        return graph, error_message, '', '', '', '', '', ''
+        return {'bar': figure, 'line': figure}, error_message, '', '', '', '', '', '', '', '', '', None
+
+
+@callback(
+    [Output('budgets-table', 'children'),
+     Output('budgets-title', 'children')],
+    [Input('data-set', 'data'),
+     Input('date-range-picker', 'end_date')],
+    [State('data-aggregates', 'data')]
+)
+def update_budgets(data, end_date, aggregates):
+    # budgets are checked for the month the date range ends in, or the latest month, and ignore the other filters
+    try:
+        month, budgets = check_budgets(monthly_spend_table(data, aggregates),
+                                       str(end_date)[:7] if end_date else None)
+        if budgets.empty:
+            return '', 'Budgets'
+
+        alerts = int((budgets['Status'] != 'ok').sum())
+        return data_frame_to_table(budgets), f'Budgets {month}' + (f' ({alerts} alerts)' if alerts else '')
+
+    except Exception as e:
+        return f'An error occurred checking budgets: {e}', 'Budgets'
@@ -24,8 +24,11 @@ Date Published: 30 January 2023
 This upload page is displayed as the main page when the app loads in the browser
 The user can either upload their own csv files or click view analytics to load a demo data set
 """
+import dash
 from dash import html, dcc, callback, Output, Input, State
 from helpers import verify_upload
+from incremental import append_statement
+from storage import store_statement
 
 
 UPLOAD_SECTION = dcc.Upload(
@@ -58,6 +61,12 @@ layout = html.Div([
                          html.Plaintext(children=LANDING_PAGE_BODY_TEXT, className='text-main'),
                          html.Plaintext(children=LANDING_PAGE_BOTTOM_TEXT, className='text-main-bottom'),
                          html.Div(UPLOAD_SECTION, className='button-select'),
+                         dcc.Checklist(id='append-mode',
+                                       options=[{'label': ' add to loaded data', 'value': 'append'}],
+                                       value=[],
+                                       persistence=True,
+                                       persistence_type='session',
+                                       className='append-mode-checklist'),
                          html.Plaintext(id='txt-status', children='File Loaded...', className='text-status'),
                          dcc.Link('view analytics', href='/analytics', className='button-analytics')
                      ], className='body-container')
@@ -71,22 +80,42 @@ layout = html.Div([
 
 @callback(Output('txt-status', 'children'),
           Output('data-set', 'data'),
+          Output('data-aggregates', 'data'),
+          Output('data-statistics', 'data'),
           Output('csv-output-title', 'children'),
           Output('csv-output', 'children'),
           Input('upload-data', 'contents'),
           State('upload-data', 'filename'),
-          State('upload-data', 'last_modified'))
-def display_page(contents, filename, last_modified):
+          State('upload-data', 'last_modified'),
+          State('append-mode', 'value'),
+          State('data-set', 'data'),
+          State('data-aggregates', 'data'),
+          State('data-statistics', 'data'))
+def display_page(contents, filename, last_modified, append_mode, data, aggregates, statistics):
     if not filename:
-        return 'select file...', '', '', ''
+        # the loaded data is kept for the next statement in append mode, otherwise the demo data is shown
+        if append_mode:
+            return 'select file...', dash.no_update, dash.no_update, dash.no_update, '', ''
+        return 'select file...', '', None, None, '', ''
 
     content_type, content_string = contents.split(',')
 
     # verify upload returns [0 or 1, error message or decoded csv]
-    result = verify_upload(filename, content_string)
+    # payee names and categories are only derived for the rows that turn out to be new
+    result = verify_upload(filename, content_string, derive_columns=False)
     if result[0]:
-        df_dict = result[1].reset_index().to_dict('records')
-        return 'loaded csv file', df_dict, '', ''
+        # in append mode the statement is added to the loaded data, otherwise it replaces it
+        loaded = data if append_mode and data else None
+        data, aggregates, statistics, new_rows = append_statement(loaded, aggregates, statistics, result[1])
+
+        # keep the statement in the local database too, when the database backend is enabled
+        store_statement(new_rows)
+
+        if loaded:
+            status = f'added {len(new_rows)} new transactions, {len(result[1]) - len(new_rows)} already loaded'
+        else:
+            status = 'loaded csv file'
+        return status, data, aggregates, statistics, '', ''
     else:
         example_string = 'Date,Details,Amount\n29/11/2023,John Spartan,32.95\n' \
                          '29/11/2023,John Spartan,-45.90\n29/11/2023,Simon Pheonix,-11.68\n' \
@@ -95,4 +124,6 @@ def display_page(contents, filename, last_modified):
                          '28/11/2023,Ben Richards,-3.97\n28/11/2023,Harley Stone,-6.18\n' \
                          '28/11/2023,Nada,140.00\n28/11/2023,Leon,-1.20\n' \
                          '28/11/2023,Douglas Quaid,-2.49\n28/11/2023,John Matrix,-1.59'
-        return result[1], '', 'CSV Example:', example_string
+        if append_mode:
+            return result[1], dash.no_update, dash.no_update, dash.no_update, 'CSV Example:', example_string
+        return result[1], '', None, None, 'CSV Example:', example_string
@@ -0,0 +1,106 @@
+/*
+Clientside callbacks for the analytics page, see apps/analytics.py
+
+Pure UI interactions run here in the browser instead of costing a server round-trip:
+- clearing the date range
+- choosing the graph type, bar / bubble / funnel graphs are restyled from the bar figure the browser already has,
+  the line graph's period aggregates are sent by the server alongside it
+*/
+
+// plotly may send numeric arrays base64 encoded as {dtype, bdata}
+const TYPED_ARRAYS = {
+    f8: Float64Array, f4: Float32Array,
+    i1: Int8Array, u1: Uint8Array, i2: Int16Array, u2: Uint16Array, i4: Int32Array, u4: Uint32Array
+};
+
+function toArray(values) {
+    if (!values || Array.isArray(values) || !values.bdata) {
+        return values || [];
+    }
+    const bytes = Uint8Array.from(atob(values.bdata), c => c.charCodeAt(0));
+    return Array.from(new TYPED_ARRAYS[values.dtype](bytes.buffer));
+}
+
+function bubbleFigure(bar) {
+    // overlays such as the unusual transaction markers are kept as they are
+    const data = bar.data.map(trace => {
+        if (trace.type !== 'bar') {
+            return trace;
+        }
+        const amounts = toArray(trace.y);
+        const sizes = amounts.map(Math.abs);
+        const largest = sizes.reduce((a, b) => Math.max(a, b), 1);
+        return {
+            type: 'scatter', mode: 'markers',
+            x: trace.x, y: amounts, customdata: trace.customdata, hovertemplate: trace.hovertemplate,
+            xaxis: trace.xaxis, yaxis: trace.yaxis, showlegend: false,
+            // the sizing plotly express uses for a bubble graph, 20px for the largest amount
+            marker: {color: amounts, coloraxis: trace.marker.coloraxis, size: sizes,
+                     sizemode: 'area', sizeref: largest / (20 ** 2), symbol: 'circle'}
+        };
+    });
+    const layout = Object.assign({}, bar.layout);
+    delete layout.barmode;
+    return {data: data, layout: layout};
+}
+
+function funnelFigure(bar) {
+    // one trace per payee, in order of first appearance, coloured from the template's colorway
+    const groups = new Map();
+    bar.data.filter(trace => trace.type === 'bar').forEach(trace => {
+        const amounts = toArray(trace.y);
+        const dates = toArray(trace.x);
+        (trace.customdata || []).forEach((row, i) => {
+            const details = row[0];
+            if (!groups.has(details)) {
+                groups.set(details, {type: 'funnel', name: details, legendgroup: details, orientation: 'v',
+                                     showlegend: true, x: [], y: [], customdata: [],
+                                     hovertemplate: trace.hovertemplate});
+            }
+            const group = groups.get(details);
+            group.x.push(dates[i]);
+            group.y.push(amounts[i]);
+            group.customdata.push(row);
+        });
+    });
+    const layout = Object.assign({}, bar.layout, {legend: {title: {text: 'Details'}, tracegroupgap: 0}});
+    delete layout.coloraxis;
+    delete layout.barmode;
+    return {data: Array.from(groups.values()), layout: layout};
+}
+
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    analytics: {
+        clear_date_range: function (n_clicks) {
+            if (!n_clicks) {
+                throw window.dash_clientside.PreventUpdate;
+            }
+            return [null, null];
+        },
+
+        select_graph_type: function () {
+            const triggered = window.dash_clientside.callback_context.triggered;
+            if (!triggered.length || !triggered[0].value) {
+                throw window.dash_clientside.PreventUpdate;
+            }
+            return triggered[0].prop_id.split('.')[0].replace('btn-', '').replace('-graph', '');
+        },
+
+        render_graph: function (graph_type, figures, in_out) {
+            if (!figures) {
+                throw window.dash_clientside.PreventUpdate;
+            }
+            if (graph_type === 'line') {
+                return figures.line;
+            }
+            // bubble sizes need amounts of one sign, so it is only offered for paid in or paid out alone
+            if (graph_type === 'bubble' && in_out && in_out.length === 1) {
+                return bubbleFigure(figures.bar);
+            }
+            if (graph_type === 'funnel') {
+                return funnelFigure(figures.bar);
+            }
+            return figures.bar;
+        }
+    }
+});
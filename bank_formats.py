@@ -0,0 +1,308 @@
+"""
+Bank Statement Analysis Plotly Dash App
+
+This is a Plotly Dash app that analyses bank statements and provides various visualizations to help users understand
+their spending habits.
+
+It uses the following technologies and libraries:
+- Python 3.7
+- Plotly Dash
+- Pandas
+- Numpy
+
+The app is intended for educational or demonstration purposes only and should not be used in a production environment
+without further testing and security measures.
+
+To run the app, you will need to have Python and the required libraries installed.
+You can run the app by running the command 'python, python3, or py (depending on your setup) index.py' in the terminal.
+
+This project is released under the MIT License.
+
+Author: @10XTMY, Molmez LTD (www.molmez.io)
+Date Published: 30 January 2023
+
+These are the bank CSV adapters used by helpers.py to map the many bank export layouts onto the canonical
+Date, Details, Amount schema
+"""
+import csv
+import re
+import numpy as np
+import pandas as pd
+
+# registered adapters, see register_adapter()
+ADAPTERS = []
+
+# formats tried by detect_date_format(), day-first before month-first so that the old dayfirst=True
+# behaviour wins when a file really is ambiguous
+DATE_FORMATS = ['%d/%m/%Y', '%m/%d/%Y', '%Y-%m-%d', '%d-%m-%Y', '%m-%d-%Y', '%d.%m.%Y', '%Y/%m/%d',
+                '%d/%m/%y', '%m/%d/%y', '%d %b %Y', '%d-%b-%Y', '%d %B %Y', '%b %d, %Y',
+                '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d %H:%M:%S', '%Y-%m-%dT%H:%M:%S.%f']
+DATE_SAMPLE_SIZE = 250
+
+# delimiters tried when sniffing a file, and how much of it is read to do so
+DELIMITERS = ',;\t|'
+SNIFF_SIZE = 4096
+
+
+def _normalise_column(name):
+    return str(name).strip().lower()
+
+
+def register_adapter(name, date, details, amount=None, debit=None, credit=None,
+                     date_format=None, decimal=None, sep=None, currency='Currency'):
+    """
+    Registers a bank CSV layout that can be mapped onto the canonical Date, Details, Amount schema.
+    Either a signed 'amount' column or a pair of unsigned 'debit' and 'credit' columns must be given.
+    The currency column is optional, a file without it is in one currency (see fx.py).
+    :param name: short name of the layout.
+    :param date: name of the date column.
+    :param details: name of the transaction description column.
+    :param amount: name of the signed amount column.
+    :param debit: name of the money out column.
+    :param credit: name of the money in column.
+    :param date_format: explicit strptime format of the date column, None to detect it.
+    :param decimal: decimal mark used in the amount columns, None to detect it from the amounts.
+    :param sep: field delimiter of the file, None to sniff it.
+    :param currency: name of the optional column of currency codes, eg. EUR.
+    :return: the registered adapter dictionary.
+    """
+    if not amount and not (debit and credit):
+        raise ValueError(f"Adapter '{name}' needs an amount column or both debit and credit columns.")
+
+    adapter = {'name': name,
+               'date': date,
+               'details': details,
+               'amount': amount,
+               'debit': debit,
+               'credit': credit,
+               'date_format': date_format,
+               'decimal': decimal,
+               'sep': sep,
+               'currency': currency}
+    # required columns, the optional currency column does not take part in matching a header
+    adapter['columns'] = [col for col in (date, details, amount, debit, credit) if col]
+
+    ADAPTERS.append(adapter)
+    return adapter
+
+
+register_adapter('canonical', 'Date', 'Details', amount='Amount')
+register_adapter('description_amount', 'Date', 'Description', amount='Amount')
+register_adapter('debit_credit', 'Date', 'Description', debit='Debit', credit='Credit')
+register_adapter('money_in_out', 'Date', 'Description', debit='Money Out', credit='Money In')
+register_adapter('paid_in_out', 'Date', 'Details', debit='Paid Out', credit='Paid In')
+register_adapter('transaction_debit_credit', 'Transaction Date', 'Transaction Description',
+                 debit='Debit Amount', credit='Credit Amount', date_format='%d/%m/%Y')
+register_adapter('posting_date', 'Posting Date', 'Description', amount='Amount', date_format='%m/%d/%Y')
+
+
+def find_adapter(header, sep=None):
+    """
+    Sniffs a CSV header and returns the adapter that maps it onto the canonical schema.
+    Extra columns are ignored, column names are matched case-insensitively and the adapter using the
+    most columns wins so that specific layouts take precedence over generic ones.
+    :param header: list of column names.
+    :param sep: delimiter the header was read with, adapters declaring another delimiter are skipped.
+    :return: adapter dictionary or None if the layout is not supported.
+    """
+    header = {_normalise_column(col) for col in header}
+
+    best_match = None
+    for adapter in ADAPTERS:
+        if sep and adapter['sep'] and adapter['sep'] != sep:
+            continue
+        if all(_normalise_column(col) in header for col in adapter['columns']):
+            if best_match is None or len(adapter['columns']) > len(best_match['columns']):
+                best_match = adapter
+
+    return best_match
+
+
+def supported_layouts():
+    """
+    Describes the registered layouts for error messages.
+    :return: string.
+    """
+    return ' | '.join(', '.join(adapter['columns']) for adapter in ADAPTERS)
+
+
+def detect_delimiter(csv_input):
+    """
+    Sniffs the field delimiter of a CSV from its header line, rewinding file objects so they can be read again.
+    :param csv_input: path or file-like object.
+    :return: delimiter, ',' when the sample is not conclusive.
+    """
+    if hasattr(csv_input, 'read'):
+        sample = csv_input.read(SNIFF_SIZE)
+        csv_input.seek(0)
+    else:
+        with open(csv_input, 'r', encoding='utf-8-sig', newline='') as f:
+            sample = f.read(SNIFF_SIZE)
+    if isinstance(sample, bytes):
+        sample = sample.decode('utf-8-sig', errors='replace')
+
+    # only the header line is sniffed, amounts such as 1.234,50 would make ',' look like a delimiter of every row
+    header = sample.splitlines()[0] if sample else ''
+    try:
+        return csv.Sniffer().sniff(header, delimiters=DELIMITERS).delimiter
+    except csv.Error:
+        return ','
+
+
+def sniff_adapter(csv_input):
+    """
+    Finds the adapter for a CSV file, reading its header with the delimiter the file actually uses.
+    :param csv_input: path or file-like object positioned at the start of the file.
+    :return: adapter dictionary or None if the layout is not supported.
+    """
+    sep = detect_delimiter(csv_input)
+    return find_adapter(read_header(csv_input, sep), sep)
+
+
+def read_header(csv_input, sep=','):
+    """
+    Reads only the header row of a CSV, rewinding file objects so they can be read again.
+    :param csv_input: path or file-like object.
+    :param sep: field delimiter.
+    :return: list of column names.
+    """
+    header = pd.read_csv(csv_input, nrows=0, sep=sep).columns.tolist()
+    if hasattr(csv_input, 'seek'):
+        csv_input.seek(0)
+    return header
+
+
+def detect_decimal_mark(values):
+    """
+    Picks the decimal mark of formatted amount strings: the separator followed by one or two digits at the end
+    of an amount, eg. the ',' of '1.234,50', by majority over the column. '1,234' and '1.234' give no evidence.
+    :param values: pandas Series of strings.
+    :return: '.' or ','.
+    """
+    marks = values.dropna().astype(str).str.extract(r'([.,])\d{1,2}\)?\s*$')[0].value_counts()
+    return ',' if marks.get(',', 0) > marks.get('.', 0) else '.'
+
+
+def clean_numeric(values, decimal='.'):
+    """
+    Converts formatted amount strings such as '£1,234.50', '1.234,50' or '(12.00)' to floats.
+    Everything except digits, the decimal mark, signs and parentheses is stripped in a single vectorized pass.
+    :param values: pandas Series of strings.
+    :param decimal: decimal mark used in the strings.
+    :return: float pandas Series, blanks become NaN.
+    """
+    cleaned = values.str.replace(f'[^0-9{re.escape(decimal)}()+-]', '', regex=True)
+
+    # accounting style negatives, eg. (12.00)
+    cleaned = cleaned.str.replace(r'^\((.*)\)$', r'-\1', regex=True)
+
+    if decimal != '.':
+        cleaned = cleaned.str.replace(decimal, '.', regex=False)
+
+    # always float, whole number amounts such as '2500' are still major units
+    return pd.to_numeric(cleaned.mask(cleaned == ''), errors='raise').astype('float64')
+
+
+def _parses_with_format(values, date_format):
+    return pd.to_datetime(values, format=date_format, errors='coerce').notna().all()
+
+
+def _disorder(values, date_format):
+    """
+    Counts how far a column is from being sorted when parsed with the given format.
+    Statements are listed in date order, so the right format gives the more ordered column.
+    """
+    steps = np.diff(pd.to_datetime(values, format=date_format).to_numpy().astype('int64'))
+    return min((steps < 0).sum(), (steps > 0).sum())
+
+
+def detect_date_format(values, sample_size=DATE_SAMPLE_SIZE):
+    """
+    Picks an explicit strptime format for a column of date strings.
+    A spread sample of the unique strings is tested against DATE_FORMATS first, all unique strings are only
+    checked when more than one format fits the sample. A format that is still ambiguous, eg. when no day is
+    above 12, is settled by which reading keeps the statement in date order, then by day-first.
+    :param values: pandas Series of date strings.
+    :param sample_size: number of unique strings to test before widening the check.
+    :return: strptime format string.
+    """
+    # unique strings keep their order of appearance, which is all _disorder() needs
+    uniques = pd.Series(pd.unique(values.dropna())).str.strip()
+    if uniques.empty:
+        raise ValueError('no dates found to detect the date format from')
+
+    # spread the sample over the whole file rather than taking the first rows
+    step = max(len(uniques) // sample_size, 1)
+    sample = uniques.iloc[::step]
+
+    candidates = [fmt for fmt in DATE_FORMATS if _parses_with_format(sample, fmt)]
+    if len(candidates) > 1 and len(sample) < len(uniques):
+        candidates = [fmt for fmt in candidates if _parses_with_format(uniques, fmt)]
+
+    if not candidates:
+        raise ValueError(f"unrecognised date format, eg. '{uniques.iloc[0]}'")
+
+    if len(candidates) > 1:
+        candidates = sorted(candidates, key=lambda fmt: _disorder(uniques, fmt))
+
+    return candidates[0]
+
+
+def parse_dates(values, date_format=None):
+    """
+    Parses a date column with an explicit format so pandas stays on its C fast path.
+    Each unique date string is only detected and parsed once, statements repeat the same date on many rows.
+    :param values: pandas Series of date strings.
+    :param date_format: strptime format, detected from the values if not given.
+    :return: datetime64 pandas Series.
+    """
+    codes, uniques = pd.factorize(values)
+    uniques = pd.Series(uniques).str.strip()
+
+    if date_format is None:
+        date_format = detect_date_format(uniques)
+
+    parsed = pd.to_datetime(uniques, format=date_format).to_numpy()
+
+    # missing dates have code -1, which picks the NaT appended to the end
+    parsed = np.append(parsed, np.datetime64('NaT', 'ns'))
+
+    return pd.Series(parsed[codes], index=values.index, name=values.name)
+
+
+def read_bank_csv(csv_input, adapter):
+    """
+    Reads a bank CSV with the C parser and maps it onto the canonical Date, Details, Amount schema.
+    :param csv_input: path or file-like object positioned at the start of the file.
+    :param adapter: adapter dictionary returned by find_adapter().
+    :return: pandas DataFrame with a datetime 'Date', string 'Details' and signed float 'Amount', and upper case
+        'Currency' codes if the file has a currency column.
+    """
+    # map the adapter's column names onto the names used in this file
+    sep = adapter['sep'] or detect_delimiter(csv_input)
+    header = read_header(csv_input, sep)
+    actual_names = {_normalise_column(col): col for col in header}
+    columns = {col: actual_names[_normalise_column(col)] for col in adapter['columns']}
+    if adapter['currency'] and _normalise_column(adapter['currency']) in actual_names:
+        columns[adapter['currency']] = actual_names[_normalise_column(adapter['currency'])]
+
+    raw = pd.read_csv(csv_input, sep=sep, usecols=list(columns.values()), dtype=str)
+
+    amount_columns = [columns[adapter[key]] for key in ('amount', 'debit', 'credit') if adapter[key]]
+    decimal = adapter['decimal'] or detect_decimal_mark(pd.concat([raw[col] for col in amount_columns]))
+
+    if adapter['amount']:
+        amount = clean_numeric(raw[columns[adapter['amount']]], decimal)
+    else:
+        credit = clean_numeric(raw[columns[adapter['credit']]], decimal).fillna(0)
+        debit = clean_numeric(raw[columns[adapter['debit']]], decimal).fillna(0)
+        amount = credit - debit.abs()
+
+    data_frame = pd.DataFrame({'Date': parse_dates(raw[columns[adapter['date']]], adapter['date_format']),
+                               'Details': raw[columns[adapter['details']]].fillna(''),
+                               'Amount': amount})
+    if adapter['currency'] in columns:
+        # blank codes are left missing, they are read as the default currency
+        currencies = raw[columns[adapter['currency']]].str.strip().str.upper()
+        data_frame['Currency'] = currencies.mask(currencies == '')
+    return data_frame
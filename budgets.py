@@ -0,0 +1,189 @@
+"""
+Bank Statement Analysis Plotly Dash App
+
+This is a Plotly Dash app that analyses bank statements and provides various visualizations to help users understand
+their spending habits.
+
+It uses the following technologies and libraries:
+- Python 3.7
+- Plotly Dash
+- Pandas
+- Numpy
+
+The app is intended for educational or demonstration purposes only and should not be used in a production environment
+without further testing and security measures.
+
+To run the app, you will need to have Python and the required libraries installed.
+You can run the app by running the command 'python, python3, or py (depending on your setup) index.py' in the terminal.
+
+This project is released under the MIT License.
+
+Author: @10XTMY, Molmez LTD (www.molmez.io)
+Date Published: 30 January 2023
+
+
+This is the budget tracking: monthly spending limits per category or keyword, checked against a per month spend table
+rather than the transactions themselves
+
+Budgets live in datasets/budgets.json as a list:
+    {"name": "Groceries", "category": "Groceries", "monthly": 400}                spend in a category
+    {"name": "Coffee", "keywords": ["starbucks", "costa"], "monthly": 60}          any keyword in the payee name
+    {"name": "Takeaway", "category": "Coffee & Eating Out", "keywords": ["deliveroo"], "monthly": 50, "alert": 0.75}
+Conditions in one budget must all match. "alert" is the share of the budget (default 0.8) at which it is flagged.
+
+The spend table holds outgoing amounts per (month, category, payee), a few rows per payee and month however many
+transactions there are. It is built once per data set, or kept up to date as statements are added by the database
+(see storage.py) or the session's aggregates (see incremental.py), and every budget is checked against it in one
+matrix product.
+"""
+import functools
+import json
+import re
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from cache import cached_on_data_frame
+from money import to_minor_units
+
+DEFAULT_BUDGETS_FILE = Path(__file__).parent.joinpath('datasets', 'budgets.json').resolve()
+DEFAULT_ALERT = 0.8
+
+SPEND_COLUMNS = ['Month', 'Category', 'Payee', 'Spend', 'Count']
+
+
+@functools.lru_cache(maxsize=8)
+def _compile_budgets(budgets_file, modified_time):
+    """
+    Reads and compiles the budgets file, cached until the file changes.
+    :param budgets_file: path string of the JSON budgets file.
+    :param modified_time: modification time of the file, part of the cache key.
+    :return: tuple of compiled budget dictionaries.
+    """
+    with open(budgets_file, 'r', encoding='utf-8') as f:
+        budgets = json.load(f)
+
+    compiled = []
+    for budget in budgets:
+        if not budget.get('monthly'):
+            raise ValueError(f'budget without a monthly amount: {budget}')
+        keywords = [re.escape(keyword) for keyword in budget.get('keywords', []) if keyword.strip()]
+        compiled.append({'name': budget.get('name') or budget.get('category') or ', '.join(budget['keywords']),
+                         'category': budget.get('category'),
+                         'pattern': re.compile('|'.join(keywords), re.IGNORECASE) if keywords else None,
+                         'limit': to_minor_units(budget['monthly']),
+                         'alert': float(budget.get('alert', DEFAULT_ALERT))})
+
+    return tuple(compiled)
+
+
+def load_budgets(budgets_file=DEFAULT_BUDGETS_FILE):
+    """
+    Loads the compiled budgets, a missing budgets file means no budgets.
+    :param budgets_file: path of the JSON budgets file.
+    :return: tuple of compiled budget dictionaries.
+    """
+    budgets_file = Path(budgets_file)
+    if not budgets_file.exists():
+        return ()
+    return _compile_budgets(str(budgets_file), budgets_file.stat().st_mtime)
+
+
+def month_keys(dates):
+    """
+    :param dates: DatetimeIndex or datetime64 values.
+    :return: numpy array of 'YYYY-MM' strings.
+    """
+    return np.asarray(dates, dtype='datetime64[M]').astype(str)
+
+
+def monthly_spend(data_frame):
+    """
+    Sums outgoing payments per (month, category, payee), uncached, eg. for a batch of new rows.
+    :param data_frame: pandas DataFrame with a DateTimeIndex and 'Payee', 'Category' and 'Amount' columns.
+    :return: pandas DataFrame with SPEND_COLUMNS, 'Spend' a positive amount in minor units.
+    """
+    amounts = data_frame['Amount'].to_numpy()
+    outgoing = amounts < 0
+    spend = pd.DataFrame({'Month': month_keys(data_frame.index[outgoing]),
+                          'Category': data_frame['Category'].to_numpy()[outgoing],
+                          'Payee': data_frame['Payee'].to_numpy()[outgoing],
+                          'Spend': -amounts[outgoing]})
+    return spend.groupby(['Month', 'Category', 'Payee'], sort=False)['Spend'] \
+        .agg(Spend='sum', Count='size').reset_index()
+
+
+@cached_on_data_frame()
+def calculate_monthly_spend(data_frame):
+    """
+    The spend table of a data set, cached per data set so budget checks never rescan its transactions.
+    :param data_frame: pandas DataFrame with a DateTimeIndex and 'Payee', 'Category' and 'Amount' columns.
+    :return: pandas DataFrame with SPEND_COLUMNS.
+    """
+    try:
+        return monthly_spend(data_frame)
+
+    except KeyError as e:
+        raise KeyError(f"DataFrame column error calculating monthly spend: {e}")
+    except ValueError as e:
+        raise ValueError(f"Data processing error calculating monthly spend: {e}")
+    except Exception as e:
+        raise Exception(f"Error calculating monthly spend: {e}")
+
+
+def _budget_membership(spend, budgets):
+    """
+    Builds the matrix of which spend table rows count towards which budget. Keywords are matched once per unique
+    payee name.
+    :return: boolean numpy array of shape (rows, budgets).
+    """
+    payee_codes, payees = pd.factorize(spend['Payee'])
+    categories = spend['Category'].to_numpy()
+
+    membership = np.ones((len(spend), len(budgets)), dtype=bool)
+    for column, budget in enumerate(budgets):
+        if budget['category']:
+            membership[:, column] &= categories == budget['category']
+        if budget['pattern'] is not None:
+            matched = pd.Series(payees, dtype=object).str.contains(budget['pattern'], regex=True).to_numpy()
+            membership[:, column] &= matched[payee_codes]
+    return membership
+
+
+def check_budgets(spend, month=None, budgets_file=DEFAULT_BUDGETS_FILE):
+    """
+    Checks every budget against one month of the spend table.
+    :param spend: pandas DataFrame with SPEND_COLUMNS, see calculate_monthly_spend.
+    :param month: 'YYYY-MM' month to check, the latest month in the spend table if not given.
+    :param budgets_file: path of the JSON budgets file.
+    :return: tuple of (month checked, pandas DataFrame with 'Budget', 'Limit', 'Spent', 'Remaining', 'Used' (percent)
+        and 'Status' ('ok', 'alert' or 'over budget') columns in budget order, amounts in minor units).
+    """
+    try:
+        budgets = load_budgets(budgets_file)
+        if not budgets or spend.empty:
+            return month, pd.DataFrame()
+
+        month = month or spend['Month'].max()
+        spend = spend[spend['Month'].to_numpy() == month]
+
+        # spend per budget for every budget at once: (rows) @ (rows x budgets)
+        spent = spend['Spend'].to_numpy(dtype='int64') @ _budget_membership(spend, budgets).astype('int64')
+
+        limits = np.array([budget['limit'] for budget in budgets], dtype='int64')
+        alerts = np.array([budget['alert'] for budget in budgets])
+        used = spent / limits
+        status = np.select([used > 1, used >= alerts], ['over budget', 'alert'], default='ok')
+
+        return month, pd.DataFrame({'Budget': [budget['name'] for budget in budgets],
+                                    'Limit': limits,
+                                    'Spent': spent,
+                                    'Remaining': np.maximum(limits - spent, 0),
+                                    'Used': np.rint(used * 100).astype('int64'),
+                                    'Status': status})
+
+    except KeyError as e:
+        raise KeyError(f"DataFrame column error checking budgets: {e}")
+    except ValueError as e:
+        raise ValueError(f"Data processing error checking budgets: {e}")
+    except Exception as e:
+        raise Exception(f"Error checking budgets: {e}")
@@ -0,0 +1,92 @@
+"""
+Bank Statement Analysis Plotly Dash App
+
+This is a Plotly Dash app that analyses bank statements and provides various visualizations to help users understand
+their spending habits.
+
+It uses the following technologies and libraries:
+- Python 3.7
+- Plotly Dash
+- Pandas
+- Numpy
+
+The app is intended for educational or demonstration purposes only and should not be used in a production environment
+without further testing and security measures.
+
+To run the app, you will need to have Python and the required libraries installed.
+You can run the app by running the command 'python, python3, or py (depending on your setup) index.py' in the terminal.
+
+This project is released under the MIT License.
+
+Author: @10XTMY, Molmez LTD (www.molmez.io)
+Date Published: 30 January 2023
+
+These are the caching helpers used to avoid recomputing results for a data set that has already been analysed
+"""
+import functools
+import hashlib
+import threading
+from collections import OrderedDict
+from pathlib import Path
+import pandas as pd
+
+# local folder for caches that persist across sessions
+CACHE_DIR = Path(__file__).parent.joinpath('cache').resolve()
+
+
+def data_frame_fingerprint(data_frame):
+    """
+    Hashes the contents and index of a DataFrame, identical data gives an identical fingerprint.
+    :param data_frame: pandas DataFrame.
+    :return: hex digest string.
+    """
+    hashed_rows = pd.util.hash_pandas_object(data_frame, index=True).to_numpy()
+    column_names = ','.join(map(str, data_frame.columns)).encode()
+    return hashlib.sha1(hashed_rows.tobytes() + column_names).hexdigest()
+
+
+def _copy_result(result):
+    if isinstance(result, (pd.DataFrame, pd.Series)):
+        return result.copy()
+    if isinstance(result, tuple):
+        return tuple(_copy_result(item) for item in result)
+    if isinstance(result, dict):
+        return {key: _copy_result(value) for key, value in result.items()}
+    return result
+
+
+def cached_on_data_frame(maxsize=32):
+    """
+    Decorator caching a function whose first argument is a DataFrame, keyed on the DataFrame's fingerprint and
+    the remaining (hashable) arguments. Cached DataFrames are copied on the way out so callers can modify them.
+    Safe to share between the threads of a server worker, a result may be computed twice but is stored once.
+    :param maxsize: number of results kept, least recently used results are dropped first.
+    :return: decorator.
+    """
+    def decorator(func):
+        results = OrderedDict()
+        lock = threading.Lock()
+
+        @functools.wraps(func)
+        def wrapper(data_frame, *args, **kwargs):
+            key = (data_frame_fingerprint(data_frame), args, tuple(sorted(kwargs.items())))
+
+            with lock:
+                result = results.get(key)
+                if result is not None:
+                    results.move_to_end(key)
+
+            if result is None:
+                # computed outside the lock so one slow result does not block every other thread
+                result = func(data_frame, *args, **kwargs)
+                with lock:
+                    results[key] = result
+                    if len(results) > maxsize:
+                        results.popitem(last=False)
+
+            return _copy_result(result)
+
+        wrapper.cache_clear = results.clear
+        return wrapper
+
+    return decorator
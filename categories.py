@@ -0,0 +1,193 @@
+"""
+Bank Statement Analysis Plotly Dash App
+
+This is a Plotly Dash app that analyses bank statements and provides various visualizations to help users understand
+their spending habits.
+
+It uses the following technologies and libraries:
+- Python 3.7
+- Plotly Dash
+- Pandas
+- Numpy
+
+The app is intended for educational or demonstration purposes only and should not be used in a production environment
+without further testing and security measures.
+
+To run the app, you will need to have Python and the required libraries installed.
+You can run the app by running the command 'python, python3, or py (depending on your setup) index.py' in the terminal.
+
+This project is released under the MIT License.
+
+Author: @10XTMY, Molmez LTD (www.molmez.io)
+Date Published: 30 January 2023
+
+This is the rule based categorisation that assigns a 'Category' to every transaction at ingest
+
+Rules live in datasets/category_rules.json as a list evaluated in order, the first matching rule wins:
+    {"category": "Groceries", "keywords": ["tesco", "aldi"]}      any keyword found in Details (case-insensitive)
+    {"category": "Bills", "regex": "council tax|water"}           regular expression searched in Details
+    {"category": "Cash", "payees": ["Chase"]}                     canonical payee name (see payees.py)
+    {"category": "Large", "min": 1000, "max": 5000}               absolute amount range in major units
+    {"category": "Income", "keywords": ["salary"], "direction": "in"}   "in" or "out" only
+Conditions in one rule must all match.
+"""
+import functools
+import json
+import re
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from money import to_minor_units
+
+DEFAULT_RULES_FILE = Path(__file__).parent.joinpath('datasets', 'category_rules.json').resolve()
+UNCATEGORISED = 'Uncategorised'
+
+
+@functools.lru_cache(maxsize=8)
+def _compile_rules(rules_file, modified_time):
+    """
+    Reads and compiles the rules file, cached until the file changes.
+    :param rules_file: path string of the JSON rules file.
+    :param modified_time: modification time of the file, part of the cache key.
+    :return: tuple of compiled rule dictionaries.
+    """
+    with open(rules_file, 'r', encoding='utf-8') as f:
+        rules = json.load(f)
+
+    compiled = []
+    for rule in rules:
+        if 'category' not in rule:
+            raise ValueError(f'category rule without a category: {rule}')
+
+        # keywords collapse into one case-insensitive pattern, the regex is compiled exactly as written
+        patterns = []
+        keywords = [re.escape(keyword) for keyword in rule.get('keywords', []) if keyword.strip()]
+        if keywords:
+            patterns.append(re.compile('|'.join(keywords), re.IGNORECASE))
+        if rule.get('regex'):
+            try:
+                patterns.append(re.compile(rule['regex'], re.IGNORECASE))
+            except re.error as e:
+                raise ValueError(f"invalid regex for category {rule['category']}: {e}")
+
+        compiled.append({'category': rule['category'],
+                         'patterns': tuple(patterns),
+                         'payees': {payee.lower() for payee in rule.get('payees', [])},
+                         # amount limits are compared in minor units
+                         'min': to_minor_units(rule['min']) if rule.get('min') is not None else None,
+                         'max': to_minor_units(rule['max']) if rule.get('max') is not None else None,
+                         'direction': rule.get('direction')})
+
+    return tuple(compiled)
+
+
+def load_rules(rules_file=DEFAULT_RULES_FILE):
+    """
+    Loads the compiled category rules, a missing rules file means no rules.
+    :param rules_file: path of the JSON rules file.
+    :return: tuple of compiled rule dictionaries.
+    """
+    rules_file = Path(rules_file)
+    if not rules_file.exists():
+        return ()
+    return _compile_rules(str(rules_file), rules_file.stat().st_mtime)
+
+
+def category_names(rules_file=DEFAULT_RULES_FILE):
+    """
+    Lists the categories defined in the rules file, in rule order, followed by UNCATEGORISED.
+    :param rules_file: path of the JSON rules file.
+    :return: list of strings.
+    """
+    names = list(dict.fromkeys(rule['category'] for rule in load_rules(rules_file)))
+    return names + [UNCATEGORISED]
+
+
+def _unique_mask(values, test):
+    """
+    Evaluates a text test on the unique values only and broadcasts it back onto every row.
+    :param values: pandas Series of strings.
+    :param test: function taking the Series of unique strings and returning a boolean array.
+    :return: boolean numpy array aligned with values.
+    """
+    codes, uniques = pd.factorize(values.fillna(''))
+    return np.asarray(test(pd.Series(uniques)), dtype=bool)[codes]
+
+
+def assign_categories(data_frame, rules_file=DEFAULT_RULES_FILE):
+    """
+    Assigns a category to every row from the rules file. Text rules are matched once per unique Details / Payee
+    string and amount rules are plain vectorized comparisons, then np.select picks the first matching rule.
+    :param data_frame: pandas DataFrame with 'Details', 'Amount' and optionally 'Payee' columns.
+    :param rules_file: path of the JSON rules file.
+    :return: pandas Series of category names aligned with the DataFrame.
+    """
+    try:
+        rules = load_rules(rules_file)
+        amounts = data_frame['Amount'].to_numpy()
+        has_payee = 'Payee' in data_frame.columns
+
+        conditions = []
+        for rule in rules:
+            mask = np.ones(len(data_frame), dtype=bool)
+
+            if rule['patterns']:
+                # re.search per unique string, so capture groups in a rule's regex need no rewriting
+                mask &= _unique_mask(data_frame['Details'],
+                                     lambda uniques: [any(pattern.search(details) for pattern in rule['patterns'])
+                                                      for details in uniques])
+            if rule['payees']:
+                if not has_payee:
+                    mask[:] = False
+                else:
+                    mask &= _unique_mask(data_frame['Payee'],
+                                         lambda uniques: uniques.str.lower().isin(rule['payees']))
+            if rule['direction'] == 'in':
+                mask &= amounts > 0
+            elif rule['direction'] == 'out':
+                mask &= amounts < 0
+            if rule['min'] is not None:
+                mask &= np.abs(amounts) >= rule['min']
+            if rule['max'] is not None:
+                mask &= np.abs(amounts) <= rule['max']
+
+            conditions.append(mask)
+
+        categories = np.select(conditions, [rule['category'] for rule in rules], default=UNCATEGORISED) \
+            if rules else np.full(len(data_frame), UNCATEGORISED, dtype=object)
+
+        return pd.Series(categories, index=data_frame.index, name='Category')
+
+    except KeyError as e:
+        raise KeyError(f"DataFrame column error assigning categories: {e}")
+    except ValueError as e:
+        raise ValueError(f"Data processing error assigning categories: {e}")
+    except Exception as e:
+        raise Exception(f"Error assigning categories: {e}")
+
+
+def calculate_category_totals(data_frame):
+    """
+    Totals incoming and outgoing amounts per category, grouping the stored 'Category' column without any text scan.
+    :param data_frame: pandas DataFrame with 'Category' and int64 minor unit 'Amount' columns.
+    :return: pandas DataFrame with 'Category', 'Count', 'In' and 'Out' columns, largest spend first.
+    """
+    try:
+        if data_frame.empty or 'Category' not in data_frame.columns:
+            return pd.DataFrame()
+
+        amounts = data_frame['Amount']
+        split = pd.DataFrame({'Category': data_frame['Category'].to_numpy(),
+                              'In': amounts.where(amounts > 0, 0).to_numpy(),
+                              'Out': amounts.where(amounts < 0, 0).to_numpy()})
+
+        totals = split.groupby('Category').agg(Count=('In', 'size'), In=('In', 'sum'), Out=('Out', 'sum'))
+
+        return totals.sort_values('Out').reset_index()
+
+    except KeyError as e:
+        raise KeyError(f"DataFrame column error calculating category totals: {e}")
+    except ValueError as e:
+        raise ValueError(f"Data processing error calculating category totals: {e}")
+    except Exception as e:
+        raise Exception(f"Error calculating category totals: {e}")
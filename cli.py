@@ -0,0 +1,180 @@
+"""
+Bank Statement Analysis Plotly Dash App
+
+This is a Plotly Dash app that analyses bank statements and provides various visualizations to help users understand
+their spending habits.
+
+It uses the following technologies and libraries:
+- Python 3.7
+- Plotly Dash
+- Pandas
+- Numpy
+
+The app is intended for educational or demonstration purposes only and should not be used in a production environment
+without further testing and security measures.
+
+To run the app, you will need to have Python and the required libraries installed.
+You can run the app by running the command 'python, python3, or py (depending on your setup) index.py' in the terminal.
+
+This project is released under the MIT License.
+
+Author: @10XTMY, Molmez LTD (www.molmez.io)
+Date Published: 30 January 2023
+
+
+This is the headless batch command line: ingest, filters, totals and the top lists of the analytics page run over a
+directory of bank statement CSVs, in parallel across cores, without a browser or the Dash server
+Each statement gets a folder of reports in the output directory and summary.<format> lists every statement:
+    python cli.py statements/ --output reports/ --format csv --in-out paid_out --start-date 2023-01-01 \
+        --end-date 2023-12-31 --isolate tesco,aldi --top 10
+Parquet output needs pyarrow installed (pip install pyarrow).
+"""
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+import pandas as pd
+from fx import DEFAULT_CURRENCY, convert_currency, currency_names, has_currencies
+from helpers import bank_csv_to_data_frame
+from pipeline import DEFAULT_TOP_LIST_LENGTH, REPORTS, run_reports, report_for_export
+from query_plan import build_filter_plan
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+FORMATS = ('csv', 'json', 'parquet')
+
+
+def write_report(report, path, output_format):
+    """
+    Writes a report DataFrame in the chosen format.
+    :param report: pandas DataFrame from pipeline.report_for_export.
+    :param path: output path without a suffix.
+    :param output_format: 'csv', 'json' or 'parquet'.
+    """
+    path = path.with_suffix(f'.{output_format}')
+    if output_format == 'parquet':
+        report.to_parquet(path, index=False)
+    elif output_format == 'json':
+        report.to_json(path, orient='records')
+    else:
+        report.to_csv(path, index=False)
+
+
+def process_statement(csv_file, output_dir, output_format, plan, top_list_length, currency=None):
+    """
+    Runs every report for one statement and writes them to output_dir/<statement name>/. Errors are returned
+    rather than raised, so one bad statement does not stop a batch.
+    :param csv_file: path of the statement CSV.
+    :param output_dir: root output directory.
+    :param output_format: 'csv', 'json' or 'parquet'.
+    :param plan: query_plan.FilterPlan applied to every statement.
+    :param top_list_length: number of rows in the top lists.
+    :param currency: base currency amounts are converted to, see fx.py.
+    :return: summary dictionary for the statement.
+    """
+    summary = {'Statement': csv_file.name, 'Rows': 0, 'In': None, 'Out': None, 'Difference': None, 'Error': ''}
+    try:
+        data_frame = bank_csv_to_data_frame(csv_file)
+        if has_currencies(data_frame, currency):
+            data_frame = convert_currency(data_frame, currency)
+
+        reports = run_reports(data_frame, plan, top_list_length)
+
+        statement_dir = output_dir.joinpath(csv_file.stem)
+        statement_dir.mkdir(parents=True, exist_ok=True)
+        for name in REPORTS:
+            write_report(report_for_export(reports[name]), statement_dir.joinpath(name), output_format)
+
+        totals = report_for_export(reports['totals']).iloc[0]
+        summary.update(Rows=len(reports['transactions']), In=totals['In'], Out=totals['Out'],
+                       Difference=totals['Difference'])
+    except Exception as e:
+        summary['Error'] = str(e)
+    return summary
+
+
+def run_batch(input_dir, output_dir, output_format='csv', plan=None, top_list_length=DEFAULT_TOP_LIST_LENGTH,
+              workers=None, currency=None):
+    """
+    Processes every *.csv statement in a directory, one statement per task across a pool of processes.
+    :param input_dir: directory of statement CSVs.
+    :param output_dir: directory the reports are written to, created if missing.
+    :param output_format: 'csv', 'json' or 'parquet'.
+    :param plan: query_plan.FilterPlan, no filtering if not given.
+    :param top_list_length: number of rows in the top lists.
+    :param workers: number of processes, defaults to the number of cores.
+    :param currency: base currency amounts are converted to, see fx.py.
+    :return: pandas DataFrame summary with one row per statement.
+    """
+    csv_files = sorted(Path(input_dir).glob('*.csv'))
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    plan = plan or build_filter_plan()
+    workers = workers or os.cpu_count() or 1
+
+    task = partial(process_statement, output_dir=output_dir, output_format=output_format, plan=plan,
+                   top_list_length=top_list_length, currency=currency)
+
+    if workers == 1 or len(csv_files) <= 1:
+        summaries = list(map(task, csv_files))
+    else:
+        # statements are small, hand them out in batches so thousands of files do not cost a round trip each
+        chunksize = max(1, len(csv_files) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            summaries = list(executor.map(task, csv_files, chunksize=chunksize))
+
+    summary = pd.DataFrame(summaries, columns=['Statement', 'Rows', 'In', 'Out', 'Difference', 'Error'])
+    write_report(summary, output_dir.joinpath('summary'), output_format)
+    return summary
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Run the analytics reports over a directory of bank statement CSVs.')
+    parser.add_argument('input_dir', help='directory of statement CSV files')
+    parser.add_argument('--output', default='reports', help='output directory (default: reports)')
+    parser.add_argument('--format', choices=FORMATS, default='csv', help='output format (default: csv)')
+    parser.add_argument('--workers', type=int, default=None, help='number of processes (default: all cores)')
+    parser.add_argument('--top', type=int, default=DEFAULT_TOP_LIST_LENGTH, help='length of the top lists')
+    parser.add_argument('--start-date', help='start of the date range, YYYY-MM-DD')
+    parser.add_argument('--end-date', help='end of the date range, YYYY-MM-DD')
+    parser.add_argument('--in-out', choices=('paid_in', 'paid_out'), help='only incoming or outgoing payments')
+    parser.add_argument('--isolate', help='comma separated keywords to keep')
+    parser.add_argument('--remove', help='comma separated keywords to remove')
+    parser.add_argument('--min', type=float, help='minimum amount')
+    parser.add_argument('--max', type=float, help='maximum amount')
+    parser.add_argument('--categories', help='comma separated categories to keep')
+    parser.add_argument('--currency', type=str.upper, default=DEFAULT_CURRENCY, choices=currency_names(),
+                        help=f'base currency amounts are converted to (default: {DEFAULT_CURRENCY})')
+    args = parser.parse_args(argv)
+
+    if args.format == 'parquet' and pyarrow is None:
+        parser.error('parquet output needs pyarrow, install it with pip install pyarrow')
+    if not Path(args.input_dir).is_dir():
+        parser.error(f'{args.input_dir} is not a directory')
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    plan = build_filter_plan(start_date=args.start_date, end_date=args.end_date,
+                             in_out=[args.in_out] if args.in_out else None,
+                             key_remove=args.remove, key_isolate=args.isolate,
+                             minimum=args.min, maximum=args.max,
+                             categories=args.categories.split(',') if args.categories else None)
+
+    summary = run_batch(args.input_dir, args.output, args.format, plan, args.top, args.workers, args.currency)
+
+    failed = summary[summary['Error'] != '']
+    print(f'{len(summary) - len(failed)} statements processed, {len(failed)} failed, reports in {args.output}')
+    for _, row in failed.iterrows():
+        print(f"  {row['Statement']}: {row['Error']}", file=sys.stderr)
+    return 1 if len(failed) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
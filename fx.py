@@ -0,0 +1,149 @@
+"""
+Bank Statement Analysis Plotly Dash App
+
+This is a Plotly Dash app that analyses bank statements and provides various visualizations to help users understand
+their spending habits.
+
+It uses the following technologies and libraries:
+- Python 3.7
+- Plotly Dash
+- Pandas
+- Numpy
+
+The app is intended for educational or demonstration purposes only and should not be used in a production environment
+without further testing and security measures.
+
+To run the app, you will need to have Python and the required libraries installed.
+You can run the app by running the command 'python, python3, or py (depending on your setup) index.py' in the terminal.
+
+This project is released under the MIT License.
+
+Author: @10XTMY, Molmez LTD (www.molmez.io)
+Date Published: 30 January 2023
+
+
+This is the currency conversion for statements holding amounts in more than one currency
+
+Statements may carry an optional Currency column (see bank_formats.py), rows without one are in DEFAULT_CURRENCY,
+set with the MOLMEZ_CURRENCY environment variable. Rates come from the local table datasets/fx_rates.csv, no network
+access is needed:
+    Date,Currency,Rate
+    2023-01-01,EUR,0.8840        one EUR is worth 0.884 of the REFERENCE_CURRENCY (GBP) from this date
+The reference currency needs no rows of its own. A transaction is converted at the latest rate on or before its date
+(the earliest rate for dates before the table starts), with one as-of join per currency over the unique
+(date, currency) pairs rather than the rows.
+"""
+import functools
+import os
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from bank_formats import parse_dates
+from cache import cached_on_data_frame
+
+DEFAULT_RATES_FILE = Path(__file__).parent.joinpath('datasets', 'fx_rates.csv').resolve()
+REFERENCE_CURRENCY = 'GBP'
+DEFAULT_CURRENCY = os.environ.get('MOLMEZ_CURRENCY', REFERENCE_CURRENCY).upper()
+
+
+@functools.lru_cache(maxsize=8)
+def _read_rates(rates_file, modified_time):
+    """
+    Reads the rate table, cached until the file changes.
+    :param rates_file: path string of the rates CSV.
+    :param modified_time: modification time of the file, part of the cache key.
+    :return: pandas DataFrame with 'Date', 'Currency' and float 'Rate' columns, sorted by date.
+    """
+    rates = pd.read_csv(rates_file, dtype={'Date': str, 'Currency': str, 'Rate': float})
+    rates['Date'] = parse_dates(rates['Date'])
+    rates['Currency'] = rates['Currency'].str.strip().str.upper()
+    return rates.dropna().sort_values('Date', kind='stable').reset_index(drop=True)
+
+
+def load_rates(rates_file=DEFAULT_RATES_FILE):
+    """
+    Loads the rate table, a missing file means only the reference currency is known.
+    :param rates_file: path of the rates CSV.
+    :return: pandas DataFrame with 'Date', 'Currency' and 'Rate' columns.
+    """
+    rates_file = Path(rates_file)
+    if not rates_file.exists():
+        return pd.DataFrame({'Date': pd.Series(dtype='datetime64[ns]'), 'Currency': pd.Series(dtype=str),
+                             'Rate': pd.Series(dtype=float)})
+    return _read_rates(str(rates_file), rates_file.stat().st_mtime)
+
+
+def currency_names(rates_file=DEFAULT_RATES_FILE):
+    """
+    :return: sorted list of the currencies amounts can be converted between.
+    """
+    return sorted(set(load_rates(rates_file)['Currency']) | {REFERENCE_CURRENCY, DEFAULT_CURRENCY})
+
+
+def reference_rates(dates, currencies, rates_file=DEFAULT_RATES_FILE):
+    """
+    Looks up the value of each currency in the reference currency as of each date.
+    :param dates: datetime64 numpy array.
+    :param currencies: numpy array of currency codes, aligned with dates.
+    :param rates_file: path of the rates CSV.
+    :return: float numpy array of rates.
+    """
+    rates = load_rates(rates_file)
+    pairs = pd.DataFrame({'Date': dates, 'Currency': currencies})
+    # numbered in order of first appearance, as drop_duplicates keeps them
+    codes = pairs.groupby(['Date', 'Currency'], sort=False).ngroup().to_numpy()
+    uniques = pairs.drop_duplicates().reset_index(drop=True)
+    uniques['Order'] = np.arange(len(uniques))
+    uniques = uniques.sort_values('Date', kind='stable')
+
+    looked_up = pd.merge_asof(uniques, rates, on='Date', by='Currency', direction='backward')
+    # dates before a currency's first rate take that first rate
+    missing = looked_up['Rate'].isna().to_numpy()
+    if missing.any():
+        looked_up.loc[missing, 'Rate'] = pd.merge_asof(uniques[missing], rates, on='Date', by='Currency',
+                                                       direction='forward')['Rate'].to_numpy()
+
+    looked_up.loc[looked_up['Currency'] == REFERENCE_CURRENCY, 'Rate'] = 1.0
+    unknown = looked_up.loc[looked_up['Rate'].isna(), 'Currency'].unique()
+    if len(unknown):
+        raise ValueError(f"no exchange rates for {', '.join(sorted(unknown))} in {Path(rates_file).name}")
+
+    return looked_up.sort_values('Order')['Rate'].to_numpy()[codes]
+
+
+def has_currencies(data_frame, base=None):
+    """
+    :return: True if the amounts of the DataFrame need converting to show them in the base currency.
+    """
+    return 'Currency' in data_frame.columns or (base or DEFAULT_CURRENCY) != DEFAULT_CURRENCY
+
+
+@cached_on_data_frame()
+def convert_currency(data_frame, base=None):
+    """
+    Converts every amount to the base currency, cached per (data set, base currency) so switching between
+    currencies never re-runs ingest and switching back costs nothing.
+    :param data_frame: pandas DataFrame with a DateTimeIndex, int64 minor unit 'Amount' and optionally 'Currency'.
+    :param base: currency code to convert to, DEFAULT_CURRENCY if not given.
+    :return: pandas DataFrame with 'Amount' in base currency minor units, 'Currency' is kept as the original
+        currency of each row.
+    """
+    try:
+        base = (base or DEFAULT_CURRENCY).upper()
+        dates = data_frame.index.to_numpy()
+        if 'Currency' in data_frame.columns:
+            currencies = data_frame['Currency'].fillna(DEFAULT_CURRENCY).to_numpy(dtype=object)
+        else:
+            currencies = np.full(len(data_frame), DEFAULT_CURRENCY, dtype=object)
+
+        factors = reference_rates(dates, currencies) / reference_rates(dates, np.full(len(dates), base, dtype=object))
+
+        amounts = np.rint(data_frame['Amount'].to_numpy() * factors).astype('int64')
+        return data_frame.assign(Amount=amounts)
+
+    except KeyError as e:
+        raise KeyError(f"DataFrame column error converting currency: {e}")
+    except ValueError as e:
+        raise ValueError(f"Data processing error converting currency: {e}")
+    except Exception as e:
+        raise Exception(f"Error converting currency: {e}")
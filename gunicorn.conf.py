@@ -0,0 +1,31 @@
+"""
+Gunicorn settings for serving the Bank Statement Analysis app, see wsgi.py
+
+    gunicorn --config gunicorn.conf.py wsgi:application
+
+Every value can be overridden on the command line or through the environment variables below.
+"""
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8050')}"
+
+# the analytics callbacks are CPU bound pandas work that holds the GIL, so requests run in parallel across
+# processes: one worker per core. A few threads per worker serve the cheap requests (layout, assets, uploads
+# in transit) without queueing them behind a callback
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count()))
+threads = int(os.environ.get('MOLMEZ_THREADS', '4'))
+worker_class = 'gthread'
+
+# load the app, the demo data set and its aggregates once in the master, workers share them copy-on-write
+preload_app = True
+
+# a long statement can take a few seconds to analyse on first upload
+timeout = 60
+keepalive = 5
+
+# workers are recycled now and again so the per-process result caches cannot grow without bound
+max_requests = 2000
+max_requests_jitter = 200
+
+accesslog = os.environ.get('MOLMEZ_ACCESS_LOG')
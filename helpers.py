@@ -30,20 +30,48 @@ import numpy as np
 import pandas as pd
 import plotly.express as px
 from dash import html, dash_table
+from bank_formats import sniff_adapter, read_bank_csv, supported_layouts, parse_dates
+from payees import normalize_payees
+from money import to_minor_units, as_minor_units, from_minor_units, format_minor_units
+from categories import assign_categories
+from timeseries import time_series_graph
 
 locale.setlocale(locale.LC_ALL, '')
 
+MONEY_COLUMNS = ('Amount', 'In', 'Out', 'Typical', 'Limit', 'Spent', 'Remaining')
+
+# derived columns kept in the dcc.Store as integer codes into their unique names
+CODED_COLUMNS = ('Payee', 'Category')
+
 
 def tuple_insert(tup, pos, ele):
     tup = tup[:pos] + (ele,) + tup[pos:]
     return tup
 
 
-def verify_upload(uploaded_file, content_string):
+def transaction_row_hashes(data_frame):
+    """
+    Hashes each transaction's date, details and amount into a stable row id. Identical rows on the same day,
+    eg. two coffees, are told apart by their occurrence number, so re-importing a statement gives the same ids.
+    :param data_frame: pandas DataFrame with a DateTimeIndex and 'Details' and 'Amount' columns.
+    :return: int64 pandas Series aligned with the DataFrame.
+    """
+    key = pd.DataFrame({'Date': data_frame.index.strftime('%Y-%m-%d'),
+                        'Details': data_frame['Details'].to_numpy(),
+                        'Amount': data_frame['Amount'].to_numpy()})
+    key['Occurrence'] = key.groupby(['Date', 'Details', 'Amount'], sort=False).cumcount()
+
+    # signed, so the ids fit an SQLite INTEGER column
+    hashes = pd.util.hash_pandas_object(key, index=False).to_numpy().view('int64')
+    return pd.Series(hashes, index=data_frame.index, name='Hash')
+
+
+def verify_upload(uploaded_file, content_string, derive_columns=True):
     """
     Verifies the uploaded CSV file and converts it to a pandas DataFrame.
     :param uploaded_file: name of the uploaded file.
     :param content_string: content of the file in base64 encoding.
+    :param derive_columns: False to skip the 'Payee' and 'Category' columns, eg. to add them to new rows only.
     :return: tuple containing a status code and DataFrame or error message.
     """
     try:
@@ -52,32 +80,51 @@ def verify_upload(uploaded_file, content_string):
 
         decoded = base64.b64decode(content_string)
         decoded_csv = io.StringIO(decoded.decode('utf-8-sig'))
-        header = pd.read_csv(decoded_csv, nrows=1).columns.tolist()
 
-        if header == ['Date', 'Details', 'Amount']:
-            # reset StringIO object to read from the beginning
-            decoded_csv.seek(0)
-            df = bank_csv_to_data_frame(decoded_csv)
+        # sniff the delimiter and header to find an adapter for this bank's layout, the StringIO is rewound
+        adapter = sniff_adapter(decoded_csv)
+
+        if adapter:
+            df = bank_csv_to_data_frame(decoded_csv, adapter, derive_columns)
             return 1, df
         else:
-            return 0, 'CSV layout should be: Date, Details, Amount'
+            return 0, f'CSV layout should be one of: {supported_layouts()}'
 
     except Exception as e:
         return 0, f'Error processing uploaded file: {e}'
 
 
-def bank_csv_to_data_frame(csv_input):
+def add_derived_columns(data_frame):
+    """
+    Adds the canonical 'Payee' and the rule based 'Category' of each transaction.
+    :param data_frame: pandas DataFrame with 'Details' and int64 minor unit 'Amount' columns.
+    :return: new pandas DataFrame.
+    """
+    data_frame = data_frame.assign(Payee=normalize_payees(data_frame['Details']))
+    return data_frame.assign(Category=assign_categories(data_frame))
+
+
+def bank_csv_to_data_frame(csv_input, adapter=None, derive_columns=True):
     """
     Converts a bank CSV file to a pandas DataFrame with formatted columns.
-    :param csv_input: path to the CSV file.
+    'Amount' is returned as int64 minor units.
+    :param csv_input: path to the CSV file or file-like object.
+    :param adapter: bank layout adapter from bank_formats, sniffed from the header if not given.
+    :param derive_columns: False to leave out the 'Payee' and 'Category' columns, see add_derived_columns.
     :return: pandas DataFrame.
     """
     try:
-        # read CSV and perform initial transformations
-        df = pd.read_csv(csv_input, dtype=object)
-        df['Amount'] = df['Amount'].str.replace(',', '').astype(float).round(2)
-        df['Details'] = df['Details'].str.replace(')', '')
-        df['Date'] = pd.to_datetime(df['Date'], dayfirst=True)
+        if adapter is None:
+            adapter = sniff_adapter(csv_input)
+            if adapter is None:
+                raise ValueError(f'unsupported CSV layout, expected one of: {supported_layouts()}')
+
+        # read CSV, map it onto Date, Details, Amount and perform initial transformations
+        df = read_bank_csv(csv_input, adapter)
+        df['Amount'] = to_minor_units(df['Amount'])
+        df['Details'] = df['Details'].str.replace(')', '', regex=False)
+        if derive_columns:
+            df = add_derived_columns(df)
 
         # set 'Date' as the index
         df.set_index('Date', inplace=True)
@@ -92,31 +139,109 @@ def bank_csv_to_data_frame(csv_input):
         raise Exception(f"Error processing the CSV file: {e}")
 
 
-def new_graph(data_frame, graph_type, graph_style):
+def format_dates(dates):
+    """
+    Formats dates as 'YYYY-MM-DD' strings, shorter on the wire than full ISO timestamps. Each unique date is
+    only formatted once.
+    :param dates: DatetimeIndex or datetime Series.
+    :return: numpy object array of strings, None for missing dates.
+    """
+    codes, uniques = pd.factorize(dates)
+    formatted = np.append(pd.DatetimeIndex(uniques).strftime('%Y-%m-%d').to_numpy(dtype=object), None)
+    return formatted[codes]
+
+
+def data_frame_to_store(data_frame):
+    """
+    Packs a transaction DataFrame into the compact form kept in the dcc.Store, which the browser sends back with
+    every analytics callback: one list per column rather than one dictionary per row, dates without a time part
+    and amounts as integer minor units. 'Payee' and 'Category' are kept as codes into their unique names under
+    'Names', so callbacks never normalise and categorise the data set again. Rows are kept in date order, so new
+    statements can be appended to the store (see incremental.py). 'Currency' is only kept by statements that
+    have one.
+    :param data_frame: pandas DataFrame as returned by bank_csv_to_data_frame.
+    :return: dictionary of column name -> list.
+    """
+    data_frame = data_frame.sort_index(kind='stable')
+    store = {'Date': format_dates(data_frame.index).tolist(),
+             'Details': data_frame['Details'].tolist(),
+             'Amount': data_frame['Amount'].tolist()}
+    if 'Currency' in data_frame.columns:
+        store['Currency'] = data_frame['Currency'].astype(object).where(data_frame['Currency'].notna(), None).tolist()
+    if all(column in data_frame.columns for column in CODED_COLUMNS):
+        store['Names'] = {}
+        for column in CODED_COLUMNS:
+            codes, uniques = pd.factorize(data_frame[column])
+            store[column] = codes.tolist()
+            store['Names'][column] = uniques.tolist()
+    return store
+
+
+def records_to_data_frame(data):
+    """
+    Rebuilds a transaction DataFrame from the data held in the dcc.Store.
+    :param data: list of records or dict of columns, as stored by the upload page.
+    :return: pandas DataFrame with a DateTimeIndex and int64 minor unit 'Amount'.
+    """
+    names = data.get('Names') if isinstance(data, dict) else None
+    data_frame = pd.DataFrame({column: values for column, values in data.items() if column != 'Names'}
+                              if names is not None else data)
+    data_frame['Date'] = parse_dates(data_frame['Date'].astype(str))
+    data_frame.set_index('Date', inplace=True)
+
+    if names is not None:
+        for column, uniques in names.items():
+            # code -1 is a missing value, as pd.factorize gives it
+            uniques = np.append(np.array(uniques, dtype=object), None)
+            data_frame[column] = uniques[data_frame[column].to_numpy(dtype='int64')]
+
+    # the column store holds minor units, sessions stored by older versions are records of major unit amounts
+    # and leave out payee names and categories
+    data_frame['Amount'] = as_minor_units(data_frame['Amount']) if isinstance(data, dict) \
+        else to_minor_units(data_frame['Amount'])
+    if 'Payee' not in data_frame.columns or 'Category' not in data_frame.columns:
+        data_frame = add_derived_columns(data_frame.drop(columns=['Payee', 'Category'], errors='ignore'))
+
+    return data_frame
+
+
+def new_graph(data_frame, graph_type, graph_style, highlight=None):
     """
     Creates a new graph based on the specified type and style.
     :param data_frame: pandas DataFrame.
     :param graph_type: type of the graph ('line', 'bubble', 'funnel', 'bar').
     :param graph_style: style settings for the graph.
+    :param highlight: pandas DataFrame of rows to mark on the graph, eg. unusual transactions.
     :return: plotly graph object.
     """
-    # common parameters for all graphs
+    # the line graph plots period aggregates rather than thousands of raw points
+    if graph_type == 'line':
+        return time_series_graph(data_frame, graph_style)
+
+    # amounts are only converted to major units here, at display time
+    data_frame = data_frame.assign(Amount=from_minor_units(data_frame['Amount']))
+
+    # common parameters for all graphs, plotly reads the date strings as a date axis
     common_params = {
-        'x': data_frame.index,
+        'x': format_dates(data_frame.index),
         'y': data_frame['Amount'],
         'hover_data': ['Details', 'Amount'],
         'template': 'plotly_dark'
     }
 
-    if graph_type == 'line':
-        graph_new = px.line(data_frame, **common_params)
-    elif graph_type == 'bubble':
+    if graph_type == 'bubble':
         graph_new = px.scatter(data_frame, size=data_frame['Amount'], color=data_frame['Amount'], **common_params)
     elif graph_type == 'funnel':
         graph_new = px.funnel(data_frame, color=data_frame['Details'], **common_params)
     else:  # default to bar graph
         graph_new = px.bar(data_frame, barmode="group", color=data_frame['Amount'], **common_params)
 
+    if highlight is not None and not highlight.empty:
+        graph_new.add_scatter(x=format_dates(highlight.index), y=from_minor_units(highlight['Amount']),
+                              customdata=highlight[['Details']], name='Unusual', mode='markers',
+                              marker={'symbol': 'circle-open', 'size': 14, 'color': '#ff4136', 'line': {'width': 2}},
+                              hovertemplate='x=%{x}<br>Amount=%{y}<br>Details=%{customdata[0]}<extra>Unusual</extra>')
+
     # apply additional styling
     graph_new.update_layout(graph_style)
 
@@ -126,17 +251,15 @@ def new_graph(data_frame, graph_type, graph_style):
 def calculate_total(data_frame):
     """
     Calculates the total incoming and outgoing amounts from a DataFrame.
-    :param data_frame: pandas DataFrame with an 'Amount' column.
-    :return: total incoming and outgoing amounts.
+    :param data_frame: pandas DataFrame with an int64 minor unit 'Amount' column.
+    :return: total incoming and outgoing amounts in minor units.
     """
     try:
-        # calculate total outgoing amount
-        total_out = data_frame.loc[data_frame['Amount'] < 0, 'Amount'].sum()
-        total_out = np.round(np.abs(total_out), 2)
+        amounts = data_frame['Amount'].to_numpy(dtype='int64')
 
-        # calculate total incoming amount
-        total_in = data_frame.loc[data_frame['Amount'] > 0, 'Amount'].sum()
-        total_in = np.round(total_in, 2)
+        # integer reductions are exact, no rounding needed
+        total_out = int(-amounts[amounts < 0].sum())
+        total_in = int(amounts[amounts > 0].sum())
 
         return total_in, total_out
 
@@ -148,6 +271,92 @@ def calculate_total(data_frame):
         raise Exception(f"Error calculating totals: {e}")
 
 
+def date_range_mask(data_frame, from_date, to_date):
+    """
+    Boolean mask of the rows within a date range, both ends included.
+    :param data_frame: pandas DataFrame with a DateTimeIndex.
+    :param from_date: start date in ISO format (YYYY-MM-DD).
+    :param to_date: end date in ISO format (YYYY-MM-DD).
+    :return: boolean numpy array.
+    """
+    # ensure the DataFrame index is of datetime type
+    if not pd.api.types.is_datetime64_any_dtype(data_frame.index):
+        raise TypeError("DataFrame index must be a DateTimeIndex.")
+
+    dates = data_frame.index.to_numpy()
+    return (dates >= pd.to_datetime(from_date).to_datetime64()) & (dates <= pd.to_datetime(to_date).to_datetime64())
+
+
+def incoming_payments_mask(data_frame):
+    return data_frame['Amount'].to_numpy() > 0
+
+
+def outgoing_payments_mask(data_frame):
+    return data_frame['Amount'].to_numpy() < 0
+
+
+def keywords_mask(data_frame, keywords):
+    """
+    Boolean mask of the rows whose 'Details' contain any of the keywords, case-insensitive.
+    The regex only runs once per unique 'Details' string.
+    :param data_frame: pandas DataFrame with a 'Details' column.
+    :param keywords: list of keywords, empty strings are ignored.
+    :return: boolean numpy array, or None if there are no valid keywords.
+    """
+    keywords = [keyword.strip() for keyword in keywords if keyword.strip()]
+    if not keywords:
+        return None
+
+    # add a pipe separator between keywords to create a regex pattern as a logical OR
+    pattern = '|'.join(keywords)
+    codes, uniques = pd.factorize(data_frame['Details'].fillna(''))
+    found = pd.Series(uniques).str.contains(pattern, case=False, regex=True).to_numpy()
+    return found[codes]
+
+
+def categories_mask(data_frame, categories):
+    return data_frame['Category'].isin(categories).to_numpy()
+
+
+def amount_range_mask(amounts, minimum=None, maximum=None):
+    """
+    Boolean mask of the amounts strictly between the limits.
+    :param amounts: int64 numpy array of amounts in minor units.
+    :param minimum: lower limit in minor units, None for no limit.
+    :param maximum: upper limit in minor units, None for no limit.
+    :return: boolean numpy array.
+    """
+    mask = np.ones(len(amounts), dtype=bool)
+    if minimum is not None:
+        mask &= amounts > minimum
+    if maximum is not None:
+        mask &= amounts < maximum
+    return mask
+
+
+def apply_masks(data_frame, masks, absolute_amounts=False):
+    """
+    Combines filter masks and indexes the DataFrame once, rather than materialising a new frame per filter.
+    :param data_frame: pandas DataFrame.
+    :param masks: iterable of boolean numpy arrays, None entries are skipped.
+    :param absolute_amounts: True to make 'Amount' positive, as for outgoing payments.
+    :return: new pandas DataFrame with the rows where every mask is True.
+    """
+    # ANDed into one preallocated array, no list of intermediate masks is kept
+    combined = np.ones(len(data_frame), dtype=bool)
+    for mask in masks:
+        if mask is not None:
+            np.logical_and(combined, mask, out=combined)
+    rows = np.flatnonzero(combined)
+
+    # take() builds a new frame, not a view, so 'Amount' can be replaced without a further copy
+    filtered_data_frame = data_frame.take(rows)
+    if absolute_amounts:
+        filtered_data_frame['Amount'] = np.abs(filtered_data_frame['Amount'].to_numpy())
+
+    return filtered_data_frame
+
+
 def filter_by_date_range(data_frame, from_date, to_date):
     """
     Filters the DataFrame based on a given date range.
@@ -157,20 +366,10 @@ def filter_by_date_range(data_frame, from_date, to_date):
     :return: pandas DataFrame within the specified date range.
     """
     try:
-        # convert ISO format dates to datetime objects
-        start_date = pd.to_datetime(from_date)
-        end_date = pd.to_datetime(to_date)
+        mask = date_range_mask(data_frame, from_date, to_date)
 
-        # ensure the DataFrame index is of datetime type
-        if not pd.api.types.is_datetime64_any_dtype(data_frame.index):
-            raise TypeError("DataFrame index must be a DateTimeIndex.")
-
-        # create a date range mask and filter the DataFrame
-        mask = (data_frame.index >= start_date) & (data_frame.index <= end_date)
-        date_range = data_frame.loc[mask]
-
-        # return the original DataFrame if the filtered DataFrame is empty
-        return date_range if not date_range.empty else data_frame
+        # return the original DataFrame if the filtered DataFrame would be empty
+        return apply_masks(data_frame, [mask]) if mask.any() else data_frame
 
     except KeyError as e:
         raise KeyError(f"DataFrame column error filtering by date range: {e}")
@@ -183,7 +382,7 @@ def filter_by_date_range(data_frame, from_date, to_date):
 
 
 def filter_by_incoming_payments(data_frame):
-    return data_frame.loc[(data_frame['Amount'] > 0)]
+    return apply_masks(data_frame, [incoming_payments_mask(data_frame)])
 
 
 def filter_by_outgoing_payments(data_frame):
@@ -193,13 +392,8 @@ def filter_by_outgoing_payments(data_frame):
     :return: pandas DataFrame
     """
     try:
-        # filter for rows where 'Amount' is less than 0 (outgoing payments)
-        filtered_data_frame = data_frame.loc[data_frame['Amount'] < 0]
-
-        # process 'Amount': remove negative sign and convert to float
-        filtered_data_frame['Amount'] = filtered_data_frame['Amount'].abs()
-
-        return filtered_data_frame
+        # rows where 'Amount' is less than 0 (outgoing payments), with the negative sign removed
+        return apply_masks(data_frame, [outgoing_payments_mask(data_frame)], absolute_amounts=True)
 
     except KeyError as e:
         raise KeyError(f"DataFrame column error filtering by outgoing payments: {e}")
@@ -217,19 +411,13 @@ def isolate_keywords(data_frame, keywords):
         :return: pandas DataFrame.
         """
     try:
-        # filter out empty strings from the keywords list
-        keywords = [keyword.strip() for keyword in keywords if keyword.strip()]
+        mask = keywords_mask(data_frame, keywords)
 
         # if no valid keywords are provided, return the original DataFrame
-        if not keywords:
+        if mask is None:
             return data_frame
 
-        # add a pipe separator between keywords to create a regex pattern as a logical OR
-        pattern = '|'.join(keywords)
-        print(f'isolating keywords: {pattern}')
-        filtered_data_frame = data_frame.loc[data_frame['Details'].str.contains(pattern, case=False, regex=True)]
-
-        return filtered_data_frame
+        return apply_masks(data_frame, [mask])
 
     except KeyError as e:
         raise KeyError(f"DataFrame column error isolating keywords: {e}")
@@ -246,19 +434,14 @@ def remove_keywords(data_frame, keywords):
     :param keywords: list of keywords based on which rows are to be removed.
     :return: pandas DataFrame after removing rows with specified keywords.
     """
-    # filter out empty strings from the keywords list
-    keywords = [keyword.strip() for keyword in keywords if keyword.strip()]
-
-    # if no valid keywords are provided, return the original DataFrame
-    if not keywords:
-        return data_frame
-
     try:
-        # add a pipe separator between keywords to create a regex pattern as a logical OR
-        pattern = '|'.join(keywords)
-        filtered_data_frame = data_frame.loc[~data_frame['Details'].str.contains(pattern, case=False, regex=True)]
+        mask = keywords_mask(data_frame, keywords)
 
-        return filtered_data_frame
+        # if no valid keywords are provided, return the original DataFrame
+        if mask is None:
+            return data_frame
+
+        return apply_masks(data_frame, [~mask])
 
     except KeyError as e:
         raise KeyError(f"DataFrame column error removing keywords: {e}")
@@ -268,11 +451,30 @@ def remove_keywords(data_frame, keywords):
         raise Exception(f"Error removing keywords: {e}")
 
 
+def filter_by_categories(data_frame, categories):
+    """
+    Keeps rows whose 'Category', assigned at ingest, is one of the given categories.
+    :param data_frame: pandas DataFrame with a 'Category' column.
+    :param categories: list of category names, an empty list keeps every row.
+    :return: pandas DataFrame.
+    """
+    if not categories:
+        return data_frame
+
+    try:
+        return apply_masks(data_frame, [categories_mask(data_frame, categories)])
+
+    except KeyError as e:
+        raise KeyError(f"DataFrame column error filtering by categories: {e}")
+    except Exception as e:
+        raise Exception(f"Error filtering by categories: {e}")
+
+
 def filter_by_amount(data_frame, amount, min_filter, max_filter):
     """
         Filters the DataFrame based on a given amount threshold.
         :param data_frame: pandas DataFrame with an 'Amount' column.
-        :param amount: threshold amount for filtering.
+        :param amount: threshold amount for filtering, in major units.
         :param min_filter: Boolean if filtering for amounts greater than the threshold.
         :param max_filter: Boolean if filtering for amounts less than the threshold.
         :return: A pandas DataFrame filtered based on the specified amount condition.
@@ -281,10 +483,13 @@ def filter_by_amount(data_frame, amount, min_filter, max_filter):
         if 'Amount' not in data_frame.columns:
             raise KeyError("'Amount' column not found in DataFrame.")
 
+        amount = to_minor_units(amount)
+        amounts = data_frame['Amount'].to_numpy()
+
         if min_filter:
-            return data_frame.loc[data_frame['Amount'] > amount]
+            return apply_masks(data_frame, [amount_range_mask(amounts, minimum=amount)])
         elif max_filter:
-            return data_frame.loc[data_frame['Amount'] < amount]
+            return apply_masks(data_frame, [amount_range_mask(amounts, maximum=amount)])
         else:
             return data_frame
 
@@ -300,15 +505,17 @@ def filter_by_min_max(data_frame, min_amount, max_amount):
     """
     Filters the DataFrame based on minimum and maximum amount thresholds.
     :param data_frame: pandas DataFrame with an 'Amount' column.
-    :param min_amount: minimum amount threshold for filtering.
-    :param max_amount: maximum amount threshold for filtering.
+    :param min_amount: minimum amount threshold for filtering, in major units.
+    :param max_amount: maximum amount threshold for filtering, in major units.
     :return: A pandas DataFrame filtered based on the specified min and max amounts.
     """
     try:
         if 'Amount' not in data_frame.columns:
             raise KeyError("'Amount' column not found in DataFrame.")
 
-        return data_frame.loc[(data_frame['Amount'] > min_amount) & (data_frame['Amount'] < max_amount)]
+        mask = amount_range_mask(data_frame['Amount'].to_numpy(), to_minor_units(min_amount),
+                                 to_minor_units(max_amount))
+        return apply_masks(data_frame, [mask])
 
     except KeyError as e:
         raise KeyError(f"DataFrame column error filtering by min max: {e}")
@@ -321,41 +528,42 @@ def filter_by_min_max(data_frame, min_amount, max_amount):
 def _format_json_output(*args):
     """
     Formats a series of labels and values into a JSON-like string.
-    :param args: sequence of labels and values.
+    :param args: sequence of labels and values, values in minor units.
     :return: string.
     """
     indent = '  '
     formatted_output = '{\n'
     for i in range(0, len(args), 2):
         label, value = args[i], args[i + 1]
-        formatted_output += f'{indent}{label}: {value:n}\n'
+        formatted_output += f'{indent}{label}: {format_minor_units(value)}\n'
     formatted_output = formatted_output.rstrip('\n') + '\n}'
     return formatted_output
 
 
-def update_json_output(data_frame, in_out, savings_number):
+def update_json_output(data_frame, in_out, savings_number, totals=None):
     """
     Prepares a JSON-like formatted string output from DataFrame calculations.
     :param data_frame: A pandas DataFrame.
     :param in_out: A list indicating the type of transactions ('paid_in', 'paid_out').
     :param savings_number: Keywords for isolating savings data.
+    :param totals: (total in, total out) if already calculated, eg. by the database.
     :return: A Dash HTML component containing the formatted string.
     """
     try:
         filtered_by_out = len(in_out) == 1 and in_out[0] == 'paid_out'
-        total_in, total_out = calculate_total(data_frame)
+        total_in, total_out = totals if totals is not None else calculate_total(data_frame)
 
         if filtered_by_out:
             total_out, total_in = (total_in, 0) if not total_out else (total_out, total_in)
 
-        diff = round(abs(total_in - total_out), 2) if total_in and total_out else 0
+        diff = abs(total_in - total_out) if total_in and total_out else 0
 
         return_string = _format_json_output('Total in', total_in, 'Total out', total_out, 'Difference', diff)
 
         if savings_number:
             savings_df = isolate_keywords(data_frame, savings_number)
             savings_out, savings_in = calculate_total(savings_df)
-            savings_total = round(abs(savings_out - savings_in), 2)
+            savings_total = abs(savings_out - savings_in)
 
             savings_string = _format_json_output('Savings in', savings_in, 'Savings out', savings_out, 'Total Savings',
                                                  savings_total)
@@ -373,17 +581,18 @@ def update_json_output(data_frame, in_out, savings_number):
 
 def sort_by_duplicate_count_with_totals(data_frame):
     """
-    Groups the DataFrame by 'Details', sums the 'Amount' for each group, counts the duplicates,
-    and sorts the result by the duplicate count in descending order.
-    :param data_frame: pandas DataFrame with 'Details' and 'Amount' columns.
+    Groups the DataFrame by canonical 'Payee' (or raw 'Details' if there is no payee column), sums the 'Amount'
+    for each group, counts the duplicates, and sorts the result by the duplicate count in descending order.
+    :param data_frame: pandas DataFrame with 'Payee' or 'Details', and 'Amount' columns.
     :return: pandas DataFrame.
     """
     try:
-        if 'Details' not in data_frame.columns or 'Amount' not in data_frame.columns:
+        group_column = 'Payee' if 'Payee' in data_frame.columns else 'Details'
+        if group_column not in data_frame.columns or 'Amount' not in data_frame.columns:
             raise KeyError("Required columns 'Details' and 'Amount' not found in DataFrame.")
 
-        # group by 'Details' and calculate sum and size
-        grouped = data_frame.groupby('Details')['Amount'].agg(['sum', 'size']).reset_index()
+        # group by payee and calculate sum and size
+        grouped = data_frame.groupby(group_column)['Amount'].agg(['sum', 'size']).reset_index()
         grouped = grouped.rename(columns={'sum': 'Amount', 'size': 'Count'})
 
         # sort by 'Count' (duplicate count) in descending order
@@ -407,7 +616,7 @@ def _prepare_payments_df(df, column_name, max_list):
     :param max_list: maximum number of entries to return.
     :return: pandas DataFrame.
     """
-    df[column_name] = df['Amount'].round(2).abs()
+    df[column_name] = df['Amount'].abs()
     df = df.sort_values(column_name, ascending=(column_name == 'Out')).head(max_list)
     df.reset_index(drop=True, inplace=True)
     df.drop(['Amount', 'Count'], axis=1, inplace=True)
@@ -418,16 +627,18 @@ def _prepare_payments_df(df, column_name, max_list):
     return df
 
 
-def calculate_top_single_payments(data_frame, max_list):
+def calculate_top_single_payments(data_frame, max_list, duplicates_sorted=None):
     """
     Processes a DataFrame to identify and split top single incoming and outgoing payments.
     :param data_frame: pandas DataFrame.
     :param max_list: maximum number of entries to return.
+    :param duplicates_sorted: output of sort_by_duplicate_count_with_totals if already grouped, eg. by the database.
     :return: two pandas DataFrames - one for incoming payments and one for outgoing payments.
     """
     try:
         # collate repeat transactions and apply totals along with a repeat count
-        duplicates_sorted = sort_by_duplicate_count_with_totals(data_frame)
+        if duplicates_sorted is None:
+            duplicates_sorted = sort_by_duplicate_count_with_totals(data_frame)
 
         # select only the unique entries
         single_payments = duplicates_sorted[duplicates_sorted['Count'] == 1]
@@ -438,7 +649,7 @@ def calculate_top_single_payments(data_frame, max_list):
         single_payments_in = single_payments[single_payments['Amount'] > 0].copy()
         single_payments_out = single_payments[single_payments['Amount'] < 0].copy()
 
-        # round float amounts to 2 decimal places and drop unnecessary columns
+        # split signed amounts into an absolute column and drop unnecessary columns
         single_payments_in = _prepare_payments_df(single_payments_in, 'In', max_list)
         single_payments_out = _prepare_payments_df(single_payments_out, 'Out', max_list)
 
@@ -452,30 +663,30 @@ def calculate_top_single_payments(data_frame, max_list):
         raise Exception(f"Error calculating top single payments: {e}")
 
 
-def calculate_top_repeat_transactions(data_frame, max_list):
+def calculate_top_repeat_transactions(data_frame, max_list, duplicates_sorted=None):
     """
     Processes a DataFrame to identify and collect top repeat transactions.
     :param data_frame: pandas DataFrame.
     :param max_list: maximum number of repeat transactions to return.
+    :param duplicates_sorted: output of sort_by_duplicate_count_with_totals if already grouped, eg. by the database.
     :return: pandas DataFrame.
     """
     try:
 
         # collate repeat transactions and apply totals along with a repeat count
-        duplicate_count = sort_by_duplicate_count_with_totals(data_frame)
+        duplicate_count = duplicates_sorted
+        if duplicate_count is None:
+            duplicate_count = sort_by_duplicate_count_with_totals(data_frame)
 
         if 'Amount' not in duplicate_count.columns or 'Count' not in duplicate_count.columns:
             raise KeyError("Required columns 'Amount' or 'Count' not found in DataFrame.")
 
         # extract all multi-payments, exclude singles
-        top_multi_payments = duplicate_count[duplicate_count['Count'] > 1].head(max_list)
+        top_multi_payments = duplicate_count[duplicate_count['Count'] > 1].head(max_list).copy()
 
         if top_multi_payments.empty:
             return pd.DataFrame()
 
-        # round amounts to 2 decimal places
-        top_multi_payments['Amount'] = top_multi_payments['Amount'].round(2)
-
         # Split the payment amounts by positive/negative into In and Out columns
         top_multi_payments['In'] = top_multi_payments['Amount'].where(top_multi_payments['Amount'] > 0, 0)
         top_multi_payments['Out'] = top_multi_payments['Amount'].where(top_multi_payments['Amount'] < 0, 0)
@@ -511,6 +722,12 @@ def calculate_top_repeat_transactions(data_frame, max_list):
 
 
 def data_frame_to_table(data_frame):
+    # money columns are held in minor units and dates as datetimes until display
+    display_columns = {col: from_minor_units(data_frame[col]) for col in MONEY_COLUMNS if col in data_frame.columns}
+    display_columns.update({col: format_dates(data_frame[col]) for col in data_frame.columns
+                            if pd.api.types.is_datetime64_any_dtype(data_frame[col])})
+    data_frame = data_frame.assign(**display_columns)
+
     payments_table = dash_table.DataTable(data=data_frame.to_dict('records'),
                                           columns=[{"name": col, "id": col} for col in data_frame.columns],
                                           sort_action="native",
@@ -0,0 +1,259 @@
+"""
+Bank Statement Analysis Plotly Dash App
+
+This is a Plotly Dash app that analyses bank statements and provides various visualizations to help users understand
+their spending habits.
+
+It uses the following technologies and libraries:
+- Python 3.7
+- Plotly Dash
+- Pandas
+- Numpy
+
+The app is intended for educational or demonstration purposes only and should not be used in a production environment
+without further testing and security measures.
+
+To run the app, you will need to have Python and the required libraries installed.
+You can run the app by running the command 'python, python3, or py (depending on your setup) index.py' in the terminal.
+
+This project is released under the MIT License.
+
+Author: @10XTMY, Molmez LTD (www.molmez.io)
+Date Published: 30 January 2023
+
+
+This is the append mode ingest: a new statement is added to the data already loaded instead of replacing it
+
+Rows the session already holds are recognised by date and row hash (see transaction_row_hashes), so overlapping
+statements never duplicate history, and only the new rows are normalised and categorised. Alongside the data set
+the session keeps aggregates that are updated from the new rows only, so a monthly update costs O(new rows):
+    'rows':              number of transactions the aggregates cover
+    'payees':            {payee: [sum, count]}, amounts in minor units
+    'daily':             {date: [in, out]}, outgoing as a positive amount
+    'spend':             {month: {category: {payee: [spend, count]}}}, the monthly spend table budgets are
+                         checked against (see budgets.py)
+    'anomaly_summaries': anomaly summaries, see anomalies.py
+The anomaly statistics (histograms) the summaries are updated from are only needed when a statement is added, so
+they are kept apart from the aggregates, which the analytics page sends with every callback.
+"""
+from bisect import bisect_left, bisect_right
+import numpy as np
+import pandas as pd
+from anomalies import empty_statistics, update_statistics, summarise_groups
+from bank_formats import parse_dates
+from budgets import SPEND_COLUMNS, monthly_spend
+from helpers import add_derived_columns, data_frame_to_store, records_to_data_frame, transaction_row_hashes, \
+    format_dates, CODED_COLUMNS
+
+STORE_COLUMNS = ('Date', 'Details', 'Amount')
+
+
+def build_aggregates(data_frame):
+    """
+    Builds the aggregates of a whole data set, eg. when a statement replaces the session's data.
+    :param data_frame: pandas DataFrame with a DateTimeIndex and 'Payee', 'Category' and 'Amount' columns.
+    :return: tuple of (aggregates dictionary, see the module docstring, anomaly statistics).
+    """
+    aggregates = {'rows': 0, 'payees': {}, 'daily': {}, 'spend': {}, 'anomaly_summaries': {}}
+    statistics = empty_statistics()
+    return update_aggregates(aggregates, statistics, data_frame), statistics
+
+
+def load_statistics(statistics):
+    """
+    Restores anomaly statistics read back from a dcc.Store, where JSON has turned the integer bins into strings.
+    """
+    return {family: {group: {int(bin_number): count for bin_number, count in histogram.items()}
+                     for group, histogram in groups.items()}
+            for family, groups in statistics.items()}
+
+
+def update_aggregates(aggregates, statistics, new_rows):
+    """
+    Adds new transactions to the aggregates and anomaly statistics in place, reading only the new rows.
+    :param aggregates: aggregates dictionary, as built by build_aggregates and kept in the dcc.Store.
+    :param statistics: anomaly statistics of the same rows.
+    :param new_rows: pandas DataFrame of transactions not already covered by the aggregates.
+    :return: the aggregates dictionary.
+    """
+    if new_rows.empty:
+        return aggregates
+
+    amounts = new_rows['Amount']
+
+    payees = aggregates['payees']
+    for payee, (total, count) in amounts.groupby(new_rows['Payee'].to_numpy()).agg(['sum', 'size']).iterrows():
+        previous = payees.get(payee, [0, 0])
+        payees[payee] = [previous[0] + int(total), previous[1] + int(count)]
+
+    daily = aggregates['daily']
+    split = pd.DataFrame({'In': amounts.where(amounts > 0, 0).to_numpy(),
+                          'Out': -amounts.where(amounts < 0, 0).to_numpy()},
+                         index=format_dates(new_rows.index))
+    for day, (total_in, total_out) in split.groupby(level=0).sum().iterrows():
+        previous = daily.get(day, [0, 0])
+        daily[day] = [previous[0] + int(total_in), previous[1] + int(total_out)]
+
+    spend = aggregates['spend']
+    for month, category, payee, total, count in monthly_spend(new_rows).itertuples(index=False, name=None):
+        payees_spend = spend.setdefault(month, {}).setdefault(category, {})
+        previous = payees_spend.get(payee, [0, 0])
+        payees_spend[payee] = [previous[0] + int(total), previous[1] + int(count)]
+
+    touched = update_statistics(statistics, new_rows)
+    aggregates['anomaly_summaries'] = summarise_groups(statistics, aggregates['anomaly_summaries'], touched)
+
+    aggregates['rows'] += len(new_rows)
+    return aggregates
+
+
+def aggregates_match(aggregates, data):
+    """
+    :return: True if the aggregates cover exactly the rows of the stored data set, and hold everything
+        build_aggregates keeps (sessions stored by older versions have no spend table).
+    """
+    return bool(aggregates) and isinstance(data, dict) and aggregates.get('rows') == len(data.get('Date', ())) \
+        and 'spend' in aggregates
+
+
+def payee_totals(aggregates):
+    """
+    The maintained equivalent of sort_by_duplicate_count_with_totals over the whole data set.
+    :return: pandas DataFrame with 'Payee', 'Amount' and 'Count' columns, largest count first.
+    """
+    totals = pd.DataFrame([(payee, total, count) for payee, (total, count) in sorted(aggregates['payees'].items())],
+                          columns=['Payee', 'Amount', 'Count'])
+    totals['Amount'] = totals['Amount'].astype('int64')
+    return totals.sort_values('Count', ascending=False)
+
+
+def daily_totals(aggregates):
+    """
+    :return: pandas DataFrame with 'In' and 'Out' columns (minor units) and a daily DateTimeIndex, as
+        timeseries.calculate_time_series builds from the transactions.
+    """
+    daily = pd.DataFrame.from_dict(aggregates['daily'], orient='index', columns=['In', 'Out'], dtype='int64')
+    daily.index = pd.DatetimeIndex(parse_dates(pd.Series(daily.index), '%Y-%m-%d'), name='Date')
+    return daily.sort_index().resample('D').sum()
+
+
+def spend_table(aggregates):
+    """
+    The maintained equivalent of budgets.calculate_monthly_spend over the whole data set.
+    :return: pandas DataFrame with budgets.SPEND_COLUMNS.
+    """
+    spend = pd.DataFrame([(month, category, payee, total, count)
+                          for month, categories in aggregates['spend'].items()
+                          for category, payees in categories.items()
+                          for payee, (total, count) in payees.items()], columns=SPEND_COLUMNS)
+    spend[['Spend', 'Count']] = spend[['Spend', 'Count']].astype('int64')
+    return spend
+
+
+def overall_totals(aggregates):
+    """
+    :return: total incoming and outgoing amounts of the whole data set in minor units.
+    """
+    daily = np.array(list(aggregates['daily'].values()), dtype='int64').reshape(-1, 2)
+    return int(daily[:, 0].sum()), int(daily[:, 1].sum())
+
+
+def _sorted_store(data):
+    """
+    Brings a stored data set into the column per list, date ordered form of data_frame_to_store, which
+    sessions stored by older versions (a list of records, or no payee and category codes) are not in.
+    """
+    if isinstance(data, dict) and 'Date' in data and 'Names' in data:
+        dates = np.array(data['Date'])
+        if (dates[1:] >= dates[:-1]).all():
+            return dict({column: data[column] for column in _store_columns(data)}, Names=data['Names'])
+    return data_frame_to_store(records_to_data_frame(data))
+
+
+def _store_columns(*stores):
+    # the currency column is only stored when a statement has one
+    return STORE_COLUMNS + CODED_COLUMNS + (('Currency',) if any('Currency' in store for store in stores) else ())
+
+
+def _combine_codes(data, new_data, column):
+    """
+    Concatenates the codes of a coded column, mapping the new rows' codes onto the stored unique names.
+    :return: tuple of (list of codes, list of unique names).
+    """
+    names = list(data['Names'][column])
+    positions = {name: code for code, name in enumerate(names)}
+    for name in new_data['Names'][column]:
+        if name not in positions:
+            positions[name] = len(names)
+            names.append(name)
+    remap = [positions[name] for name in new_data['Names'][column]]
+    return data[column] + [remap[code] if code >= 0 else -1 for code in new_data[column]], names
+
+
+def overlap_mask(data, statement):
+    """
+    Finds the statement rows the stored data set already holds. Only stored rows within the statement's dates
+    are compared, found by bisecting the date ordered store.
+    :param data: stored data set, as returned by data_frame_to_store.
+    :param statement: pandas DataFrame of the new statement with a DateTimeIndex and 'Details' and 'Amount'.
+    :return: boolean numpy array, True for rows already stored.
+    """
+    statement_dates = format_dates(statement.index)
+    start = bisect_left(data['Date'], min(statement_dates))
+    stop = bisect_right(data['Date'], max(statement_dates))
+    if start == stop:
+        return np.zeros(len(statement), dtype=bool)
+
+    stored = pd.DataFrame({'Details': data['Details'][start:stop], 'Amount': data['Amount'][start:stop]},
+                          index=parse_dates(pd.Series(data['Date'][start:stop]), '%Y-%m-%d'))
+    return pd.Index(transaction_row_hashes(statement)).isin(transaction_row_hashes(stored))
+
+
+def append_statement(data, aggregates, statistics, statement):
+    """
+    Appends the rows of a statement that are not already loaded to the stored data set.
+    :param data: stored data set (see data_frame_to_store), None or empty when nothing is loaded yet.
+    :param aggregates: aggregates of the stored data set, rebuilt if missing or out of step.
+    :param statistics: anomaly statistics of the stored data set, as kept in the dcc.Store.
+    :param statement: pandas DataFrame of the new statement as returned by bank_csv_to_data_frame, with or
+        without the derived 'Payee' and 'Category' columns.
+    :return: tuple of (new stored data set, updated aggregates, updated anomaly statistics, new rows DataFrame).
+    """
+    try:
+        statement = statement.drop(columns=['Payee', 'Category'], errors='ignore')
+
+        if not data:
+            new_rows = add_derived_columns(statement)
+            return (data_frame_to_store(new_rows),) + build_aggregates(new_rows) + (new_rows,)
+
+        data = _sorted_store(data)
+        if aggregates_match(aggregates, data) and statistics:
+            statistics = load_statistics(statistics)
+        else:
+            aggregates, statistics = build_aggregates(records_to_data_frame(data))
+
+        # only rows the session does not hold yet are normalised, categorised and aggregated
+        new_rows = add_derived_columns(statement.loc[~overlap_mask(data, statement)])
+        new_data = data_frame_to_store(new_rows)
+
+        # rows of a statement without currencies are in the default currency, stored as missing
+        combined = {column: data.get(column, [None] * len(data['Date'])) +
+                    new_data.get(column, [None] * len(new_data['Date']))
+                    for column in _store_columns(data, new_data) if column not in CODED_COLUMNS}
+        names = {}
+        for column in CODED_COLUMNS:
+            combined[column], names[column] = _combine_codes(data, new_data, column)
+        if new_data['Date'] and data['Date'] and new_data['Date'][0] < data['Date'][-1]:
+            # an earlier statement, merge it into date order
+            order = np.argsort(np.array(combined['Date']), kind='stable')
+            combined = {column: [values[i] for i in order] for column, values in combined.items()}
+        combined['Names'] = names
+
+        return combined, update_aggregates(aggregates, statistics, new_rows), statistics, new_rows
+
+    except KeyError as e:
+        raise KeyError(f"DataFrame column error appending statement: {e}")
+    except ValueError as e:
+        raise ValueError(f"Data processing error appending statement: {e}")
+    except Exception as e:
+        raise Exception(f"Error appending statement: {e}")
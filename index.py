@@ -29,6 +29,7 @@ Date Published: 30 January 2023
 from dash import dcc, html, Input, Output, callback
 from app import app, server  # *** do not remove 'server', required import ***
 from apps import analytics, upload
+import api  # noqa: F401, registers the JSON API routes on the server
 
 
 app.layout = html.Div([
@@ -36,7 +37,10 @@ app.layout = html.Div([
     html.Div(id='page-content', children=[
 
     ]),
-    dcc.Store(id='data-set', storage_type='session')
+    dcc.Store(id='data-set', storage_type='session'),
+    # running totals of the data set, updated from the new rows when a statement is appended (see incremental.py)
+    dcc.Store(id='data-aggregates', storage_type='session'),
+    dcc.Store(id='data-statistics', storage_type='session')
 ])
 
 
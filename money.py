@@ -0,0 +1,101 @@
+"""
+Bank Statement Analysis Plotly Dash App
+
+This is a Plotly Dash app that analyses bank statements and provides various visualizations to help users understand
+their spending habits.
+
+It uses the following technologies and libraries:
+- Python 3.7
+- Plotly Dash
+- Pandas
+- Numpy
+
+The app is intended for educational or demonstration purposes only and should not be used in a production environment
+without further testing and security measures.
+
+To run the app, you will need to have Python and the required libraries installed.
+You can run the app by running the command 'python, python3, or py (depending on your setup) index.py' in the terminal.
+
+This project is released under the MIT License.
+
+Author: @10XTMY, Molmez LTD (www.molmez.io)
+Date Published: 30 January 2023
+
+These are the money helpers, amounts are held as integer minor units (eg. pence) from ingest onward so sums are exact
+"""
+import locale
+from decimal import Decimal, ROUND_HALF_EVEN
+import numpy as np
+import pandas as pd
+
+MINOR_UNITS_PER_MAJOR = 100
+
+
+def _finite_amounts(values):
+    """
+    The amounts of a Series as a float64 array, raising a ValueError naming the rows of missing or infinite ones.
+    """
+    amounts = values.to_numpy(dtype='float64')
+    invalid = ~np.isfinite(amounts)
+    if invalid.any():
+        rows = ', '.join(map(str, values.index[invalid][:5]))
+        more = ' ...' if invalid.sum() > 5 else ''
+        raise ValueError(f'missing or invalid amount on row {rows}{more}')
+    return amounts
+
+
+def to_minor_units(values):
+    """
+    Converts major currency amounts (eg. 12.34) to integer minor units (eg. 1234), whatever their dtype: an integer
+    amount is a whole number of major units. Use as_minor_units for amounts that already are minor units.
+    Missing or infinite amounts have no integer value and raise a ValueError rather than being cast to garbage.
+    :param values: scalar amount, or a pandas Series of numeric values or numeric strings.
+    :return: int for a scalar input, otherwise an int64 pandas Series.
+    """
+    if isinstance(values, pd.Series):
+        if not pd.api.types.is_numeric_dtype(values):
+            values = pd.to_numeric(values.str.replace(',', '', regex=False))
+        amounts = _finite_amounts(values)
+
+        # float64 holds any 2 decimal place amount below ~1e13 closely enough for rint to be exact
+        return pd.Series(np.rint(amounts * MINOR_UNITS_PER_MAJOR).astype('int64'),
+                         index=values.index, name=values.name)
+
+    minor = Decimal(str(values).replace(',', '')) * MINOR_UNITS_PER_MAJOR
+    if not minor.is_finite():
+        raise ValueError(f'missing or invalid amount: {values}')
+    return int(minor.to_integral_value(rounding=ROUND_HALF_EVEN))
+
+
+def as_minor_units(values):
+    """
+    Reads amounts that already are integer minor units, eg. from the session store, where the JSON round trip in
+    the browser can turn them into floats.
+    :param values: pandas Series of minor unit amounts.
+    :return: int64 pandas Series.
+    """
+    if pd.api.types.is_integer_dtype(values):
+        return values.astype('int64')
+    return pd.Series(np.rint(_finite_amounts(values)).astype('int64'), index=values.index, name=values.name)
+
+
+def from_minor_units(values):
+    """
+    Converts integer minor units back to major currency amounts, for display only.
+    :param values: int, numpy array or pandas Series of minor units.
+    :return: float amounts in major units.
+    """
+    return values / MINOR_UNITS_PER_MAJOR
+
+
+def format_minor_units(value):
+    """
+    Formats an integer minor unit amount as a locale aware major unit string, eg. 123456 -> '1,234.56'.
+    :param value: amount in minor units.
+    :return: string.
+    """
+    value = int(value)
+    sign = '-' if value < 0 else ''
+    major, minor = divmod(abs(value), MINOR_UNITS_PER_MAJOR)
+    decimal_point = locale.localeconv()['decimal_point']
+    return f"{sign}{locale.format_string('%d', major, grouping=True)}{decimal_point}{minor:02d}"
@@ -0,0 +1,225 @@
+"""
+Bank Statement Analysis Plotly Dash App
+
+This is a Plotly Dash app that analyses bank statements and provides various visualizations to help users understand
+their spending habits.
+
+It uses the following technologies and libraries:
+- Python 3.7
+- Plotly Dash
+- Pandas
+- Numpy
+
+The app is intended for educational or demonstration purposes only and should not be used in a production environment
+without further testing and security measures.
+
+To run the app, you will need to have Python and the required libraries installed.
+You can run the app by running the command 'python, python3, or py (depending on your setup) index.py' in the terminal.
+
+This project is released under the MIT License.
+
+Author: @10XTMY, Molmez LTD (www.molmez.io)
+Date Published: 30 January 2023
+
+This is the payee normalisation that maps raw transaction details such as 'STARBUCKS 1234' and 'Starbucks 14/02'
+onto one canonical payee name
+"""
+import json
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from difflib import SequenceMatcher
+import pandas as pd
+from cache import CACHE_DIR
+
+try:
+    import fcntl
+except ImportError:  # Windows, where only the in-process lock applies
+    fcntl = None
+
+PAYEE_CACHE_FILE = CACHE_DIR.joinpath('payees.json')
+PAYEE_LOCK_FILE = CACHE_DIR.joinpath('payees.lock')
+
+# names at least this similar within a block are treated as the same payee
+SIMILARITY_THRESHOLD = 0.88
+
+# token rules, applied in order to the lower cased details
+TOKEN_RULES = [
+    # card and reference numbers, eg. *1234, xxxx1234, ref 00012
+    (r'\*+\s*\d+|x{2,}\d+|\bref\b\s*\S+', ' '),
+    # dates and times, eg. 12/01, 12-01-2024, 14:32
+    (r'\b\d{1,2}[/.-]\d{1,2}(?:[/.-]\d{2,4})?\b|\b\d{1,2}:\d{2}\b', ' '),
+    # payment method prefixes added by the bank
+    (r'^(?:card payment to|payment to|direct debit to|pos|visa|contactless|cpt|dd|so|bp|fpi|fpo|bgc)\b', ' '),
+    # payment processor prefixes, eg. 'PAYPAL *NETFLIX' and 'SQ *CORNER CAFE' are keyed on the merchant
+    (r'^\s*(?:paypal|pp|sq|sumup|i?zettle_?|sp|tst|gc)\s*\*\s*', ' '),
+    # punctuation, keeping the words either side
+    (r'[^a-z0-9& ]+', ' '),
+    # company suffixes and domains
+    (r'\b(?:ltd|limited|plc|inc|llc|gmbh|co|uk|com|www|on)\b', ' '),
+    # store and terminal numbers, short numbers such as the 7 in 7-Eleven are kept
+    (r'\b\d{3,}\b|\b(?=\w*\d)(?=\w*[a-z])\w{4,}\b', ' '),
+]
+
+# raw details -> canonical payee key, loaded lazily from PAYEE_CACHE_FILE. The dictionary is never changed once
+# published, new entries replace it with a merged copy, so threads can read it without holding a lock
+_payee_index = None
+_index_lock = threading.Lock()
+
+
+def _read_index_file():
+    try:
+        with open(PAYEE_CACHE_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _load_index():
+    global _payee_index
+    if _payee_index is None:
+        index = _read_index_file()
+        with _index_lock:
+            if _payee_index is None:
+                _payee_index = index
+    return _payee_index
+
+
+def _publish_index(entries):
+    """
+    Replaces the shared index with a copy that includes the entries, readers keep the snapshot they took.
+    """
+    global _payee_index
+    with _index_lock:
+        index = dict(_payee_index or {})
+        index.update(entries)
+        _payee_index = index
+
+
+@contextmanager
+def _index_file_lock():
+    """
+    Serialises writers of PAYEE_CACHE_FILE across threads and, where fcntl exists, across worker processes.
+    """
+    with _index_lock:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        with open(PAYEE_LOCK_FILE, 'a') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _save_index(new_entries):
+    """
+    Merges new entries into PAYEE_CACHE_FILE. The file is re-read under the lock, so entries written by other
+    workers since this one loaded the index are kept rather than overwritten.
+    :param new_entries: dictionary of raw details -> canonical payee key.
+    """
+    temp_name = None
+    try:
+        with _index_file_lock():
+            index = _read_index_file()
+            index.update(new_entries)
+            with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=CACHE_DIR, prefix='payees.',
+                                             suffix='.tmp', delete=False) as f:
+                temp_name = f.name
+                json.dump(index, f)
+            # temporary files are created owner-only, the index is read by every worker as before
+            os.chmod(temp_name, 0o644)
+            # replace in one step so other workers never read a half written file
+            os.replace(temp_name, PAYEE_CACHE_FILE)
+            temp_name = None
+        _publish_index(index)
+    except OSError:
+        # the cache is an optimisation, a read-only deployment still works without it
+        pass
+    finally:
+        if temp_name is not None:
+            try:
+                os.remove(temp_name)
+            except OSError:
+                pass
+
+
+def apply_token_rules(details):
+    """
+    Cleans transaction details into a payee key with the vectorized TOKEN_RULES.
+    :param details: pandas Series of unique raw details strings.
+    :return: pandas Series of keys, falling back to the lower cased details if nothing is left.
+    """
+    keys = details.str.lower()
+    for pattern, replacement in TOKEN_RULES:
+        keys = keys.str.replace(pattern, replacement, regex=True)
+    keys = keys.str.split().str.join(' ')
+
+    return keys.where(keys.str.len() > 0, details.str.lower().str.strip())
+
+
+def _same_payee(key, canonical):
+    """
+    A name matches a canonical name of two or more words that it starts with, eg. 'tesco express london' ->
+    'tesco express', or one that is spelt almost the same, eg. 'amazon prime' -> 'amazon prme'. A shared first
+    word alone is not enough, 'amazon prime' and 'amazon' stay separate payees.
+    """
+    key_tokens, canonical_tokens = key.split(), canonical.split()
+    if len(canonical_tokens) > 1 and key_tokens[:len(canonical_tokens)] == canonical_tokens:
+        return True
+    return SequenceMatcher(None, key, canonical).ratio() >= SIMILARITY_THRESHOLD
+
+
+def match_canonical_names(keys, known_canonical=()):
+    """
+    Collapses payee keys onto canonical names with blocked similarity matching. Only keys sharing their first
+    word are ever compared, which keeps the matching far from O(n²) on real statements.
+    :param keys: iterable of cleaned payee keys.
+    :param known_canonical: canonical names already in the index, matched before new ones are created.
+    :return: dictionary of key -> canonical name.
+    """
+    blocks = {}
+    for canonical in known_canonical:
+        blocks.setdefault(canonical.split()[0], []).append(canonical)
+
+    # shorter keys first, so 'tesco express' becomes canonical before 'tesco express london' is seen
+    mapping = {}
+    for key in sorted(set(keys), key=lambda k: (len(k.split()), k)):
+        block = blocks.setdefault(key.split()[0], [])
+        mapping[key] = next((canonical for canonical in block if _same_payee(key, canonical)), None)
+        if mapping[key] is None:
+            block.append(key)
+            mapping[key] = key
+
+    return mapping
+
+
+def normalize_payees(details):
+    """
+    Maps raw transaction details onto canonical payee names. Each unique string is only normalised once, ever:
+    results persist in PAYEE_CACHE_FILE, so a re-ingest only normalises strings that have not been seen before.
+    :param details: pandas Series of raw transaction details.
+    :return: pandas Series of title cased payee names aligned with details.
+    """
+    index = _load_index()
+
+    codes, uniques = pd.factorize(details.fillna(''))
+    uniques = pd.Series(uniques)
+
+    unseen = uniques[~uniques.isin(list(index))]
+    unseen = unseen[unseen.str.strip().str.len() > 0]
+    if not unseen.empty:
+        keys = apply_token_rules(unseen)
+        mapping = match_canonical_names(keys, set(index.values()))
+        new_entries = dict(zip(unseen, keys.map(mapping)))
+        _publish_index(new_entries)
+        _save_index(new_entries)
+
+    # the snapshot taken above is never changed, the new keys are filled in from new_entries
+    canonical = uniques.map(index).astype(object)
+    if not unseen.empty:
+        canonical[unseen.index] = unseen.map(new_entries)
+    canonical = canonical.fillna('').str.title()
+    return pd.Series(canonical.to_numpy()[codes], index=details.index, name='Payee')
@@ -0,0 +1,207 @@
+"""
+Bank Statement Analysis Plotly Dash App
+
+This is a Plotly Dash app that analyses bank statements and provides various visualizations to help users understand
+their spending habits.
+
+It uses the following technologies and libraries:
+- Python 3.7
+- Plotly Dash
+- Pandas
+- Numpy
+
+The app is intended for educational or demonstration purposes only and should not be used in a production environment
+without further testing and security measures.
+
+To run the app, you will need to have Python and the required libraries installed.
+You can run the app by running the command 'python, python3, or py (depending on your setup) index.py' in the terminal.
+
+This project is released under the MIT License.
+
+Author: @10XTMY, Molmez LTD (www.molmez.io)
+Date Published: 30 January 2023
+
+
+This is the analytics pipeline: the date range, filters, totals and top lists of the analytics page over one data
+set as plain DataFrames, shared by the analytics page, the JSON API (api.py) and the batch command line (cli.py)
+"""
+import pandas as pd
+from budgets import calculate_monthly_spend
+from cache import cached_on_data_frame
+from fx import DEFAULT_CURRENCY, convert_currency, has_currencies
+from categories import calculate_category_totals
+from helpers import filter_by_date_range, calculate_total, calculate_top_repeat_transactions, \
+    calculate_top_single_payments, format_dates, records_to_data_frame, MONEY_COLUMNS
+from incremental import aggregates_match, payee_totals, overall_totals, daily_totals, spend_table
+from money import from_minor_units
+from preload import demo_data_frame
+from query_plan import build_filter_plan, without_date_range, execute_plan
+from storage import database_enabled, query_analytics, query_monthly_spend, query_history
+from timeseries import calculate_time_series
+
+DEFAULT_TOP_LIST_LENGTH = 20
+
+REPORTS = ('transactions', 'totals', 'top_repeat', 'top_single_in', 'top_single_out', 'categories', 'monthly')
+
+
+def _build_reports(data_frame, filtered, plan, top_list_length, duplicates_sorted=None, totals=None, daily=None):
+    """
+    Builds the reports from a date range frame and its filtered rows, using the payee groups, totals and daily
+    totals when they are already known, eg. from the database or the session's aggregates.
+    """
+    top_repeat = calculate_top_repeat_transactions(data_frame, top_list_length, duplicates_sorted)
+    top_single_out, top_single_in = calculate_top_single_payments(data_frame, top_list_length, duplicates_sorted)
+
+    # outgoing payments were made positive by the filter, as update_json_output reports them
+    total_in, total_out = totals if totals is not None else calculate_total(filtered)
+    if plan.direction == 'out' and not total_out:
+        total_in, total_out = 0, total_in
+    difference = abs(total_in - total_out) if total_in and total_out else 0
+
+    # outgoing payments were made positive by the filter, the category and time series totals need them signed
+    signed = filtered.assign(Amount=-filtered['Amount']) if plan.direction == 'out' else filtered
+    if daily is None:
+        daily = signed
+
+    return {'transactions': filtered,
+            'totals': pd.DataFrame({'In': [total_in], 'Out': [total_out], 'Difference': [difference]}),
+            'top_repeat': top_repeat,
+            'top_single_in': top_single_in,
+            'top_single_out': top_single_out,
+            'categories': calculate_category_totals(signed),
+            'monthly': calculate_time_series(daily)[1]}
+
+
+@cached_on_data_frame()
+def run_reports(data_frame, plan, top_list_length=DEFAULT_TOP_LIST_LENGTH):
+    """
+    Runs the analytics page's calculations in the same order: the date range first, the top lists over the
+    date range, then the remaining filters for the transactions, totals, categories and monthly time series.
+    Cached per (data set, plan, list length).
+    :param data_frame: pandas DataFrame as returned by bank_csv_to_data_frame.
+    :param plan: query_plan.FilterPlan.
+    :param top_list_length: number of rows in the top lists.
+    :return: dictionary of report name (see REPORTS) -> pandas DataFrame, amounts in minor units.
+    """
+    try:
+        if plan.start_date:
+            data_frame = filter_by_date_range(data_frame, plan.start_date, plan.end_date)
+
+        filtered = execute_plan(without_date_range(plan), data_frame)
+        return _build_reports(data_frame, filtered, plan, top_list_length)
+
+    except KeyError as e:
+        raise KeyError(f"DataFrame column error running reports: {e}")
+    except ValueError as e:
+        raise ValueError(f"Data processing error running reports: {e}")
+    except Exception as e:
+        raise Exception(f"Error running reports: {e}")
+
+
+def load_data_set(data=None):
+    """
+    :param data: the session's stored data set, see helpers.data_frame_to_store.
+    :return: pandas DataFrame of the stored data set, or of the demo data if there is none.
+    """
+    return records_to_data_frame(data) if data else demo_data_frame()
+
+
+def analytics_reports(plan, top_list_length=DEFAULT_TOP_LIST_LENGTH, data=None, aggregates=None, currency=None):
+    """
+    The analytics page's results for a filter plan, from the session's data set if there is one, otherwise from
+    the database when it is enabled (filters pushed down to SQL), otherwise from the demo data.
+    :param plan: query_plan.FilterPlan.
+    :param top_list_length: number of rows in the top lists.
+    :param data: the session's stored data set.
+    :param aggregates: the session's aggregates of data, see incremental.py.
+    :param currency: base currency amounts are converted to, fx.DEFAULT_CURRENCY if not given.
+    :return: dictionary of the REPORTS plus
+        'history': pandas DataFrame of the whole data set the filters were applied to, None when the database
+            answered, only the filtered rows are loaded then
+        'recurring': recurring payments of the history, or None if they have to be detected
+        'anomaly_summaries': maintained anomaly summaries of the history, or None if they have to be built
+        'daily': maintained daily totals when they stand in for the filtered rows, otherwise None
+    """
+    try:
+        currency = currency or DEFAULT_CURRENCY
+        history = None
+        if not data and database_enabled():
+            # the database holds amounts in the default currency, the filters run in SQL only for that currency
+            if currency == DEFAULT_CURRENCY:
+                database_results = query_analytics(plan)
+                if database_results:
+                    filtered, recurring, duplicates_sorted, totals, anomaly_summaries = database_results
+                    reports = _build_reports(filtered, filtered, plan, top_list_length, duplicates_sorted, totals)
+                    reports.update(history=None, recurring=recurring, anomaly_summaries=anomaly_summaries,
+                                   daily=None)
+                    return reports
+            else:
+                history = query_history()
+
+        history = load_data_set(data) if history is None else history
+        if has_currencies(history, currency):
+            # converted once per data set and currency, the maintained aggregates are in the original amounts
+            history, aggregates = convert_currency(history, currency), None
+
+        if not aggregates_match(aggregates, data):
+            reports = run_reports(history, plan, top_list_length)
+            reports.update(history=history, recurring=None, anomaly_summaries=None, daily=None)
+            return reports
+
+        # the aggregates kept up to date on upload stand in for grouping the whole data set again
+        daily = None
+        if plan == build_filter_plan():
+            daily = daily_totals(aggregates)
+            reports = _build_reports(history, history, plan, top_list_length, payee_totals(aggregates),
+                                     overall_totals(aggregates), daily)
+        else:
+            reports = run_reports(history, plan, top_list_length)
+        reports.update(history=history, recurring=None, anomaly_summaries=aggregates['anomaly_summaries'],
+                       daily=daily)
+        return reports
+
+    except KeyError as e:
+        raise KeyError(f"DataFrame column error running analytics: {e}")
+    except ValueError as e:
+        raise ValueError(f"Data processing error running analytics: {e}")
+    except Exception as e:
+        raise Exception(f"Error running analytics: {e}")
+
+
+def monthly_spend_table(data=None, aggregates=None):
+    """
+    The monthly spend table budgets are checked against, kept up to date by the database or the session's
+    aggregates as statements are added, otherwise built once per data set. Budgets are in the default currency.
+    :param data: the session's stored data set.
+    :param aggregates: the session's aggregates of data, see incremental.py.
+    :return: pandas DataFrame with budgets.SPEND_COLUMNS.
+    """
+    spend = query_monthly_spend() if not data and database_enabled() else None
+    if spend is not None:
+        return spend
+
+    # the maintained table is in the original amounts, a data set with currencies is converted first
+    if aggregates_match(aggregates, data) and 'Currency' not in data:
+        return spend_table(aggregates)
+
+    history = load_data_set(data)
+    if has_currencies(history):
+        history = convert_currency(history)
+    return calculate_monthly_spend(history)
+
+
+def report_for_export(report):
+    """
+    Brings a report into a flat, portable form: a date index becomes a 'Date' column of YYYY-MM-DD strings and
+    money columns are converted to major units.
+    :param report: pandas DataFrame from run_reports.
+    :return: new pandas DataFrame.
+    """
+    report = report.copy()
+    if isinstance(report.index, pd.DatetimeIndex):
+        report.insert(0, 'Date', format_dates(report.index))
+    report = report.reset_index(drop=True)
+
+    for column in report.columns.intersection(MONEY_COLUMNS + ('Difference', 'Net', 'Out Change')):
+        report[column] = from_minor_units(report[column])
+    return report
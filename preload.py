@@ -0,0 +1,74 @@
+"""
+Bank Statement Analysis Plotly Dash App
+
+This is a Plotly Dash app that analyses bank statements and provides various visualizations to help users understand
+their spending habits.
+
+It uses the following technologies and libraries:
+- Python 3.7
+- Plotly Dash
+- Pandas
+- Numpy
+
+The app is intended for educational or demonstration purposes only and should not be used in a production environment
+without further testing and security measures.
+
+To run the app, you will need to have Python and the required libraries installed.
+You can run the app by running the command 'python, python3, or py (depending on your setup) index.py' in the terminal.
+
+This project is released under the MIT License.
+
+Author: @10XTMY, Molmez LTD (www.molmez.io)
+Date Published: 30 January 2023
+
+
+This is the start-up preloading for production serving: the demo data set is parsed and its aggregates computed once,
+before the server forks its workers, so every worker shares the same memory pages copy-on-write (see wsgi.py)
+"""
+import functools
+from pathlib import Path
+from anomalies import build_summaries
+from helpers import bank_csv_to_data_frame
+from budgets import calculate_monthly_spend, load_budgets
+from categories import load_rules
+from query_plan import build_filter_plan
+from recurring import detect_recurring_transactions
+from timeseries import calculate_time_series
+
+DEMO_CSV_FILE = Path(__file__).parent.joinpath('datasets', 'transactions.csv').resolve()
+
+
+@functools.lru_cache(maxsize=1)
+def demo_data_frame():
+    """
+    Parses the demo statement once per process. The frame is shared by every request and must never be modified
+    in place, callers take a copy (or a filtered frame) before changing anything.
+    :return: pandas DataFrame as returned by bank_csv_to_data_frame.
+    """
+    return bank_csv_to_data_frame(DEMO_CSV_FILE)
+
+
+def warm_caches():
+    """
+    Fills the per-process caches with what the analytics page computes on its first, unfiltered view of the demo
+    data: the parsed frame, the category rules, the recurring payments, the anomaly summaries, the time series, the
+    budgets and their spend table and the reports of the paid in / paid out selections, as pipeline.analytics_reports
+    runs them.
+    Called before fork, the results are inherited by every worker instead of being recomputed by each one.
+    :return: number of rows in the demo data set.
+    """
+    # imported here, pipeline.py reads the demo data set from this module
+    from pipeline import DEFAULT_TOP_LIST_LENGTH, run_reports
+
+    data_frame = demo_data_frame()
+    load_rules()
+    detect_recurring_transactions(data_frame)
+    build_summaries(data_frame)
+    calculate_time_series(data_frame)
+    load_budgets()
+    calculate_monthly_spend(data_frame)
+    for in_out in ([], ['paid_in'], ['paid_out'], ['paid_in', 'paid_out']):
+        # the same arguments as analytics_reports passes, so the cache key matches
+        run_reports(data_frame, build_filter_plan(in_out=in_out), DEFAULT_TOP_LIST_LENGTH)
+
+    return len(data_frame)
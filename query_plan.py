@@ -0,0 +1,260 @@
+"""
+Bank Statement Analysis Plotly Dash App
+
+This is a Plotly Dash app that analyses bank statements and provides various visualizations to help users understand
+their spending habits.
+
+It uses the following technologies and libraries:
+- Python 3.7
+- Plotly Dash
+- Pandas
+- Numpy
+
+The app is intended for educational or demonstration purposes only and should not be used in a production environment
+without further testing and security measures.
+
+To run the app, you will need to have Python and the required libraries installed.
+You can run the app by running the command 'python, python3, or py (depending on your setup) index.py' in the terminal.
+
+This project is released under the MIT License.
+
+Author: @10XTMY, Molmez LTD (www.molmez.io)
+Date Published: 30 January 2023
+
+This is the filter plan: the analytics filter state (date range, in/out, keywords, min/max, categories) as one
+logical, hashable plan that runs on the fastest engine available and doubles as a cache key
+
+Engines:
+- pandas: the filter masks from helpers.py combined into one, the frame is indexed once
+- numexpr: as pandas, with the numeric part of the mask evaluated by numexpr on large frames (optional dependency)
+- sql: a parameterised WHERE clause for the SQLite backend in storage.py
+"""
+import hashlib
+from collections import namedtuple
+import numpy as np
+from cache import cached_on_data_frame
+from helpers import apply_masks, date_range_mask, incoming_payments_mask, outgoing_payments_mask, \
+    keywords_mask, categories_mask, amount_range_mask
+from money import to_minor_units
+
+try:
+    import numexpr
+except ImportError:
+    numexpr = None
+
+# frames smaller than this are not worth handing to numexpr
+NUMEXPR_MIN_ROWS = 100_000
+
+FilterPlan = namedtuple('FilterPlan', ['start_date', 'end_date', 'direction', 'isolate', 'remove',
+                                       'minimum', 'maximum', 'categories'])
+
+
+def _keywords(text):
+    return tuple(keyword.strip() for keyword in (text or '').split(',') if keyword.strip())
+
+
+def build_filter_plan(start_date=None, end_date=None, in_out=None, key_remove=None, key_isolate=None,
+                      minimum=None, maximum=None, categories=None):
+    """
+    Normalises the analytics page filter values into a FilterPlan. Equivalent filter states, eg. ' tesco' and
+    'tesco,', give equal plans, so the plan can be used as a cache key.
+    :param start_date: start date in ISO format, only used together with end_date.
+    :param end_date: end date in ISO format.
+    :param in_out: list of 'paid_in' / 'paid_out', filtering only applies when exactly one is selected.
+    :param key_remove: comma separated keywords to remove, ignored when key_isolate is also given.
+    :param key_isolate: comma separated keywords to isolate, ignored when key_remove is also given.
+    :param minimum: minimum amount in major units.
+    :param maximum: maximum amount in major units.
+    :param categories: list of categories to keep.
+    :return: FilterPlan.
+    """
+    in_out = in_out or []
+    direction = {'paid_in': 'in', 'paid_out': 'out'}.get(in_out[0]) if len(in_out) == 1 else None
+
+    # as on the analytics page, the keyword boxes only apply one at a time
+    isolate = _keywords(key_isolate) if not key_remove else ()
+    remove = _keywords(key_remove) if not key_isolate else ()
+
+    # ' Groceries' and 'Groceries' are the same category, eg. from a comma separated command line value
+    categories = sorted({category.strip() for category in categories or [] if category.strip()})
+
+    has_range = bool(start_date and end_date)
+    return FilterPlan(start_date=str(start_date)[:10] if has_range else None,
+                      end_date=str(end_date)[:10] if has_range else None,
+                      direction=direction,
+                      isolate=isolate,
+                      remove=remove,
+                      minimum=to_minor_units(minimum) if minimum else None,
+                      maximum=to_minor_units(maximum) if maximum else None,
+                      categories=tuple(categories))
+
+
+def without_date_range(plan):
+    return plan._replace(start_date=None, end_date=None)
+
+
+def plan_digest(plan, *extra):
+    """
+    A short key for a plan, and any other values its result depends on, that is stable across processes
+    (unlike hash(), which is salted per process) so it can be kept in the browser or sent as an HTTP header.
+    :param plan: FilterPlan.
+    :param extra: further values to include in the key, eg. display settings.
+    :return: hex digest string.
+    """
+    return hashlib.sha1(repr((tuple(plan),) + extra).encode()).hexdigest()[:16]
+
+
+def _numeric_mask(data_frame, plan):
+    """
+    The date, direction and amount mask of a plan, the mask functions in helpers.py ANDed into one array.
+    """
+    mask = np.ones(len(data_frame), dtype=bool)
+    if plan.start_date:
+        mask &= date_range_mask(data_frame, plan.start_date, plan.end_date)
+    if plan.direction == 'in':
+        mask &= incoming_payments_mask(data_frame)
+    elif plan.direction == 'out':
+        mask &= outgoing_payments_mask(data_frame)
+
+    # min / max compare absolute amounts when only outgoing payments are shown
+    amounts = data_frame['Amount'].to_numpy()
+    if plan.direction == 'out':
+        amounts = np.abs(amounts)
+    if plan.minimum is not None or plan.maximum is not None:
+        mask &= amount_range_mask(amounts, plan.minimum, plan.maximum)
+
+    return mask
+
+
+def _numeric_mask_numexpr(data_frame, plan):
+    amounts = data_frame['Amount'].to_numpy()
+    dates = data_frame.index.to_numpy()
+
+    terms, local_dict = ['(amount == amount)'], {'amount': amounts}
+    if plan.start_date:
+        local_dict.update(date=dates.astype('int64'),
+                          start=np.datetime64(plan.start_date, 'ns').astype('int64'),
+                          end=np.datetime64(plan.end_date, 'ns').astype('int64'))
+        terms.append('(date >= start) & (date <= end)')
+    if plan.direction == 'in':
+        terms.append('(amount > 0)')
+    elif plan.direction == 'out':
+        terms.append('(amount < 0)')
+    # rows that survive the direction term are all negative, so -amount is their absolute value
+    compared = '(-amount)' if plan.direction == 'out' else 'amount'
+    if plan.minimum is not None:
+        local_dict['lower'] = plan.minimum
+        terms.append(f'({compared} > lower)')
+    if plan.maximum is not None:
+        local_dict['upper'] = plan.maximum
+        terms.append(f'({compared} < upper)')
+    return numexpr.evaluate(' & '.join(terms), local_dict=local_dict)
+
+
+def plan_mask(data_frame, plan, engine='pandas'):
+    """
+    Builds the boolean mask for a plan, every filter ANDed into one array in place.
+    :param data_frame: pandas DataFrame with a DateTimeIndex and 'Details', 'Amount' and 'Category' columns.
+    :param plan: FilterPlan.
+    :param engine: 'pandas' or 'numexpr' for the numeric part of the mask.
+    :return: boolean numpy array.
+    """
+    if engine == 'numexpr':
+        mask = _numeric_mask_numexpr(data_frame, plan)
+    else:
+        mask = _numeric_mask(data_frame, plan)
+
+    if plan.categories:
+        mask &= categories_mask(data_frame, plan.categories)
+    if plan.isolate:
+        mask &= keywords_mask(data_frame, plan.isolate)
+    if plan.remove:
+        mask &= ~keywords_mask(data_frame, plan.remove)
+
+    return mask
+
+
+@cached_on_data_frame()
+def _evaluate_on_data_frame(data_frame, plan, engine):
+    # outgoing payments are shown as positive amounts
+    return apply_masks(data_frame, [plan_mask(data_frame, plan, engine)], absolute_amounts=plan.direction == 'out')
+
+
+def plan_to_sql(plan):
+    """
+    Translates a plan into a WHERE clause for the SQLite backend. Keywords are matched as case-insensitive
+    regular expressions, as by the pandas engine, with the REGEXP function storage.connect() registers.
+    :param plan: FilterPlan.
+    :return: tuple of (WHERE clause, parameters list).
+    """
+    clauses, params = ['1 = 1'], []
+
+    if plan.start_date:
+        clauses.append('date BETWEEN ? AND ?')
+        params += [plan.start_date, plan.end_date]
+
+    if plan.categories:
+        clauses.append(f"category IN ({', '.join('?' * len(plan.categories))})")
+        params += list(plan.categories)
+
+    amount = 'amount'
+    if plan.direction == 'in':
+        clauses.append('amount > 0')
+    elif plan.direction == 'out':
+        clauses.append('amount < 0')
+        amount = '-amount'
+
+    for keywords, negate in ((plan.isolate, ''), (plan.remove, 'NOT ')):
+        if keywords:
+            # one pattern as a logical OR, as helpers.keywords_mask builds it
+            clauses.append(f'{negate}(details REGEXP ?)')
+            params.append('|'.join(keywords))
+
+    if plan.minimum is not None:
+        clauses.append(f'{amount} > ?')
+        params.append(plan.minimum)
+    if plan.maximum is not None:
+        clauses.append(f'{amount} < ?')
+        params.append(plan.maximum)
+
+    return ' AND '.join(clauses), params
+
+
+def choose_engine(data_frame=None, connection=None):
+    """
+    Picks the fastest engine available for where the data lives.
+    :return: 'sql', 'numexpr' or 'pandas'.
+    """
+    if connection is not None:
+        return 'sql'
+    if numexpr is not None and data_frame is not None and len(data_frame) >= NUMEXPR_MIN_ROWS:
+        return 'numexpr'
+    return 'pandas'
+
+
+def execute_plan(plan, data_frame=None, connection=None, engine=None):
+    """
+    Runs a plan against a DataFrame or the SQLite backend. DataFrame results are cached on (data set, plan, engine).
+    :param plan: FilterPlan.
+    :param data_frame: pandas DataFrame to filter.
+    :param connection: sqlite3 connection, used instead of data_frame.
+    :param engine: force an engine, chosen by choose_engine() if not given.
+    :return: filtered pandas DataFrame, outgoing amounts made positive when only outgoing payments are selected.
+    """
+    try:
+        engine = engine or choose_engine(data_frame, connection)
+
+        if engine == 'sql':
+            # imported here, storage.py builds its queries from plans
+            from storage import load_transactions
+            where, params = plan_to_sql(plan)
+            return load_transactions(connection, where, params, outgoing=plan.direction == 'out')
+
+        return _evaluate_on_data_frame(data_frame, plan, engine)
+
+    except KeyError as e:
+        raise KeyError(f"DataFrame column error executing filter plan: {e}")
+    except ValueError as e:
+        raise ValueError(f"Data processing error executing filter plan: {e}")
+    except Exception as e:
+        raise Exception(f"Error executing filter plan: {e}")
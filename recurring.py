@@ -0,0 +1,125 @@
+"""
+Bank Statement Analysis Plotly Dash App
+
+This is a Plotly Dash app that analyses bank statements and provides various visualizations to help users understand
+their spending habits.
+
+It uses the following technologies and libraries:
+- Python 3.7
+- Plotly Dash
+- Pandas
+- Numpy
+
+The app is intended for educational or demonstration purposes only and should not be used in a production environment
+without further testing and security measures.
+
+To run the app, you will need to have Python and the required libraries installed.
+You can run the app by running the command 'python, python3, or py (depending on your setup) index.py' in the terminal.
+
+This project is released under the MIT License.
+
+Author: @10XTMY, Molmez LTD (www.molmez.io)
+Date Published: 30 January 2023
+
+This is the recurring payment detection used to build the subscriptions table
+"""
+import numpy as np
+import pandas as pd
+from cache import cached_on_data_frame
+from payees import normalize_payees
+
+# name: (period in days, allowed drift in days)
+FREQUENCIES = {'Weekly': (7, 1),
+               'Fortnightly': (14, 2),
+               'Monthly': (30.44, 4),
+               'Quarterly': (91.31, 10),
+               'Yearly': (365.25, 15)}
+
+MIN_OCCURRENCES = 3
+# share of intervals / amounts that must agree with the group's median
+MIN_REGULAR_SHARE = 0.75
+# intervals and amounts within these fractions of the median count as the same
+INTERVAL_TOLERANCE = 0.15
+AMOUNT_TOLERANCE = 0.1
+
+
+def _classify_interval(median_days):
+    """
+    Maps median intervals onto the nearest frequency in FREQUENCIES, a label only: the next payment is predicted
+    from the observed interval, eg. a 28 day salary is 'Monthly' but still paid every 28 days.
+    :param median_days: float numpy array of median intervals.
+    :return: numpy array of frequency names, None where no frequency fits.
+    """
+    names = np.full(len(median_days), None, dtype=object)
+
+    for name, (period, drift) in FREQUENCIES.items():
+        names[np.abs(median_days - period) <= drift] = name
+
+    return names
+
+
+@cached_on_data_frame()
+def detect_recurring_transactions(data_frame, min_occurrences=MIN_OCCURRENCES):
+    """
+    Finds payments that repeat at a regular interval for a stable amount, eg. subscriptions, rent and salary.
+    Rows are sorted once by canonical payee and date, then intervals and amount stability come from vectorized
+    groupby diff / transform operations, so the cost stays near-linear in the number of rows.
+    :param data_frame: pandas DataFrame with a DateTimeIndex and 'Details' and 'Amount' columns.
+    :param min_occurrences: minimum number of payments before a payee can be called recurring.
+    :return: pandas DataFrame with 'Payee', 'Frequency', 'Count', 'Amount', 'Last Date' and 'Next Expected'.
+    """
+    try:
+        if 'Details' not in data_frame.columns or 'Amount' not in data_frame.columns:
+            raise KeyError("Required columns 'Details' and 'Amount' not found in DataFrame.")
+
+        payee = data_frame['Payee'] if 'Payee' in data_frame.columns else normalize_payees(data_frame['Details'])
+
+        transactions = pd.DataFrame({'Payee': payee.to_numpy(),
+                                     'Incoming': data_frame['Amount'].to_numpy() > 0,
+                                     'Date': data_frame.index,
+                                     'Amount': data_frame['Amount'].to_numpy()})
+        transactions = transactions.sort_values(['Payee', 'Incoming', 'Date'], kind='mergesort')
+
+        groups = transactions.groupby(['Payee', 'Incoming'], sort=False)
+        transactions['Interval'] = groups['Date'].diff().dt.days
+
+        # compare every interval and amount to its group's median in one pass
+        median_interval = groups['Interval'].transform('median')
+        median_amount = groups['Amount'].transform('median')
+        transactions['Regular'] = (np.abs(transactions['Interval'] - median_interval) <=
+                                   np.maximum(median_interval * INTERVAL_TOLERANCE, 1))
+        transactions['Stable'] = (np.abs(transactions['Amount'] - median_amount) <=
+                                  np.abs(median_amount) * AMOUNT_TOLERANCE)
+
+        summary = groups.agg(Count=('Amount', 'size'),
+                             Amount=('Amount', 'median'),
+                             Interval=('Interval', 'median'),
+                             Last=('Date', 'max'))
+        flags = transactions.groupby(['Payee', 'Incoming'], sort=False).agg(Regular=('Regular', 'sum'),
+                                                                             Stable=('Stable', 'mean'))
+        summary = summary.join(flags)
+        summary = summary.loc[summary['Count'] >= min_occurrences].copy()
+
+        summary['Frequency'] = _classify_interval(summary['Interval'].to_numpy())
+
+        # the first payment of each group has no interval, so regular intervals are counted against Count - 1
+        recurring = summary.loc[summary['Frequency'].notna() &
+                                (summary['Regular'] >= (summary['Count'] - 1) * MIN_REGULAR_SHARE) &
+                                (summary['Stable'] >= MIN_REGULAR_SHARE)].reset_index()
+
+        if recurring.empty:
+            return pd.DataFrame()
+
+        recurring['Amount'] = np.rint(recurring['Amount']).astype('int64')
+        recurring['Next Expected'] = recurring['Last'] + pd.to_timedelta(np.rint(recurring['Interval']), unit='D')
+        recurring = recurring.rename(columns={'Last': 'Last Date'})
+
+        return recurring[['Payee', 'Frequency', 'Count', 'Amount', 'Last Date', 'Next Expected']] \
+            .sort_values('Next Expected').reset_index(drop=True)
+
+    except KeyError as e:
+        raise KeyError(f"DataFrame column error detecting recurring transactions: {e}")
+    except ValueError as e:
+        raise ValueError(f"Data processing error detecting recurring transactions: {e}")
+    except Exception as e:
+        raise Exception(f"Error detecting recurring transactions: {e}")
@@ -0,0 +1,386 @@
+"""
+Bank Statement Analysis Plotly Dash App
+
+This is a Plotly Dash app that analyses bank statements and provides various visualizations to help users understand
+their spending habits.
+
+It uses the following technologies and libraries:
+- Python 3.7
+- Plotly Dash
+- Pandas
+- Numpy
+
+The app is intended for educational or demonstration purposes only and should not be used in a production environment
+without further testing and security measures.
+
+To run the app, you will need to have Python and the required libraries installed.
+You can run the app by running the command 'python, python3, or py (depending on your setup) index.py' in the terminal.
+
+This project is released under the MIT License.
+
+Author: @10XTMY, Molmez LTD (www.molmez.io)
+Date Published: 30 January 2023
+
+This is the optional local SQLite backend that keeps transaction history across sessions
+
+Set the MOLMEZ_DATABASE environment variable to a file path to enable it, eg. MOLMEZ_DATABASE=history.db
+Uploaded statements are then upserted into the database and the analytics page queries it, pushing the filters and
+aggregates down as indexed SQL so years of history never have to be loaded into pandas at once.
+"""
+import functools
+import os
+import re
+import sqlite3
+from contextlib import closing
+import pandas as pd
+from anomalies import FAMILIES, empty_statistics, update_statistics, summarise_groups
+from budgets import SPEND_COLUMNS, monthly_spend
+from fx import convert_currency
+from bank_formats import parse_dates
+from helpers import transaction_row_hashes
+from query_plan import plan_to_sql, without_date_range
+from recurring import detect_recurring_transactions
+
+DATABASE_PATH = os.environ.get('MOLMEZ_DATABASE')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS transactions (
+    id INTEGER PRIMARY KEY,
+    date TEXT NOT NULL,
+    details TEXT NOT NULL,
+    payee TEXT NOT NULL,
+    category TEXT NOT NULL,
+    amount INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_transactions_date ON transactions (date);
+CREATE INDEX IF NOT EXISTS idx_transactions_amount ON transactions (amount);
+CREATE INDEX IF NOT EXISTS idx_transactions_payee ON transactions (payee);
+CREATE INDEX IF NOT EXISTS idx_transactions_category ON transactions (category);
+CREATE TABLE IF NOT EXISTS anomaly_bins (
+    family TEXT NOT NULL,
+    grp TEXT NOT NULL,
+    bin INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (family, grp, bin)
+);
+CREATE TABLE IF NOT EXISTS anomaly_groups (
+    family TEXT NOT NULL,
+    grp TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    median REAL NOT NULL,
+    mad REAL NOT NULL,
+    PRIMARY KEY (family, grp)
+);
+CREATE TABLE IF NOT EXISTS monthly_spend (
+    month TEXT NOT NULL,
+    category TEXT NOT NULL,
+    payee TEXT NOT NULL,
+    spend INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (month, category, payee)
+);
+"""
+
+# SQLite's limit on the number of parameters in one statement is 999 in older versions
+MAX_PARAMETERS = 900
+
+COLUMNS = 'date AS Date, details AS Details, amount AS Amount, payee AS Payee, category AS Category'
+
+
+def database_enabled():
+    return bool(DATABASE_PATH)
+
+
+@functools.lru_cache(maxsize=64)
+def _compile_regexp(pattern):
+    return re.compile(pattern, re.IGNORECASE)
+
+
+def _regexp(pattern, value):
+    """
+    SQLite's REGEXP operator, 'value REGEXP pattern' calls regexp(pattern, value). Searches case-insensitively,
+    as helpers.keywords_mask does, and a NULL value never matches.
+    """
+    return value is not None and _compile_regexp(pattern).search(value) is not None
+
+
+def connect(database_path=None):
+    """
+    Opens the database, creating the schema on first use. Connections are cheap, open one per request.
+    :param database_path: path of the SQLite file, defaults to MOLMEZ_DATABASE.
+    :return: sqlite3 connection.
+    """
+    connection = sqlite3.connect(database_path or DATABASE_PATH)
+    connection.create_function('REGEXP', 2, _regexp)
+    connection.executescript(SCHEMA)
+    return connection
+
+
+def upsert_transactions(connection, data_frame):
+    """
+    Inserts a statement, skipping rows that are already stored. Rows are identified by transaction_row_hashes(),
+    so uploading the same or an overlapping statement twice never duplicates history. Only the new rows are
+    added to the anomaly statistics and the monthly spend table.
+    :param connection: sqlite3 connection.
+    :param data_frame: pandas DataFrame as returned by bank_csv_to_data_frame.
+    :return: number of new rows stored.
+    """
+    if data_frame.empty:
+        return 0
+
+    row_hashes = transaction_row_hashes(data_frame)
+    dates = data_frame.index.strftime('%Y-%m-%d')
+
+    with connection:
+        # rows already stored can only be within the statement's dates, found through the date index
+        stored = connection.execute('SELECT id FROM transactions WHERE date BETWEEN ? AND ?',
+                                    (dates.min(), dates.max())).fetchall()
+        new = ~pd.Index(row_hashes).isin([row[0] for row in stored])
+
+        rows = zip(row_hashes[new].tolist(),
+                   dates[new],
+                   data_frame['Details'].to_numpy()[new].tolist(),
+                   data_frame['Payee'].to_numpy()[new].tolist(),
+                   data_frame['Category'].to_numpy()[new].tolist(),
+                   data_frame['Amount'].to_numpy()[new].tolist())
+        connection.executemany('INSERT OR IGNORE INTO transactions (id, date, details, payee, category, amount) '
+                               'VALUES (?, ?, ?, ?, ?, ?)', rows)
+
+        update_anomaly_statistics(connection, data_frame.loc[new])
+        update_monthly_spend(connection, data_frame.loc[new])
+        return int(new.sum())
+
+
+def _read_histograms(connection, family, groups):
+    statistics = {family: {}}
+    groups = list(groups)
+    for start in range(0, len(groups), MAX_PARAMETERS):
+        chunk = groups[start:start + MAX_PARAMETERS]
+        rows = connection.execute(f"SELECT grp, bin, count FROM anomaly_bins WHERE family = ? "
+                                  f"AND grp IN ({', '.join('?' * len(chunk))})", [family] + chunk)
+        for group, bin_number, count in rows:
+            statistics[family].setdefault(group, {})[bin_number] = count
+    return statistics
+
+
+def update_anomaly_statistics(connection, new_rows):
+    """
+    Adds new transactions to the stored anomaly statistics, then recomputes the median / MAD of the groups they
+    belong to only. The cost grows with the number of new rows, not with the stored history.
+    :param connection: sqlite3 connection, inside a transaction.
+    :param new_rows: pandas DataFrame of transactions not yet stored.
+    """
+    if new_rows.empty:
+        return
+
+    statistics = empty_statistics()
+    touched = update_statistics(statistics, new_rows)
+
+    for family in FAMILIES:
+        connection.executemany('INSERT INTO anomaly_bins (family, grp, bin, count) VALUES (?, ?, ?, ?) '
+                               'ON CONFLICT (family, grp, bin) DO UPDATE SET count = count + excluded.count',
+                               ((family, group, bin_number, count)
+                                for group, histogram in statistics[family].items()
+                                for bin_number, count in histogram.items()))
+
+        summaries = summarise_groups(_read_histograms(connection, family, touched[family]))
+        connection.executemany('INSERT OR REPLACE INTO anomaly_groups (family, grp, count, median, mad) '
+                               'VALUES (?, ?, ?, ?, ?)',
+                               ((family, group) + summary for group, summary in summaries[family].items()))
+
+
+def load_anomaly_summaries(connection):
+    """
+    Reads the per group median / MAD of the whole stored history, rebuilding them once for a database created
+    before they were kept.
+    :param connection: sqlite3 connection.
+    :return: summaries dictionary, see anomalies.py.
+    """
+    summaries = {family: {} for family in FAMILIES}
+    for family, group, count, median, mad in connection.execute('SELECT family, grp, count, median, mad '
+                                                                'FROM anomaly_groups'):
+        summaries[family][group] = (count, median, mad)
+
+    if not any(summaries.values()) and count_transactions(connection):
+        with connection:
+            update_anomaly_statistics(connection, load_transactions(connection))
+        return load_anomaly_summaries(connection)
+
+    return summaries
+
+
+def update_monthly_spend(connection, new_rows):
+    """
+    Adds the outgoing payments of new transactions to the stored monthly spend table, see budgets.py.
+    :param connection: sqlite3 connection, inside a transaction.
+    :param new_rows: pandas DataFrame of transactions not yet stored.
+    """
+    if new_rows.empty:
+        return
+
+    connection.executemany('INSERT INTO monthly_spend (month, category, payee, spend, count) VALUES (?, ?, ?, ?, ?) '
+                           'ON CONFLICT (month, category, payee) DO UPDATE SET spend = spend + excluded.spend, '
+                           'count = count + excluded.count',
+                           monthly_spend(new_rows).itertuples(index=False, name=None))
+
+
+def load_monthly_spend(connection):
+    """
+    Reads the stored monthly spend table, building it once for a database created before it was kept.
+    :param connection: sqlite3 connection.
+    :return: pandas DataFrame with budgets.SPEND_COLUMNS.
+    """
+    spend = pd.read_sql_query('SELECT month AS Month, category AS Category, payee AS Payee, spend AS Spend, '
+                              'count AS Count FROM monthly_spend', connection)
+
+    if spend.empty and connection.execute('SELECT EXISTS (SELECT 1 FROM transactions WHERE amount < 0)').fetchone()[0]:
+        with connection:
+            update_monthly_spend(connection, load_transactions(connection))
+        return load_monthly_spend(connection)
+
+    spend[['Spend', 'Count']] = spend[['Spend', 'Count']].astype('int64')
+    return spend[SPEND_COLUMNS]
+
+
+def _date_range_sql(start_date, end_date):
+    if start_date and end_date:
+        return 'date BETWEEN ? AND ?', [str(start_date)[:10], str(end_date)[:10]]
+    return '1 = 1', []
+
+
+def load_transactions(connection, where='1 = 1', params=(), outgoing=False):
+    """
+    Loads only the transactions matching a WHERE clause, using the date and amount indexes.
+    :param connection: sqlite3 connection.
+    :param where: WHERE clause from query_plan.plan_to_sql().
+    :param params: parameters of the clause.
+    :param outgoing: True when only outgoing payments were selected, their amounts are made positive
+        as filter_by_outgoing_payments does.
+    :return: pandas DataFrame shaped like bank_csv_to_data_frame's output.
+    """
+    data_frame = pd.read_sql_query(f'SELECT {COLUMNS} FROM transactions WHERE {where} ORDER BY date',
+                                   connection, params=list(params))
+    data_frame['Date'] = parse_dates(data_frame['Date'], '%Y-%m-%d')
+    data_frame['Amount'] = data_frame['Amount'].astype('int64')
+    data_frame.set_index('Date', inplace=True)
+
+    if outgoing:
+        data_frame['Amount'] = data_frame['Amount'].abs()
+    return data_frame
+
+
+def count_transactions(connection):
+    return connection.execute('SELECT COUNT(*) FROM transactions').fetchone()[0]
+
+
+def database_version():
+    """
+    A version of the configured database's contents: rows are only ever inserted, so the row count changes
+    whenever a statement adds transactions.
+    :return: int.
+    """
+    with closing(connect()) as connection:
+        return count_transactions(connection)
+
+
+def query_totals(connection, where='1 = 1', params=()):
+    """
+    SQL version of calculate_total.
+    :return: total incoming and outgoing amounts in minor units.
+    """
+    total_in, total_out = connection.execute(
+        'SELECT COALESCE(SUM(CASE WHEN amount > 0 THEN amount END), 0), '
+        'COALESCE(-SUM(CASE WHEN amount < 0 THEN amount END), 0) '
+        f'FROM transactions WHERE {where}', list(params)).fetchone()
+    return total_in, total_out
+
+
+def query_duplicate_count_with_totals(connection, start_date=None, end_date=None):
+    """
+    SQL version of sort_by_duplicate_count_with_totals over a date range. The result has one row per payee and
+    can be passed to calculate_top_repeat_transactions / calculate_top_single_payments as duplicates_sorted.
+    :return: pandas DataFrame with 'Payee', 'Amount' and 'Count' columns, largest count first.
+    """
+    where, params = _date_range_sql(start_date, end_date)
+    grouped = pd.read_sql_query('SELECT payee AS Payee, SUM(amount) AS Amount, COUNT(*) AS Count '
+                                f'FROM transactions WHERE {where} GROUP BY payee ORDER BY Count DESC, Payee',
+                                connection, params=params)
+    grouped['Amount'] = grouped['Amount'].astype('int64')
+    return grouped
+
+
+@functools.lru_cache(maxsize=4)
+def _recurring_at_version(database_path, version):
+    # rows are only ever inserted, so the history, and its recurring payments, only change with the row count
+    with closing(connect(database_path)) as connection:
+        return detect_recurring_transactions(load_transactions(connection))
+
+
+def query_analytics(plan):
+    """
+    Runs the analytics page queries against the configured database: the filtered rows for the graph, the
+    payee groups behind the top lists over the date range and the totals, all pushed down to SQL. The recurring
+    payments of the whole history are detected once per database_version(), the history is not loaded otherwise.
+    :param plan: query_plan.FilterPlan of the analytics filters.
+    :return: tuple of (filtered DataFrame, recurring payments DataFrame, duplicates_sorted DataFrame,
+        (total in, total out), anomaly summaries), or None if the database holds no transactions yet.
+    """
+    with closing(connect()) as connection:
+        version = count_transactions(connection)
+        if not version:
+            return None
+
+        # as filter_by_date_range, a date range without transactions shows the whole history
+        if plan.start_date:
+            where, params = _date_range_sql(plan.start_date, plan.end_date)
+            if not connection.execute(f'SELECT EXISTS (SELECT 1 FROM transactions WHERE {where})',
+                                      params).fetchone()[0]:
+                plan = without_date_range(plan)
+
+        where, params = plan_to_sql(plan)
+        data_frame = load_transactions(connection, where, params, outgoing=plan.direction == 'out')
+        duplicates_sorted = query_duplicate_count_with_totals(connection, plan.start_date, plan.end_date)
+        totals = query_totals(connection, where, params)
+        summaries = load_anomaly_summaries(connection)
+
+    # the cached frame is shared, callers get a copy
+    recurring = _recurring_at_version(DATABASE_PATH, version).copy()
+    return data_frame, recurring, duplicates_sorted, totals, summaries
+
+
+def query_monthly_spend():
+    """
+    Reads the monthly spend table of the configured database.
+    :return: pandas DataFrame with budgets.SPEND_COLUMNS, or None if the database holds no transactions yet.
+    """
+    with closing(connect()) as connection:
+        if not count_transactions(connection):
+            return None
+        return load_monthly_spend(connection)
+
+
+def query_history():
+    """
+    Loads every stored transaction, for when the filters cannot be pushed down, eg. to show them in another
+    currency.
+    :return: pandas DataFrame shaped like bank_csv_to_data_frame's output, or None if there are no transactions yet.
+    """
+    with closing(connect()) as connection:
+        if not count_transactions(connection):
+            return None
+        return load_transactions(connection)
+
+
+def store_statement(data_frame):
+    """
+    Upserts an uploaded statement into the configured database, if there is one. The database holds amounts in
+    the default currency, a statement with a 'Currency' column is converted first (see fx.py).
+    :param data_frame: pandas DataFrame as returned by bank_csv_to_data_frame.
+    :return: number of new rows stored, 0 when the database is not enabled.
+    """
+    if not database_enabled():
+        return 0
+    if 'Currency' in data_frame.columns:
+        data_frame = convert_currency(data_frame).drop(columns='Currency')
+    with closing(connect()) as connection:
+        return upsert_transactions(connection, data_frame)
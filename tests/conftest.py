@@ -0,0 +1,17 @@
+import sys
+from pathlib import Path
+import pytest
+
+# the modules live at the repository root, next to index.py
+sys.path.insert(0, str(Path(__file__).parent.parent))
+import payees  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def payee_cache(tmp_path, monkeypatch):
+    # every test starts from an empty payee index of its own, never the repository's cache/payees.json
+    monkeypatch.setattr(payees, 'CACHE_DIR', tmp_path)
+    monkeypatch.setattr(payees, 'PAYEE_CACHE_FILE', tmp_path / 'payees.json')
+    monkeypatch.setattr(payees, 'PAYEE_LOCK_FILE', tmp_path / 'payees.lock')
+    monkeypatch.setattr(payees, '_payee_index', None)
+    return tmp_path / 'payees.json'
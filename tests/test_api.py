@@ -0,0 +1,27 @@
+import pytest
+# the app's layout and routes, as the server runs them
+from index import server
+
+
+@pytest.fixture
+def client():
+    return server.test_client()
+
+
+@pytest.mark.parametrize('query', ['min=inf', 'max=-inf', 'min=nan', 'max=1e400', 'top=0', 'in_out=both',
+                                   'isolate=(', 'remove=tesco,[a'])
+def test_invalid_filters_are_rejected(client, query):
+    response = client.get(f'/api/v1/analytics?{query}')
+    assert response.status_code == 400
+    assert 'invalid filter spec' in response.get_json()['error']
+
+
+def test_overflowing_top_in_a_json_body(client):
+    assert client.post('/api/v1/analytics', json={'top': 1e400}).status_code == 400
+
+
+def test_unchanged_request_is_not_modified(client):
+    response = client.get('/api/v1/analytics?in_out=paid_out&min=10')
+    assert response.status_code == 200
+    again = client.get('/api/v1/analytics?in_out=paid_out&min=10', headers={'If-None-Match': response.headers['ETag']})
+    assert again.status_code == 304
@@ -0,0 +1,95 @@
+import io
+import pandas as pd
+import pytest
+from bank_formats import clean_numeric, detect_date_format, find_adapter, read_bank_csv, sniff_adapter
+from helpers import bank_csv_to_data_frame
+
+
+def _read(text):
+    csv_input = io.StringIO(text)
+    adapter = sniff_adapter(csv_input)
+    return adapter, read_bank_csv(csv_input, adapter)
+
+
+def test_canonical_layout():
+    adapter, data_frame = _read('Date,Details,Amount\n14/12/2023,Tesco,-12.50\n15/12/2023,Salary,1000\n')
+    assert adapter['name'] == 'canonical'
+    assert data_frame['Amount'].tolist() == [-12.5, 1000.0]
+    assert data_frame['Date'].dt.day.tolist() == [14, 15]
+
+
+def test_debit_credit_layout_signs_amounts():
+    adapter, data_frame = _read('Date,Description,Debit,Credit\n2023-12-01,Tesco,12.50,\n2023-12-02,Refund,,3.00\n')
+    assert adapter['name'] == 'debit_credit'
+    assert data_frame['Amount'].tolist() == [-12.5, 3.0]
+
+
+def test_most_specific_layout_wins_and_extra_columns_are_ignored():
+    adapter, _ = _read('Transaction Date,Transaction Description,Debit Amount,Credit Amount,Balance\n'
+                       '01/12/2023,Tesco,1.00,,99.00\n')
+    assert adapter['name'] == 'transaction_debit_credit'
+
+
+def test_unknown_layout():
+    assert find_adapter(['When', 'What', 'How much']) is None
+
+
+def test_optional_currency_column():
+    _, data_frame = _read('Date,Details,Amount,Currency\n2023-12-01,Cafe,-3.00, eur\n2023-12-02,Shop,-1.00,\n')
+    assert data_frame['Currency'].tolist()[0] == 'EUR'
+    assert pd.isna(data_frame['Currency'].tolist()[1])
+
+
+def test_clean_numeric():
+    values = pd.Series(['£1,234.50', '(12.00)', '', '+3'])
+    cleaned = clean_numeric(values)
+    assert cleaned.iloc[[0, 1, 3]].tolist() == [1234.5, -12.0, 3.0]
+    assert pd.isna(cleaned.iloc[2])
+    assert clean_numeric(pd.Series(['1.234,50']), decimal=',').tolist() == [1234.5]
+
+
+def test_date_format_is_settled_by_order():
+    assert detect_date_format(pd.Series(['01/12/2023', '02/01/2023', '02/05/2023'])) == '%m/%d/%Y'
+    assert detect_date_format(pd.Series(['13/01/2023', '14/01/2023'])) == '%d/%m/%Y'
+
+
+def test_blank_amount_is_an_error_not_a_garbage_total():
+    with pytest.raises(ValueError, match='missing or invalid amount'):
+        bank_csv_to_data_frame(io.StringIO('Date,Details,Amount\n2023-12-01,Tesco,-1.00\n2023-12-02,Shop,\n'))
+
+
+def test_statement_amounts_are_minor_units():
+    data_frame = bank_csv_to_data_frame(io.StringIO('Date,Details,Amount\n2023-12-01,Tesco,-1.05\n'))
+    assert data_frame['Amount'].dtype == 'int64'
+    assert data_frame['Amount'].tolist() == [-105]
+
+
+def test_semicolon_file_with_decimal_commas():
+    adapter, data_frame = _read('Date;Details;Amount\n01.12.2023;Rewe;-1.234,50\n02.12.2023;Gehalt;2.000,00\n')
+    assert adapter['name'] == 'canonical'
+    assert data_frame['Amount'].tolist() == [-1234.5, 2000.0]
+
+
+def test_thousands_separators_are_not_decimal_marks():
+    _, data_frame = _read('Date,Details,Amount\n2023-12-01,Rent,"-1,234.50"\n2023-12-02,Bonus,"1,000"\n')
+    assert data_frame['Amount'].tolist() == [-1234.5, 1000.0]
+
+
+def test_adapter_with_its_own_delimiter_is_matched(monkeypatch):
+    import bank_formats
+    monkeypatch.setattr(bank_formats, 'ADAPTERS', list(bank_formats.ADAPTERS))
+    bank_formats.register_adapter('pipe_bank', 'Booked', 'Text', amount='Value', sep='|')
+    adapter, data_frame = _read('Booked|Text|Value\n2023-12-01|Cafe|-3.20\n')
+    assert adapter['name'] == 'pipe_bank'
+    assert data_frame['Amount'].tolist() == [-3.2]
+
+
+@pytest.mark.parametrize('text', ['Date,Details,Amount\n01/02/2023,Rent,-950\n02/02/2023,Salary,2500\n',
+                                  'Date;Details;Amount\n01.02.2023;Rent;-950\n02.02.2023;Salary;2.500\n'
+                                  '03.02.2023;Shop;-1,50\n04.02.2023;Shop;-2,50\n'])
+def test_whole_number_amounts_are_major_units(text):
+    _, raw = _read(text)
+    assert raw['Amount'].dtype == 'float64'
+
+    data_frame = bank_csv_to_data_frame(io.StringIO(text), derive_columns=False)
+    assert data_frame['Amount'].tolist()[:2] == [-95000, 250000]
@@ -0,0 +1,42 @@
+import json
+import pandas as pd
+import pytest
+from categories import assign_categories, UNCATEGORISED
+
+
+@pytest.fixture
+def rules_file(tmp_path):
+    def write(rules):
+        path = tmp_path / 'rules.json'
+        path.write_text(json.dumps(rules))
+        return path
+    return write
+
+
+def _frame(details, amounts=None):
+    return pd.DataFrame({'Details': details, 'Amount': amounts or [-100] * len(details)})
+
+
+def test_regex_is_used_as_written(rules_file):
+    path = rules_file([{'category': 'Bracket', 'regex': r'ref [(]\d+'},
+                       {'category': 'Bills', 'regex': r'(council|water) (tax|rates)'}])
+    categories = assign_categories(_frame(['REF (123) SHOP', 'Council Tax', 'water rates', 'other']), path)
+    assert categories.tolist() == ['Bracket', 'Bills', 'Bills', UNCATEGORISED]
+
+
+def test_keywords_are_literal_and_first_rule_wins(rules_file):
+    path = rules_file([{'category': 'Income', 'keywords': ['salary'], 'direction': 'in'},
+                       {'category': 'Shop', 'keywords': ['a+b', 'tesco']}])
+    categories = assign_categories(_frame(['SALARY', 'A+B LTD', 'aab', 'Tesco'], [100, -1, -1, -1]), path)
+    assert categories.tolist() == ['Income', 'Shop', UNCATEGORISED, 'Shop']
+
+
+def test_invalid_regex_is_reported(rules_file):
+    path = rules_file([{'category': 'Broken', 'regex': '('}])
+    with pytest.raises(ValueError, match='invalid regex'):
+        assign_categories(_frame(['x']), path)
+
+
+def test_empty_frame(rules_file):
+    path = rules_file([{'category': 'Bills', 'regex': 'water'}])
+    assert assign_categories(_frame([]), path).empty
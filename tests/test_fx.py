@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pytest
+from fx import REFERENCE_CURRENCY, convert_currency, reference_rates
+
+
+@pytest.fixture
+def rates_file(tmp_path):
+    path = tmp_path / 'rates.csv'
+    path.write_text('Date,Currency,Rate\n'
+                    '2023-01-01,EUR,0.80\n2023-01-01,USD,0.70\n'
+                    '2023-02-01,EUR,0.90\n2023-02-01,USD,0.75\n')
+    return path
+
+
+def _rates(dates, currencies, rates_file):
+    return reference_rates(pd.to_datetime(dates).to_numpy(), np.array(currencies, dtype=object), rates_file).tolist()
+
+
+def test_date_between_two_rates_takes_the_earlier(rates_file):
+    assert _rates(['2023-01-15', '2023-02-01', '2023-03-10'], ['EUR'] * 3, rates_file) == [0.8, 0.9, 0.9]
+
+
+def test_date_before_the_first_rate_takes_the_first(rates_file):
+    assert _rates(['2022-12-01', '2023-01-15'], ['USD', 'USD'], rates_file) == [0.7, 0.7]
+
+
+def test_mixed_currencies_on_one_day_keep_row_order(rates_file):
+    dates = ['2023-02-10', '2023-01-10', '2023-02-10', '2022-06-01', '2023-02-10', '2023-01-10']
+    currencies = ['USD', 'EUR', REFERENCE_CURRENCY, 'EUR', 'EUR', 'USD']
+    assert _rates(dates, currencies, rates_file) == [0.75, 0.8, 1.0, 0.8, 0.9, 0.7]
+
+
+def test_unknown_currency_is_an_error(rates_file):
+    with pytest.raises(ValueError, match='no exchange rates for JPY'):
+        _rates(['2023-01-15'], ['JPY'], rates_file)
+
+
+@pytest.fixture
+def statement():
+    return pd.DataFrame({'Details': ['Hotel', 'Taxi', 'Shop', 'Cafe'],
+                         'Amount': [-10000, -2000, -1500, -300],
+                         'Currency': ['EUR', 'USD', None, REFERENCE_CURRENCY]},
+                        index=pd.to_datetime(['2023-03-05', '2023-03-05', '2023-03-06', '2023-03-07']).rename('Date'))
+
+
+def test_blank_currencies_are_the_default(statement, monkeypatch):
+    import fx
+    monkeypatch.setattr(fx, 'DEFAULT_CURRENCY', REFERENCE_CURRENCY)
+    rates = reference_rates(statement.index.to_numpy(), np.array(['EUR', 'USD', 'GBP', 'GBP'], dtype=object))
+
+    converted = convert_currency(statement, REFERENCE_CURRENCY)
+
+    assert converted['Amount'].tolist() == np.rint(statement['Amount'].to_numpy() * rates).astype('int64').tolist()
+    assert converted['Amount'].iloc[2:].tolist() == [-1500, -300]
+    assert converted['Currency'].isna().iloc[2]
+
+
+def test_switching_the_base_back_and_forth(statement, monkeypatch):
+    import fx
+    monkeypatch.setattr(fx, 'DEFAULT_CURRENCY', REFERENCE_CURRENCY)
+    in_pounds = convert_currency(statement, 'GBP')
+    in_euros = convert_currency(statement, 'EUR')
+
+    assert in_euros['Amount'].iloc[0] == -10000
+    assert (in_euros['Amount'].abs() > in_pounds['Amount'].abs()).iloc[1:].all()
+    # cached per base, and a copy every time
+    in_euros['Amount'] = 0
+    assert convert_currency(statement, 'GBP').equals(in_pounds)
+    assert convert_currency(statement, 'EUR')['Amount'].iloc[0] == -10000
+
+
+def test_no_rates_file_knows_only_the_reference_currency(statement, tmp_path):
+    with pytest.raises(ValueError, match='no exchange rates for EUR, USD'):
+        reference_rates(statement.index.to_numpy(), statement['Currency'].fillna('EUR').to_numpy(dtype=object),
+                        tmp_path / 'missing.csv')
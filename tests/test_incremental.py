@@ -0,0 +1,60 @@
+import json
+import pandas as pd
+import pytest
+from budgets import calculate_monthly_spend
+from helpers import add_derived_columns, data_frame_to_store, records_to_data_frame
+from incremental import append_statement, build_aggregates, spend_table
+from pipeline import monthly_spend_table
+
+
+@pytest.fixture
+def statement():
+    return pd.DataFrame({'Details': ['TESCO STORES 1234', 'Salary', 'STARBUCKS 99', 'TESCO STORES 5678'],
+                         'Amount': [-1250, 250000, -450, -3000]},
+                        index=pd.to_datetime(['2023-06-01', '2023-06-02', '2023-06-03', '2023-06-04']).rename('Date'))
+
+
+def _round_trip(value):
+    # as the dcc.Store sends it back
+    return json.loads(json.dumps(value))
+
+
+def test_store_keeps_payees_and_categories(statement, monkeypatch):
+    derived = add_derived_columns(statement)
+    monkeypatch.setattr('helpers.add_derived_columns', pytest.fail)
+
+    restored = records_to_data_frame(_round_trip(data_frame_to_store(derived)))
+
+    pd.testing.assert_frame_equal(restored[derived.columns], derived, check_freq=False)
+
+
+def test_append_earlier_statement_keeps_codes_aligned(statement):
+    data, aggregates, statistics, _ = append_statement(None, None, None, statement.iloc[2:])
+    data, aggregates, statistics, new_rows = append_statement(_round_trip(data), _round_trip(aggregates),
+                                                              _round_trip(statistics), statement)
+
+    assert len(new_rows) == 2
+    restored = records_to_data_frame(data)
+    expected = add_derived_columns(statement)
+    assert restored['Payee'].tolist() == expected['Payee'].tolist()
+    assert restored['Category'].tolist() == expected['Category'].tolist()
+    assert _round_trip(aggregates) == _round_trip(build_aggregates(restored)[0])
+
+
+def test_spend_table_matches_the_data_set(statement):
+    data, aggregates, statistics, _ = append_statement(None, None, None, statement.iloc[:2])
+    data, aggregates, _, _ = append_statement(_round_trip(data), _round_trip(aggregates), _round_trip(statistics),
+                                              statement)
+
+    columns = ['Month', 'Category', 'Payee']
+    maintained = spend_table(_round_trip(aggregates)).sort_values(columns).reset_index(drop=True)
+    built = calculate_monthly_spend(records_to_data_frame(data)).sort_values(columns).reset_index(drop=True)
+    pd.testing.assert_frame_equal(maintained, built)
+    assert monthly_spend_table(data, aggregates).equals(spend_table(aggregates))
+
+
+def test_older_record_sessions_hold_major_units():
+    # whole number amounts come back from the browser as integers
+    records = [{'Date': '2023-06-01', 'Details': 'Rent', 'Amount': -950},
+               {'Date': '2023-06-02', 'Details': 'Salary', 'Amount': 2500.5}]
+    assert records_to_data_frame(records)['Amount'].tolist() == [-95000, 250050]
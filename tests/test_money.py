@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+from money import to_minor_units, as_minor_units, from_minor_units, format_minor_units
+
+
+def test_scalar_amounts_round_half_even():
+    assert to_minor_units(12.34) == 1234
+    assert to_minor_units('1,234.50') == 123450
+    assert to_minor_units(-0.005) == 0
+    assert to_minor_units(0.015) == 2
+
+
+def test_series_of_strings():
+    amounts = to_minor_units(pd.Series(['1,234.56', '-0.10', '7']))
+    assert amounts.dtype == 'int64'
+    assert amounts.tolist() == [123456, -10, 700]
+
+
+def test_integer_series_are_major_units():
+    amounts = to_minor_units(pd.Series([-950, 2500], dtype='int32'))
+    assert amounts.dtype == 'int64'
+    assert amounts.tolist() == [-95000, 250000]
+
+
+def test_minor_units_are_read_as_they_are():
+    assert as_minor_units(pd.Series([-950, 2500])).tolist() == [-950, 2500]
+    # a JSON round trip can turn stored minor units into floats
+    amounts = as_minor_units(pd.Series([-950.0, 2500.0]))
+    assert amounts.dtype == 'int64'
+    assert amounts.tolist() == [-950, 2500]
+    with pytest.raises(ValueError, match='missing or invalid amount'):
+        as_minor_units(pd.Series([1.0, np.nan]))
+
+
+def test_float_sums_are_exact():
+    amounts = to_minor_units(pd.Series([0.1] * 10 + [0.2] * 10))
+    assert amounts.sum() == 300
+
+
+@pytest.mark.parametrize('values', [pd.Series([1.0, np.nan]), pd.Series(['1.00', '']), pd.Series([np.inf])])
+def test_missing_amounts_raise(values):
+    with pytest.raises(ValueError, match='missing or invalid amount'):
+        to_minor_units(values)
+
+
+@pytest.mark.parametrize('value', [float('nan'), float('inf'), '-inf'])
+def test_missing_scalar_raises(value):
+    with pytest.raises(ValueError, match='missing or invalid amount'):
+        to_minor_units(value)
+
+
+def test_round_trip_and_format():
+    assert from_minor_units(pd.Series([123456])).tolist() == [1234.56]
+    assert format_minor_units(-123456).replace(',', '') == '-1234.56'
@@ -0,0 +1,52 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+import payees
+
+
+def test_card_numbers_and_dates_collapse():
+    names = payees.normalize_payees(pd.Series(['STARBUCKS 1234', 'Starbucks 14/02', 'CARD PAYMENT TO STARBUCKS']))
+    assert names.nunique() == 1
+
+
+def test_processor_prefix_is_stripped():
+    names = payees.normalize_payees(pd.Series(['PAYPAL *NETFLIX', 'PAYPAL *SPOTIFY', 'SQ *CORNER CAFE']))
+    assert names.tolist() == ['Netflix', 'Spotify', 'Corner Cafe']
+
+
+def test_shared_first_word_is_not_merged():
+    names = payees.normalize_payees(pd.Series(['AMAZON', 'AMAZON PRIME', 'AMAZON PRME']))
+    assert names.tolist() == ['Amazon', 'Amazon Prime', 'Amazon Prime']
+
+
+def test_save_merges_entries_written_by_other_workers(payee_cache):
+    payees.normalize_payees(pd.Series(['TESCO']))
+    # another worker adds an entry after this one loaded its index
+    index = json.loads(payee_cache.read_text())
+    index['ALDI 123'] = 'aldi'
+    payee_cache.write_text(json.dumps(index))
+
+    payees.normalize_payees(pd.Series(['LIDL']))
+    saved = json.loads(payee_cache.read_text())
+    assert {'TESCO', 'ALDI 123', 'LIDL'} <= set(saved)
+    assert not list(payee_cache.parent.glob('*.tmp'))
+
+
+def test_published_index_is_never_changed_in_place():
+    payees.normalize_payees(pd.Series(['TESCO']))
+    snapshot = payees._load_index()
+    payees.normalize_payees(pd.Series(['LIDL', 'TESCO']))
+    assert 'LIDL' not in snapshot
+    assert 'LIDL' in payees._load_index()
+
+
+def test_concurrent_normalisation():
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda i: payees.normalize_payees(pd.Series([f'SHOP {i} LONDON', 'TESCO'] * 50)),
+                                range(40)))
+    assert all(result.iloc[1] == 'Tesco' for result in results)
+
+
+def test_saved_index_is_readable_by_other_users(payee_cache):
+    payees.normalize_payees(pd.Series(['TESCO']))
+    assert payee_cache.stat().st_mode & 0o044 == 0o044
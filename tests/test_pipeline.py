@@ -0,0 +1,14 @@
+from pipeline import run_reports
+from preload import demo_data_frame
+from query_plan import build_filter_plan
+
+
+def test_paid_out_category_totals_are_outgoing():
+    demo = demo_data_frame()
+    categories = run_reports(demo, build_filter_plan(in_out=['paid_out']))['categories']
+
+    assert (categories['In'] == 0).all()
+    assert (categories['Out'] < 0).all()
+    assert categories['Out'].is_monotonic_increasing
+    everything = run_reports(demo, build_filter_plan())['categories'].set_index('Category')
+    assert categories.set_index('Category')['Out'].equals(everything.loc[categories['Category'], 'Out'])
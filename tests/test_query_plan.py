@@ -0,0 +1,36 @@
+from contextlib import closing
+import pandas as pd
+import pytest
+from query_plan import build_filter_plan, execute_plan
+from storage import connect, upsert_transactions
+
+
+@pytest.fixture
+def data_frame():
+    return pd.DataFrame({'Details': ['STARBUCKS 12', 'Walmart', 'Tesco', 'tesco express', '', 'Salary'],
+                         'Amount': [-450, -2000, -1500, -300, -100, 250000],
+                         'Payee': ['Starbucks', 'Walmart', 'Tesco', 'Tesco', '', 'Salary'],
+                         'Category': ['Coffee', 'Shopping', 'Groceries', 'Groceries', 'Uncategorised', 'Income']},
+                        index=pd.to_datetime(['2023-06-01', '2023-06-02', '2023-06-03', '2023-06-04', '2023-06-05',
+                                              '2023-06-06']).rename('Date'))
+
+
+@pytest.mark.parametrize('filters', [{'key_isolate': 'star|wal'},
+                                     {'key_isolate': 'TESCO, sal'},
+                                     {'key_remove': 'tesco'},
+                                     {'key_isolate': 'tesco$'},
+                                     {'in_out': ['paid_out'], 'minimum': 4, 'key_remove': 'walmart'}])
+def test_sql_matches_pandas(data_frame, filters):
+    plan = build_filter_plan(**filters)
+    with closing(connect(':memory:')) as connection:
+        upsert_transactions(connection, data_frame)
+        from_sql = execute_plan(plan, connection=connection)
+    from_pandas = execute_plan(plan, data_frame, engine='pandas')
+
+    assert sorted(from_sql['Amount'].tolist()) == sorted(from_pandas['Amount'].tolist())
+
+
+def test_equivalent_categories_give_equal_plans():
+    plan = build_filter_plan(categories=['Groceries', ' Bills', ''])
+    assert plan == build_filter_plan(categories=['Bills', 'Groceries '])
+    assert build_filter_plan(categories=[' ']).categories == ()
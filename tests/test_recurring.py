@@ -0,0 +1,21 @@
+import pandas as pd
+from recurring import detect_recurring_transactions
+
+
+def _payments(dates, payee, amount):
+    return pd.DataFrame({'Details': payee, 'Payee': payee, 'Amount': amount},
+                        index=pd.DatetimeIndex(pd.to_datetime(dates), name='Date'))
+
+
+def test_next_date_follows_the_observed_interval():
+    salary = _payments(pd.date_range('2023-05-20', '2023-08-12', freq='28D'), 'Salary', 250000)
+    recurring = detect_recurring_transactions(salary)
+
+    assert recurring['Frequency'].tolist() == ['Monthly']
+    assert recurring['Last Date'].tolist() == [pd.Timestamp('2023-08-12')]
+    assert recurring['Next Expected'].tolist() == [pd.Timestamp('2023-09-09')]
+
+
+def test_irregular_payments_are_not_recurring():
+    shop = _payments(['2023-06-01', '2023-06-03', '2023-07-20', '2023-07-21'], 'Shop', -1000)
+    assert detect_recurring_transactions(shop).empty
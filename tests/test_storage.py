@@ -0,0 +1,35 @@
+import pytest
+import storage
+from pipeline import analytics_reports
+from preload import demo_data_frame
+from query_plan import build_filter_plan
+from recurring import detect_recurring_transactions
+
+
+@pytest.fixture
+def database(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, 'DATABASE_PATH', str(tmp_path / 'transactions.db'))
+    storage.store_statement(demo_data_frame())
+    return storage.DATABASE_PATH
+
+
+def test_filtered_queries_load_only_the_filtered_rows(database, monkeypatch):
+    loaded = []
+    load_transactions = storage.load_transactions
+    monkeypatch.setattr(storage, 'load_transactions',
+                        lambda *args, **kwargs: loaded.append(load_transactions(*args, **kwargs)) or loaded[-1])
+
+    for keyword in ('tesco', 'starbucks', 'tesco'):
+        reports = analytics_reports(build_filter_plan(key_isolate=keyword))
+        assert reports['history'] is None
+
+    # the whole history is loaded once, for the recurring payments of this database version
+    assert [len(data_frame) for data_frame in loaded].count(len(demo_data_frame())) == 1
+    assert len(loaded) == 4
+
+
+def test_recurring_payments_cover_the_whole_history(database):
+    reports = analytics_reports(build_filter_plan(key_isolate='no such payee'))
+    assert reports['transactions'].empty
+    expected = detect_recurring_transactions(storage.query_history())
+    assert reports['recurring'].equals(expected)
@@ -0,0 +1,109 @@
+"""
+Bank Statement Analysis Plotly Dash App
+
+This is a Plotly Dash app that analyses bank statements and provides various visualizations to help users understand
+their spending habits.
+
+It uses the following technologies and libraries:
+- Python 3.7
+- Plotly Dash
+- Pandas
+- Numpy
+
+The app is intended for educational or demonstration purposes only and should not be used in a production environment
+without further testing and security measures.
+
+To run the app, you will need to have Python and the required libraries installed.
+You can run the app by running the command 'python, python3, or py (depending on your setup) index.py' in the terminal.
+
+This project is released under the MIT License.
+
+Author: @10XTMY, Molmez LTD (www.molmez.io)
+Date Published: 30 January 2023
+
+These are the time series analytics (running balance, monthly in/out, rolling spend and month-over-month deltas)
+plotted by the line graph instead of every raw transaction
+"""
+import pandas as pd
+import plotly.graph_objects as go
+from cache import cached_on_data_frame
+from money import from_minor_units
+
+ROLLING_WINDOWS = ('30D', '90D')
+
+
+def _daily_in_out(data_frame):
+    """
+    Sums incoming and outgoing amounts per calendar day, days without transactions are 0.
+    :param data_frame: pandas DataFrame with a DateTimeIndex and signed int64 minor unit 'Amount'.
+    :return: pandas DataFrame with 'In' and 'Out' (positive) columns and a daily DateTimeIndex.
+    """
+    amounts = data_frame['Amount']
+    split = pd.DataFrame({'In': amounts.where(amounts > 0, 0),
+                          'Out': -amounts.where(amounts < 0, 0)}, index=data_frame.index)
+    return split.sort_index().resample('D').sum()
+
+
+@cached_on_data_frame()
+def calculate_time_series(data_frame):
+    """
+    Computes the period analytics with resample / cumsum / rolling kernels over daily totals, so the cost
+    depends on the number of days rather than the number of transactions once the daily sums are taken.
+    Cached per data set, and so per date range and filter, since those change the frame passed in.
+    :param data_frame: pandas DataFrame with a DateTimeIndex and signed int64 minor unit 'Amount', or daily
+        'In' and 'Out' totals already taken, eg. the ones incremental.py keeps up to date.
+    :return: tuple of (daily, monthly) pandas DataFrames, amounts in minor units.
+        daily: 'In', 'Out', 'Balance' (running net) and 'Spend 30D' / 'Spend 90D' (rolling outgoing)
+        monthly: 'In', 'Out', 'Net' and 'Out Change' (month-over-month change in spend)
+    """
+    try:
+        if data_frame.empty:
+            return pd.DataFrame(), pd.DataFrame()
+
+        daily = _daily_in_out(data_frame) if 'Amount' in data_frame.columns else data_frame[['In', 'Out']].copy()
+        daily['Balance'] = (daily['In'] - daily['Out']).cumsum()
+        for window in ROLLING_WINDOWS:
+            daily[f'Spend {window}'] = daily['Out'].rolling(window).sum().astype('int64')
+
+        monthly = daily[['In', 'Out']].resample('MS').sum()
+        monthly['Net'] = monthly['In'] - monthly['Out']
+        monthly['Out Change'] = monthly['Out'].diff().fillna(0).astype('int64')
+
+        return daily, monthly
+
+    except KeyError as e:
+        raise KeyError(f"DataFrame column error calculating time series: {e}")
+    except ValueError as e:
+        raise ValueError(f"Data processing error calculating time series: {e}")
+    except Exception as e:
+        raise Exception(f"Error calculating time series: {e}")
+
+
+def time_series_graph(data_frame, graph_style):
+    """
+    Plots the running balance, rolling spend and monthly in/out aggregates, a few hundred points at most
+    however long the history is.
+    :param data_frame: pandas DataFrame with a DateTimeIndex and signed int64 minor unit 'Amount', or daily totals.
+    :param graph_style: style settings for the graph.
+    :return: plotly graph object.
+    """
+    daily, monthly = calculate_time_series(data_frame)
+
+    graph_new = go.Figure(layout={'template': 'plotly_dark'})
+    if not daily.empty:
+        # dates without a time part, plotly reads them as a date axis
+        days, months = daily.index.strftime('%Y-%m-%d'), monthly.index.strftime('%Y-%m-%d')
+        graph_new.add_bar(x=months, y=from_minor_units(monthly['In']), name='Monthly in', opacity=0.5)
+        graph_new.add_bar(x=months, y=from_minor_units(-monthly['Out']), name='Monthly out', opacity=0.5,
+                          customdata=from_minor_units(monthly['Out Change']),
+                          hovertemplate='%{y}<br>change on last month: %{customdata}')
+        graph_new.add_scatter(x=days, y=from_minor_units(daily['Balance']), name='Running balance',
+                              mode='lines')
+        for window in ROLLING_WINDOWS:
+            graph_new.add_scatter(x=days, y=from_minor_units(daily[f'Spend {window}']),
+                                  name=f'Rolling {window} spend', mode='lines')
+
+    graph_new.update_layout(barmode='relative', hovermode='x unified')
+    graph_new.update_layout(graph_style)
+
+    return graph_new
@@ -0,0 +1,71 @@
+"""
+Bank Statement Analysis Plotly Dash App
+
+This is a Plotly Dash app that analyses bank statements and provides various visualizations to help users understand
+their spending habits.
+
+It uses the following technologies and libraries:
+- Python 3.7
+- Plotly Dash
+- Pandas
+- Numpy
+
+The app is intended for educational or demonstration purposes only and should not be used in a production environment
+without further testing and security measures.
+
+To run the app, you will need to have Python and the required libraries installed.
+You can run the app by running the command 'python, python3, or py (depending on your setup) index.py' in the terminal.
+
+This project is released under the MIT License.
+
+Author: @10XTMY, Molmez LTD (www.molmez.io)
+Date Published: 30 January 2023
+
+This is a tool for benchmarking date parsing, inferred day-first parsing against detect_date_format + parse_dates
+Run it from the repository root: python tools/benchmark_date_parsing.py
+"""
+import sys
+import time
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from bank_formats import detect_date_format, parse_dates  # noqa: E402
+
+NUM_ROWS = 1_000_000
+NUM_DAYS = 5 * 365
+
+
+def make_dates(num_rows, date_format):
+    days = pd.Timestamp('2019-01-01') + pd.to_timedelta(np.sort(np.random.randint(0, NUM_DAYS, num_rows)), unit='D')
+    return pd.Series(days.strftime(date_format))
+
+
+def time_it(label, func, values):
+    start = time.perf_counter()
+    try:
+        result = func(values)
+    except ValueError as e:
+        # newer pandas versions refuse to infer a day-first reading of month-first strings
+        print(f'{label:<40}  failed: {str(e).splitlines()[0]}')
+        return None
+    elapsed = time.perf_counter() - start
+    print(f'{label:<40}{elapsed:>8.3f}s')
+    return result
+
+
+if __name__ == '__main__':
+
+    print(f'pandas {pd.__version__}')
+    for date_format in ('%d/%m/%Y', '%m/%d/%Y'):
+        values = make_dates(NUM_ROWS, date_format)
+        print(f'\n{NUM_ROWS:,} rows written as {date_format}')
+
+        inferred = time_it('pd.to_datetime(dayfirst=True)', lambda v: pd.to_datetime(v, dayfirst=True), values)
+        time_it('detect_date_format', detect_date_format, values)
+        detected = time_it('parse_dates (detect + unique cache)', parse_dates, values)
+
+        expected = pd.to_datetime(values, format=date_format)
+        inferred_correct = inferred is not None and inferred.equals(expected)
+        print(f'inferred dates correct: {inferred_correct}, detected dates correct: {detected.equals(expected)}')
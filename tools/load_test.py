@@ -0,0 +1,146 @@
+"""
+Bank Statement Analysis Plotly Dash App
+
+This is a Plotly Dash app that analyses bank statements and provides various visualizations to help users understand
+their spending habits.
+
+It uses the following technologies and libraries:
+- Python 3.7
+- Plotly Dash
+- Pandas
+- Numpy
+
+The app is intended for educational or demonstration purposes only and should not be used in a production environment
+without further testing and security measures.
+
+To run the app, you will need to have Python and the required libraries installed.
+You can run the app by running the command 'python, python3, or py (depending on your setup) index.py' in the terminal.
+
+This project is released under the MIT License.
+
+Author: @10XTMY, Molmez LTD (www.molmez.io)
+Date Published: 30 January 2023
+
+
+This is a tool for load testing the analytics page, in the style of a locust run: simulated users repeatedly change
+the analytics filters and the requests per second and callback latency percentiles are reported
+Start the server first, eg. gunicorn --config gunicorn.conf.py wsgi:application, then run from the repository root:
+    python tools/load_test.py --host http://127.0.0.1:8050 --users 20 --duration 30
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import urllib.request
+import numpy as np
+
+MAIN_OUTPUT = 'figure-store.data'
+
+# filter changes a user makes on the analytics page, as (changed property, new value)
+INTERACTIONS = [
+    ('in-out-selection.value', ['paid_in']),
+    ('in-out-selection.value', ['paid_out']),
+    ('in-out-selection.value', []),
+    ('input-keyword-isolate.value', 'starbucks'),
+    ('input-keyword-remove.value', 'chase'),
+    ('minimum-input.value', 100),
+    ('maximum-input.value', 1000),
+    ('date-range-picker.start_date', '2023-09-01'),
+    ('date-range-picker.end_date', '2023-11-30'),
+    ('top-list-length.value', 10),
+    ('category-filter.value', ['Groceries']),
+    ('category-filter.value', []),
+]
+
+
+def _get_json(url):
+    with urllib.request.urlopen(url, timeout=30) as response:
+        return json.load(response)
+
+
+def find_main_callback(host):
+    """
+    Finds the analytics page callback from the server's callback list, so the payloads follow the live layout.
+    :param host: server URL.
+    :return: dictionary of the callback's 'output', 'inputs' and 'state'.
+    """
+    for dependency in _get_json(f'{host}/_dash-dependencies'):
+        if MAIN_OUTPUT in dependency['output']:
+            return dependency
+    raise SystemExit(f'no callback with output {MAIN_OUTPUT} found on {host}')
+
+
+def callback_payload(dependency, values, changed):
+    outputs = [dict(zip(('id', 'property'), output.split('.')))
+               for output in dependency['output'].strip('.').split('...')]
+
+    def spec(items):
+        return [{**item, 'value': values.get(f"{item['id']}.{item['property']}")} for item in items]
+
+    return json.dumps({'output': dependency['output'], 'outputs': outputs,
+                       'inputs': spec(dependency['inputs']), 'state': spec(dependency.get('state', [])),
+                       'changedPropIds': [changed]}).encode()
+
+
+def simulated_user(host, dependency, stop_at, latencies, failures, lock):
+    values = {}
+    while time.perf_counter() < stop_at:
+        changed, value = random.choice(INTERACTIONS)
+        values[changed] = value
+
+        request = urllib.request.Request(f'{host}/_dash-update-component',
+                                         data=callback_payload(dependency, values, changed),
+                                         headers={'Content-Type': 'application/json'})
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request, timeout=60) as response:
+                response.read()
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies.append(elapsed)
+        except OSError:
+            with lock:
+                failures.append(changed)
+
+
+def run_load_test(host, users, duration, ramp_up):
+    """
+    Runs the simulated users against the server and prints a summary.
+    :param host: server URL.
+    :param users: number of concurrent simulated users.
+    :param duration: seconds to run for after the last user has started.
+    :param ramp_up: seconds over which the users are started.
+    """
+    dependency = find_main_callback(host)
+    latencies, failures, lock = [], [], threading.Lock()
+
+    start = time.perf_counter()
+    stop_at = start + ramp_up + duration
+    threads = []
+    for user in range(users):
+        thread = threading.Thread(target=simulated_user,
+                                  args=(host, dependency, stop_at, latencies, failures, lock), daemon=True)
+        thread.start()
+        threads.append(thread)
+        time.sleep(ramp_up / users)
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    print(f'{users} users for {elapsed:.1f}s against {host}')
+    print(f'requests: {len(latencies)}, failures: {len(failures)}, requests/s: {len(latencies) / elapsed:.1f}')
+    if latencies:
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) * 1000
+        print(f'callback latency ms  p50: {p50:.0f}  p95: {p95:.0f}  p99: {p99:.0f}  max: {max(latencies) * 1000:.0f}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Load test the analytics page callback.')
+    parser.add_argument('--host', default='http://127.0.0.1:8050', help='server URL')
+    parser.add_argument('--users', type=int, default=10, help='number of concurrent users')
+    parser.add_argument('--duration', type=float, default=30, help='seconds to run for')
+    parser.add_argument('--ramp-up', type=float, default=2, help='seconds over which users are started')
+    args = parser.parse_args()
+
+    run_load_test(args.host.rstrip('/'), args.users, args.duration, args.ramp_up)
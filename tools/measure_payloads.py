@@ -0,0 +1,100 @@
+"""
+Bank Statement Analysis Plotly Dash App
+
+This is a Plotly Dash app that analyses bank statements and provides various visualizations to help users understand
+their spending habits.
+
+It uses the following technologies and libraries:
+- Python 3.7
+- Plotly Dash
+- Pandas
+- Numpy
+
+The app is intended for educational or demonstration purposes only and should not be used in a production environment
+without further testing and security measures.
+
+To run the app, you will need to have Python and the required libraries installed.
+You can run the app by running the command 'python, python3, or py (depending on your setup) index.py' in the terminal.
+
+This project is released under the MIT License.
+
+Author: @10XTMY, Molmez LTD (www.molmez.io)
+Date Published: 30 January 2023
+
+
+This is a tool for measuring the bytes sent over the wire per interaction: the request (which carries the statement
+held in the dcc.Store) and the response, uncompressed and as sent, and what the response costs on slow connections
+Run it from the repository root: python tools/measure_payloads.py [statement.csv]
+"""
+import base64
+import sys
+from pathlib import Path
+
+TOOLS_PATH = Path(__file__).parent
+sys.path.insert(0, str(TOOLS_PATH.parent))
+from index import app  # noqa: E402
+from load_test import MAIN_OUTPUT, INTERACTIONS, callback_payload  # noqa: E402
+
+DEFAULT_STATEMENT = TOOLS_PATH.parent.joinpath('datasets', 'transactions.csv')
+
+# download speeds in kilobits per second, as used by browser network throttling presets
+CONNECTIONS = {'slow 3G': 400, 'fast 3G': 1600}
+
+
+def post_callback(client, dependency, values, changed, encoding):
+    response = client.post('/_dash-update-component', data=callback_payload(dependency, values, changed),
+                           headers={'Content-Type': 'application/json', 'Accept-Encoding': encoding})
+    if response.status_code != 200:
+        raise SystemExit(f'{changed}: HTTP {response.status_code}')
+    return response
+
+
+def measure(client, dependency, values, changed):
+    """
+    :return: tuple of (request bytes, uncompressed response bytes, response bytes sent, content encoding used).
+    """
+    raw = post_callback(client, dependency, values, changed, 'identity')
+    compressed = post_callback(client, dependency, values, changed, 'br, gzip')
+    request_bytes = len(callback_payload(dependency, values, changed))
+    return request_bytes, len(raw.data), len(compressed.data), compressed.headers.get('Content-Encoding', 'none')
+
+
+def transfer_ms(num_bytes, kilobits_per_second):
+    return num_bytes * 8 / kilobits_per_second
+
+
+def print_row(label, request_bytes, raw_bytes, sent_bytes, encoding):
+    times = '  '.join(f'{transfer_ms(sent_bytes, speed):>7.0f}ms' for speed in CONNECTIONS.values())
+    print(f'{label:<44}{request_bytes:>10,}{raw_bytes:>10,}{sent_bytes:>10,}  {encoding:<6}{times}')
+
+
+if __name__ == '__main__':
+    statement = Path(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_STATEMENT
+    client = app.server.test_client()
+    dependencies = client.get('/_dash-dependencies').get_json()
+
+    def find_callback(output):
+        return next(dependency for dependency in dependencies if output in dependency['output'])
+
+    header_speeds = '  '.join(f'{name:>9}' for name in CONNECTIONS)
+    print(f'{"interaction":<44}{"request":>10}{"response":>10}{"sent":>10}  {"enc":<6}{header_speeds}')
+
+    # the upload callback returns the statement that is then sent back with every analytics callback
+    upload = find_callback('data-set.data')
+    contents = 'data:text/csv;base64,' + base64.b64encode(statement.read_bytes()).decode()
+    upload_values = {'upload-data.contents': contents, 'upload-data.filename': statement.name}
+    print_row(f'upload {statement.name}', *measure(client, upload, upload_values, 'upload-data.contents'))
+    stored = post_callback(client, upload, upload_values, 'upload-data.contents', 'identity').get_json()
+    data_set = stored['response']['data-set']['data']
+
+    analytics = find_callback(MAIN_OUTPUT)
+    totals = [0, 0, 0]
+    for data, label in ((None, 'demo data'), (data_set, 'uploaded data')):
+        values = {'data-set.data': data}
+        for changed, value in INTERACTIONS:
+            values[changed] = value
+            *sizes, encoding = measure(client, analytics, values, changed)
+            totals = [total + size for total, size in zip(totals, sizes)]
+            print_row(f'{label}: {changed}', *sizes, encoding)
+
+    print_row('analytics callbacks total', *totals, '')
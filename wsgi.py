@@ -0,0 +1,40 @@
+"""
+Bank Statement Analysis Plotly Dash App
+
+This is a Plotly Dash app that analyses bank statements and provides various visualizations to help users understand
+their spending habits.
+
+It uses the following technologies and libraries:
+- Python 3.7
+- Plotly Dash
+- Pandas
+- Numpy
+
+The app is intended for educational or demonstration purposes only and should not be used in a production environment
+without further testing and security measures.
+
+To run the app, you will need to have Python and the required libraries installed.
+You can run the app by running the command 'python, python3, or py (depending on your setup) index.py' in the terminal.
+
+This project is released under the MIT License.
+
+Author: @10XTMY, Molmez LTD (www.molmez.io)
+Date Published: 30 January 2023
+
+
+This is the WSGI entry point for serving the app to several users with a production server, eg.
+    gunicorn --config gunicorn.conf.py wsgi:application
+index.py remains the way to run the single process development server
+"""
+import gc
+from index import server
+from preload import warm_caches
+
+# with preload_app = True this runs once in the gunicorn master, before the workers are forked
+warm_caches()
+
+# the garbage collector writes to every object it tracks, which would copy the preloaded pages into each worker,
+# objects created so far are moved out of its reach
+gc.freeze()
+
+application = server